@@ -2,6 +2,8 @@ import logging
 from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException
 from fastapi.responses import FileResponse
 import os
+import re
+import shutil
 import uuid
 import aio_pika
 from pathlib import Path
@@ -27,6 +29,10 @@ router = APIRouter(
 logger = logging.getLogger("eduwiz.routes.video")
 
 VIDEOS_DIR = Path(os.getenv("OUTPUT_PATH", "/shared/videos"))
+STREAMS_DIR = VIDEOS_DIR / "streams"
+
+# Files the renderer writes into a job's stream directory
+STREAM_FILE_PATTERN = re.compile(r"^(index\.m3u8|scene_\d+_\d+\.ts)$")
 
 
 @router.post(
@@ -45,6 +51,8 @@ async def render(
     - **data: RenderRequest**: A JSON object containing:
         - **prompt (str)**: The prompt provided by the user, which will be used to generate the Manim code for the video.
         - **Job Id (str)**: The job id for the new render job being requested
+        - **quality (str)**: Quality of the final render, one of low, medium, high, production or fourk
+        - **preview_quality (str | None)**: Quality of the draft published before the final render, null to skip it
 
     """
     uid = decoded_token.get("uid")
@@ -61,7 +69,9 @@ async def render(
     if not job_id:
         raise HTTPException(status_code=400, detail="Missing 'jobid' in request body")
 
-    background_tasks.add_task(process_render_job, job_id, prompt)
+    background_tasks.add_task(
+        process_render_job, job_id, prompt, data.quality, data.preview_quality
+    )
 
     try:
         await initialize_job_status(job_id, uid)
@@ -72,7 +82,9 @@ async def render(
     return {"job_id": job_id}
 
 
-async def process_render_job(job_id: str, prompt: str):
+async def process_render_job(
+    job_id: str, prompt: str, quality: str, preview_quality: str | None
+):
     logger.info(f"Received new job {job_id}")
 
     await send_status_update(job_id, "started_generation")
@@ -94,6 +106,8 @@ async def process_render_job(job_id: str, prompt: str):
         message = {
             "job_id": job_id,
             "manim_code": code,
+            "quality": quality,
+            "preview_quality": preview_quality,
         }
 
         # Publish job order to the queue
@@ -154,6 +168,53 @@ async def get_video(
         raise HTTPException(status_code=500, detail="Failed to serve video file")
 
 
+@router.get("/render/{job_id}/stream/{filename}")
+async def get_stream_file(
+    job_id: str,
+    filename: str,
+    decoded_token: dict = Depends(FirebaseAuthMiddleware(email_is_verified)),
+):
+    """
+    Retrieve the HLS playlist or one of its segments for a job, available while the job is still rendering.
+    The playlist grows as scenes finish and is closed once every scene has been added.
+
+    **Parameters:**
+    - **job_id (str)**: The UUID of the render job
+    - **filename (str)**: index.m3u8 for the playlist, or the name of a segment listed in it
+    """
+    try:
+        uuid.UUID(job_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid job ID format")
+
+    if not STREAM_FILE_PATTERN.fullmatch(filename):
+        raise HTTPException(status_code=400, detail="Invalid stream file name")
+
+    uid = decoded_token.get("uid")
+    if not uid:
+        raise HTTPException(status_code=401, detail="Unauthorized: missing uid")
+
+    is_owner = await check_job_uid(job_id, uid)
+    if not is_owner:
+        raise HTTPException(
+            status_code=403, detail="Forbidden: You do not own this job"
+        )
+
+    stream_path = STREAMS_DIR / job_id / filename
+
+    if not stream_path.exists():
+        raise HTTPException(status_code=404, detail="Stream not found")
+
+    if filename.endswith(".m3u8"):
+        # The playlist changes while the job renders, players must always refetch it
+        return FileResponse(
+            str(stream_path),
+            media_type="application/vnd.apple.mpegurl",
+            headers={"Cache-Control": "no-cache"},
+        )
+    return FileResponse(str(stream_path), media_type="video/mp2t")
+
+
 @router.delete("/render/{job_id}")
 async def delete_job(
     job_id: str,
@@ -194,6 +255,10 @@ async def delete_job(
             logger.error(f"Failed to delete video file for job {job_id}: {e}")
             raise HTTPException(status_code=500, detail="Failed to delete video file")
 
+    stream_dir = STREAMS_DIR / job_id
+    if stream_dir.exists():
+        shutil.rmtree(stream_dir, ignore_errors=True)
+
     db_deleted = await delete_job_data(job_id)
 
     if not db_deleted:
@@ -1,5 +1,9 @@
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
+RenderQuality = Literal["low", "medium", "high", "production", "fourk"]
+
 
 class RenderRequest(BaseModel):
     prompt: str = Field(
@@ -8,3 +12,13 @@ class RenderRequest(BaseModel):
         description="The prompt given by the user for the requested video, will be used to generate the Manim code",
     )
     jobid: str = Field(..., title="Job ID for the requested render")
+    quality: RenderQuality = Field(
+        "medium",
+        title="Final Quality",
+        description="Quality of the final render of the video",
+    )
+    preview_quality: RenderQuality | None = Field(
+        "low",
+        title="Preview Quality",
+        description="Quality of the draft published before the final render, null to skip the draft",
+    )
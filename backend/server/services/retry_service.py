@@ -79,6 +79,11 @@ class RetryService:
                     "manim_code": fixed_scenes,
                 }
 
+                # Keep the render tiers the job was submitted with
+                for option in ("quality", "preview_quality"):
+                    if option in data:
+                        retry_message[option] = data[option]
+
                 # Get RabbitMQ connection
                 rabbitmq = await RabbitMQConnection.get_instance()
                 channel = await rabbitmq.get_channel()
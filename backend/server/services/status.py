@@ -30,6 +30,8 @@ async def process_status_update(message: aio_pika.abc.AbstractIncomingMessage):
         ref.update(
             {
                 "status": status,
+                # Only sent with progress updates, any other status clears it
+                "eta_seconds": data.get("eta_seconds"),
                 "timestamp": {".sv": "timestamp"},  # Server timestamp
             }
         )
@@ -26,6 +26,7 @@ export interface RenderRequest {
 
 export interface JobStatus {
   status: string | number;
+  eta_seconds?: number;
   timestamp: number;
 }
 
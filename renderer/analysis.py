@@ -0,0 +1,380 @@
+import ast
+import logging
+
+from plain_text import plain_text_markup
+
+logger = logging.getLogger("eduwiz.analysis")
+
+_UNRESOLVED = object()
+
+# TextManager methods and the tex mobject each one builds, add_title and add_text only build one for lines with
+# math or LaTeX markup and set the others with Pango
+TEXT_MANAGER_TEX = {
+    "add_title": "Tex",
+    "add_text": "Tex",
+    "add_equation": "MathTex",
+}
+
+# Keyword arguments which change the compiled tex, every other keyword only affects styling
+TEX_KEYWORDS = {"arg_separator", "tex_environment", "substrings_to_isolate"}
+
+
+def _literal(node: ast.AST):
+    """Statically resolve a node to a python literal, or return _UNRESOLVED."""
+    if isinstance(node, ast.JoinedStr):
+        if all(isinstance(value, ast.Constant) for value in node.values):
+            return "".join(value.value for value in node.values)
+        return _UNRESOLVED
+
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        left = _literal(node.left)
+        right = _literal(node.right)
+        if isinstance(left, str) and isinstance(right, str):
+            return left + right
+        return _UNRESOLVED
+
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return _UNRESOLVED
+
+
+def _call_name(node: ast.Call) -> str | None:
+    if isinstance(node.func, ast.Name):
+        return node.func.id
+    if isinstance(node.func, ast.Attribute):
+        return node.func.attr
+    return None
+
+
+def extract_tex_calls(code: str) -> list[dict]:
+    """
+    Find the Tex and MathTex mobjects a scene builds with literal arguments, including the ones built by TextManager.
+    Each call is returned as {"cls", "args", "kwargs"} with only the arguments that affect the compiled tex, so the
+    same mobject can be rebuilt elsewhere to compile it ahead of time. Calls with arguments that can't be resolved
+    statically are skipped and left to compile lazily during the render.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return []
+
+    calls = []
+    seen = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+
+        name = _call_name(node)
+        from_text_manager = name in TEXT_MANAGER_TEX and isinstance(
+            node.func, ast.Attribute
+        )
+        if from_text_manager:
+            cls = TEXT_MANAGER_TEX[name]
+        elif name in ("Tex", "MathTex") and isinstance(node.func, ast.Name):
+            cls = name
+        else:
+            continue
+
+        if not node.args or any(isinstance(arg, ast.Starred) for arg in node.args):
+            continue
+        args = [_literal(arg) for arg in node.args]
+        if not all(isinstance(arg, str) for arg in args):
+            continue
+
+        kwargs = {}
+        if from_text_manager:
+            # TextManager takes a single string and builds the mobject with its own settings
+            if len(args) != 1:
+                continue
+            if cls == "Tex" and plain_text_markup(args[0]) is not None:
+                continue
+        else:
+            resolved = True
+            for keyword in node.keywords:
+                if keyword.arg is None or keyword.arg == "tex_template":
+                    resolved = False
+                    break
+                if keyword.arg in TEX_KEYWORDS:
+                    value = _literal(keyword.value)
+                    if value is _UNRESOLVED:
+                        resolved = False
+                        break
+                    kwargs[keyword.arg] = value
+            if not resolved:
+                continue
+
+        call = {"cls": cls, "args": args, "kwargs": kwargs}
+        signature = repr(call)
+        if signature not in seen:
+            seen.add(signature)
+            calls.append(call)
+
+    return calls
+
+
+# Every TextManager method that plays an animation on the scene
+TEXT_MANAGER_ANIMATIONS = {"add_title", "add_text", "add_equation", "clear_scene"}
+
+# TextManager writes the lines added in a batch block together, each starting this far into the previous one
+TEXT_MANAGER_BATCH_LAG_RATIO = 0.5
+
+# Calls which are capitalized like mobjects but are set up once per scene
+NON_MOBJECT_CALLS = {"TextManager", "GTTSService"}
+
+# Bounds on how far loops and helper calls are followed when estimating animations
+MAX_ITERATIONS = 1000
+MAX_HELPER_DEPTH = 5
+
+# Rough speaking rate of the TTS voice, used to size voiceovers from their text
+VOICEOVER_WORDS_PER_SECOND = 2.5
+
+
+def _number(node: ast.AST | None, default: float) -> float:
+    value = _literal(node) if node is not None else _UNRESOLVED
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return default
+
+
+def _keyword(node: ast.Call, name: str) -> ast.AST | None:
+    return next(
+        (keyword.value for keyword in node.keywords if keyword.arg == name), None
+    )
+
+
+def _iterations(node: ast.AST, sequences: dict[str, ast.AST]) -> int:
+    """
+    Statically resolve how many times a for loop over node runs, assuming once when it can't be resolved. Names in
+    sequences are resolved to the literal they are bound to.
+    """
+    if isinstance(node, ast.Name) and node.id in sequences:
+        return _iterations(sequences[node.id], {})
+
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        return len(node.elts)
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+        if node.func.id == "range" and not node.keywords:
+            args = [_literal(arg) for arg in node.args]
+            if args and all(isinstance(arg, int) for arg in args):
+                try:
+                    return min(len(range(*args)), MAX_ITERATIONS)
+                except (TypeError, ValueError):
+                    return 1
+        if node.func.id in ("enumerate", "reversed", "sorted", "list") and node.args:
+            return _iterations(node.args[0], sequences)
+        if node.func.id == "zip" and node.args:
+            return min(_iterations(arg, sequences) for arg in node.args)
+
+    value = _literal(node)
+    if isinstance(value, (str, list, tuple, set, dict)):
+        return min(len(value), MAX_ITERATIONS)
+    return 1
+
+
+class _AnimationEstimator:
+    """
+    Walks construct() in execution order, multiplying the animations in loops by their iteration count, following
+    calls into helper functions and methods defined in the scene, and taking the longer branch of every if.
+    """
+
+    def __init__(self, tree: ast.Module):
+        self.tree = tree
+        self.functions = {
+            node.name: node
+            for node in ast.walk(tree)
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+        }
+        self._stack: list[str] = []
+
+        # Names bound exactly once, to a literal sequence, so loops over them can be resolved
+        bindings: dict[str, list[ast.AST]] = {}
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+                bindings.setdefault(node.id, []).append(node)
+        self.sequences = {}
+        for node in ast.walk(tree):
+            if (
+                isinstance(node, ast.Assign)
+                and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name)
+                and len(bindings.get(node.targets[0].id, ())) == 1
+                and isinstance(node.value, (ast.List, ast.Tuple, ast.Set))
+            ):
+                self.sequences[node.targets[0].id] = node.value
+
+    def construct(self) -> ast.FunctionDef | None:
+        for node in self.tree.body:
+            if isinstance(node, ast.ClassDef) and node.name == "ManimVideo":
+                for item in node.body:
+                    if (
+                        isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))
+                        and item.name == "construct"
+                    ):
+                        return item
+        return None
+
+    def function(self, node: ast.FunctionDef) -> tuple[int, float]:
+        if node.name in self._stack or len(self._stack) >= MAX_HELPER_DEPTH:
+            return 0, 0.0
+        self._stack.append(node.name)
+        try:
+            return self.body(node.body)
+        finally:
+            self._stack.pop()
+
+    def body(self, statements: list[ast.stmt]) -> tuple[int, float]:
+        animations, seconds = 0, 0.0
+        for statement in statements:
+            count, duration = self.statement(statement)
+            animations += count
+            seconds += duration
+        return animations, seconds
+
+    def statement(self, node: ast.stmt) -> tuple[int, float]:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            return 0, 0.0
+
+        if isinstance(node, (ast.For, ast.AsyncFor)):
+            iterations = _iterations(node.iter, self.sequences)
+            count, duration = self.body(node.body)
+            extra_count, extra_duration = self.body(node.orelse)
+            return (
+                count * iterations + extra_count,
+                duration * iterations + extra_duration,
+            )
+
+        if isinstance(node, ast.If):
+            return max(self.body(node.body), self.body(node.orelse))
+
+        if isinstance(node, ast.Try) or (
+            hasattr(ast, "TryStar") and isinstance(node, ast.TryStar)
+        ):
+            parts = [self.body(node.body), self.body(node.orelse)]
+            parts.append(self.body(node.finalbody))
+            return sum(p[0] for p in parts), sum(p[1] for p in parts)
+
+        if isinstance(node, (ast.While, ast.With, ast.AsyncWith)):
+            count, duration = self.calls(
+                node.items if not isinstance(node, ast.While) else [node.test]
+            )
+            body_count, body_duration = self.body(node.body)
+            if body_count and _is_batch(node):
+                # The lines of a TextManager batch are written in one animation
+                return count + 1, duration + 1.0 + TEXT_MANAGER_BATCH_LAG_RATIO * (
+                    body_count - 1
+                )
+            return count + body_count, duration + body_duration
+
+        return self.calls([node])
+
+    def calls(self, nodes: list[ast.AST]) -> tuple[int, float]:
+        animations, seconds = 0, 0.0
+        for root in nodes:
+            for node in ast.walk(root):
+                if not isinstance(node, ast.Call):
+                    continue
+                name = _call_name(node)
+                is_method = isinstance(node.func, ast.Attribute)
+
+                if is_method and name == "play":
+                    animations += 1
+                    seconds += _number(_keyword(node, "run_time"), 1.0)
+                elif is_method and name == "wait":
+                    animations += 1
+                    duration = node.args[0] if node.args else _keyword(node, "duration")
+                    seconds += _number(duration, 1.0)
+                elif is_method and name in TEXT_MANAGER_ANIMATIONS:
+                    # TextManager plays a Write, or a FadeOut when clearing, of the default length
+                    animations += 1
+                    seconds += 1.0
+                elif name in self.functions and (
+                    not is_method
+                    or (
+                        isinstance(node.func.value, ast.Name)
+                        and node.func.value.id == "self"
+                    )
+                ):
+                    count, duration = self.function(self.functions[name])
+                    animations += count
+                    seconds += duration
+        return animations, seconds
+
+
+def _is_batch(node: ast.stmt) -> bool:
+    return isinstance(node, ast.With) and any(
+        isinstance(item.context_expr, ast.Call)
+        and isinstance(item.context_expr.func, ast.Attribute)
+        and item.context_expr.func.attr == "batch"
+        for item in node.items
+    )
+
+
+def estimate_animations(code: str) -> tuple[int, float]:
+    """
+    Estimate how many animations a scene plays, counting play and wait calls the way manim numbers them in its log,
+    and how many seconds they last from literal run_time and wait durations, one second each otherwise.
+    Loops over literal ranges and sequences, helpers defined in the scene and TextManager's add_* and clear_scene
+    methods, which play an animation each, are all taken into account.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return 0, 0.0
+
+    estimator = _AnimationEstimator(tree)
+    construct = estimator.construct()
+    if construct is None:
+        # Without a construct() to follow every call in the module is counted once
+        return estimator.calls(tree.body)
+    return estimator.function(construct)
+
+
+def scene_features(code: str) -> dict:
+    """
+    Static features of a scene which drive its render cost, used to predict how long it takes to render:
+    animations is the estimated number of animations played, duration_seconds the length of the video from their
+    durations or from its voiceovers, whichever is longer, mobjects the number of mobjects constructed and tex the
+    number of distinct tex expressions compiled ahead of the render.
+    """
+    features = {"animations": 0, "duration_seconds": 0.0, "mobjects": 0, "tex": 0}
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return features
+
+    animations, animation_seconds = estimate_animations(code)
+    features["animations"] = animations
+
+    voiceover_seconds = 0.0
+    animation_args = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call) or not isinstance(node.func, ast.Attribute):
+            continue
+        name = node.func.attr
+
+        if name == "play":
+            animation_args.update(id(arg) for arg in node.args)
+        elif name in TEXT_MANAGER_ANIMATIONS and name != "clear_scene":
+            features["mobjects"] += 1
+        elif name == "voiceover":
+            text = _literal(
+                _keyword(node, "text")
+                or (node.args[0] if node.args else ast.Constant(None))
+            )
+            if isinstance(text, str):
+                voiceover_seconds += len(text.split()) / VOICEOVER_WORDS_PER_SECOND
+
+    for node in ast.walk(tree):
+        if (
+            isinstance(node, ast.Call)
+            and id(node) not in animation_args
+            and (_call_name(node) or "")[:1].isupper()
+            and _call_name(node) not in NON_MOBJECT_CALLS
+        ):
+            features["mobjects"] += 1
+
+    features["duration_seconds"] = round(max(animation_seconds, voiceover_seconds), 2)
+    features["tex"] = len(extract_tex_calls(code))
+    return features
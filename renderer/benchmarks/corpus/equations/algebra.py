@@ -0,0 +1,23 @@
+from manim import *
+from text_manager import TextManager
+
+
+class ManimVideo(Scene):
+    def construct(self):
+        text_manager = TextManager(self)
+
+        text_manager.add_title("Solving a Quadratic")
+        text_manager.add_equation(r"x^2 - 5x + 6 = 0")
+        text_manager.add_equation(r"(x - 2)(x - 3) = 0")
+        text_manager.add_equation(r"x = 2 \quad \text{or} \quad x = 3")
+        self.wait(1)
+        text_manager.clear_scene()
+
+        text_manager.add_title("The Quadratic Formula")
+        formula = MathTex(r"x = \frac{-b \pm \sqrt{b^2 - 4ac}}{2a}").scale(1.3)
+        self.play(Write(formula))
+        box = SurroundingRectangle(formula, color=YELLOW)
+        self.play(Create(box))
+        discriminant = MathTex(r"\Delta = b^2 - 4ac").next_to(box, DOWN, buff=0.8)
+        self.play(FadeIn(discriminant, shift=UP))
+        self.wait(2)
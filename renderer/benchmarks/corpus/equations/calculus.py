@@ -0,0 +1,29 @@
+from manim import *
+from text_manager import TextManager
+
+
+class ManimVideo(Scene):
+    def construct(self):
+        text_manager = TextManager(self)
+
+        text_manager.add_title("The Power Rule")
+        text_manager.add_equation(r"\frac{d}{dx} x^n = n x^{n-1}")
+        text_manager.add_equation(r"\frac{d}{dx} x^3 = 3 x^2")
+        text_manager.add_equation(r"\int x^n \, dx = \frac{x^{n+1}}{n+1} + C")
+        self.wait(1)
+        text_manager.clear_scene()
+
+        steps = [
+            r"\int_0^1 x^2 \, dx",
+            r"= \left[ \frac{x^3}{3} \right]_0^1",
+            r"= \frac{1}{3} - 0",
+            r"= \frac{1}{3}",
+        ]
+        equation = MathTex(steps[0]).scale(1.2)
+        self.play(Write(equation))
+        for step in steps[1:]:
+            next_equation = MathTex(step).scale(1.2)
+            self.play(TransformMatchingTex(equation, next_equation))
+            equation = next_equation
+            self.wait(0.5)
+        self.wait(1)
@@ -0,0 +1,28 @@
+from manim import *
+
+
+class ManimVideo(Scene):
+    def construct(self):
+        axes = Axes(
+            x_range=[-4, 4, 1], y_range=[-2, 10, 2], x_length=8, y_length=5, tips=False
+        )
+        self.play(Create(axes))
+
+        parabola = axes.plot(lambda x: x**2 / 2, color=BLUE)
+        line = axes.plot(lambda x: x + 2, color=GREEN)
+        self.play(Create(parabola), run_time=2)
+        self.play(Create(line), run_time=1.5)
+
+        tracker = ValueTracker(-3)
+        dot = always_redraw(
+            lambda: Dot(
+                axes.c2p(tracker.get_value(), tracker.get_value() ** 2 / 2),
+                color=YELLOW,
+            )
+        )
+        self.add(dot)
+        self.play(tracker.animate.set_value(3), run_time=3)
+
+        area = axes.get_area(parabola, x_range=[-1, 2], color=BLUE, opacity=0.4)
+        self.play(FadeIn(area))
+        self.wait(1)
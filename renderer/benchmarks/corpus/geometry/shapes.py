@@ -0,0 +1,25 @@
+from manim import *
+
+
+class ManimVideo(Scene):
+    def construct(self):
+        circle = Circle(radius=1.5, color=BLUE).set_fill(BLUE, opacity=0.5)
+        square = Square(side_length=3, color=GREEN).set_fill(GREEN, opacity=0.5)
+        triangle = Triangle(color=RED).scale(1.8).set_fill(RED, opacity=0.5)
+
+        self.play(Create(circle))
+        self.play(Transform(circle, square))
+        self.play(Transform(circle, triangle))
+        self.play(Rotate(circle, angle=PI, run_time=2))
+
+        shapes = VGroup(
+            *[RegularPolygon(n, color=YELLOW).scale(0.6) for n in range(3, 9)]
+        )
+        shapes.arrange_in_grid(rows=2, buff=0.6)
+        self.play(ReplacementTransform(circle, shapes))
+        self.play(
+            LaggedStart(
+                *[shape.animate.rotate(PI / 2) for shape in shapes], lag_ratio=0.2
+            )
+        )
+        self.play(FadeOut(shapes))
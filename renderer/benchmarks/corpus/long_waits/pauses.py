@@ -0,0 +1,19 @@
+from manim import *
+from text_manager import TextManager
+
+
+class ManimVideo(Scene):
+    def construct(self):
+        text_manager = TextManager(self)
+
+        text_manager.add_title("Take a Moment")
+        text_manager.add_text("Think about what happens when you double the radius.")
+        self.wait(5)
+
+        circle = Circle(radius=1, color=BLUE).shift(DOWN)
+        self.play(Create(circle))
+        self.wait(4)
+
+        self.play(circle.animate.scale(2))
+        text_manager.add_text("The area grows four times larger.")
+        self.wait(6)
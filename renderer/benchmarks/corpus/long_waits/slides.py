@@ -0,0 +1,23 @@
+from manim import *
+from text_manager import TextManager
+
+
+class ManimVideo(Scene):
+    def construct(self):
+        text_manager = TextManager(self)
+
+        slides = [
+            (
+                "Newton's First Law",
+                "An object stays at rest or in motion unless acted on by a force.",
+            ),
+            ("Newton's Second Law", "Force equals mass times acceleration."),
+            ("Newton's Third Law", "Every action has an equal and opposite reaction."),
+        ]
+        for title, text in slides:
+            text_manager.add_title(title)
+            text_manager.add_text(text)
+            self.wait(4)
+            text_manager.clear_scene()
+
+        self.wait(3)
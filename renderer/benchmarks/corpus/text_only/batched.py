@@ -0,0 +1,21 @@
+from manim import *
+from text_manager import TextManager
+
+
+class ManimVideo(Scene):
+    def construct(self):
+        text_manager = TextManager(self)
+
+        text_manager.add_title("Summary")
+        with text_manager.batch():
+            text_manager.add_text("Photosynthesis turns light into chemical energy.")
+            text_manager.add_text("It takes place in the chloroplasts of plant cells.")
+            text_manager.add_text("Carbon dioxide and water are turned into glucose.")
+            text_manager.add_text("Oxygen is released as a by-product.")
+            text_manager.add_equation(r"6CO_2 + 6H_2O \rightarrow C_6H_{12}O_6 + 6O_2")
+            text_manager.add_text("Light reactions make ATP and NADPH.")
+            text_manager.add_text("The Calvin cycle uses them to fix carbon.")
+            text_manager.add_text("Most life on Earth depends on this process.")
+
+        self.wait(2)
+        text_manager.clear_scene()
@@ -0,0 +1,19 @@
+from manim import *
+from text_manager import TextManager
+
+
+class ManimVideo(Scene):
+    def construct(self):
+        text_manager = TextManager(self)
+
+        text_manager.add_title("What is a Function?")
+        text_manager.add_text("A function maps every input to exactly one output.")
+        text_manager.add_text("The set of all inputs is called the domain.")
+        text_manager.add_text("The set of all outputs is called the range.")
+        self.wait(1)
+
+        text_manager.clear_scene()
+        text_manager.add_title("Examples")
+        text_manager.add_text("Doubling a number is a function.")
+        text_manager.add_text("Every person has exactly one birthday.")
+        self.wait(1)
@@ -0,0 +1,21 @@
+from manim import *
+from text_manager import TextManager
+
+
+class ManimVideo(Scene):
+    def construct(self):
+        text_manager = TextManager(self)
+
+        text_manager.add_title("Summary")
+        points = [
+            "Photosynthesis turns light into chemical energy.",
+            "It takes place in the chloroplasts of plant cells.",
+            "Carbon dioxide and water are turned into glucose.",
+            "Oxygen is released as a by-product.",
+        ]
+        for point in points:
+            text_manager.add_text(point)
+            self.wait(0.5)
+
+        self.wait(2)
+        text_manager.clear_scene()
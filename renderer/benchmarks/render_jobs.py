@@ -0,0 +1,360 @@
+"""
+End-to-end render benchmark over the scene corpus, driving RenderManager._render_scene directly without RabbitMQ.
+
+Jobs are built from the scenes in benchmarks/corpus and rendered at every concurrency level from 1 to
+--max-concurrency. Each level reports per-scene latency percentiles, jobs per minute, the peak RSS of the renderer
+with its workers, and how the time was split between manim, latex, the dry run and the ffmpeg merge. Pass the JSON
+output of an earlier run to --compare to see how a change moved the numbers.
+
+Usage: python benchmarks/render_jobs.py [--max-concurrency N] [--jobs-per-level N] [--scenes-per-job N]
+       [--quality medium] [--preview] [--warm-cache] [--output results.json] [--compare baseline.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+CORPUS_DIR = Path(__file__).resolve().parent / "corpus"
+
+# Everything the renderer writes goes to a scratch directory, set before the renderer modules read their settings
+SCRATCH_DIR = Path(tempfile.mkdtemp(prefix="eduwiz-benchmark-"))
+for variable, path in {
+    "OUTPUT_PATH": "videos",
+    "TEMP_DIR": "temp",
+    "SCENE_CACHE_DIR": "cache/scenes",
+    "JOB_WORKSPACE_DIR": "cache/jobs",
+    "TEX_CACHE_DIR": "cache/tex",
+    "RENDER_HISTORY_DIR": "cache/render_history",
+}.items():
+    os.environ.setdefault(variable, str(SCRATCH_DIR / path))
+
+# Every scene is rendered by this process, with fan-out they would be timed on whichever replica took them
+os.environ["SCENE_FANOUT"] = "false"
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import merge  # noqa: E402
+from cache import manim_version  # noqa: E402
+from governor import process_tree_rss_mb  # noqa: E402
+from manager import RenderManager  # noqa: E402
+from utils import SCENE_SLOTS  # noqa: E402
+
+PERCENTILES = (50, 90, 95, 99)
+
+# Stage of the render each timed RenderManager method is accounted to
+STAGES = {
+    "_render_single_scene": "manim",
+    "_precompile_tex": "latex",
+    "_dry_run_scenes": "dry_run",
+    "_merge_scenes": "merge",
+}
+
+
+def load_corpus() -> list[tuple[str, str]]:
+    """Every scene of the corpus as (category/name, code), in a stable order."""
+    return [
+        (f"{path.parent.name}/{path.stem}", path.read_text())
+        for path in sorted(CORPUS_DIR.glob("*/*.py"))
+    ]
+
+
+def build_jobs(
+    corpus: list[tuple[str, str]], count: int, scenes_per_job: int, unique: bool
+) -> list[list[str]]:
+    """
+    Build jobs by walking the corpus round robin so every job mixes categories. Unless the cache is meant to be
+    warm, every scene is tagged with a comment so no two scenes share a render cache entry.
+    """
+    jobs = []
+    for job_idx in range(count):
+        scenes = []
+        for scene_idx in range(scenes_per_job):
+            name, code = corpus[(job_idx * scenes_per_job + scene_idx) % len(corpus)]
+            if unique:
+                code = f"# benchmark {uuid.uuid4().hex} {name}\n{code}"
+            scenes.append(code)
+        jobs.append(scenes)
+    return jobs
+
+
+def percentiles(values: list[float]) -> dict:
+    if not values:
+        return {}
+    ordered = sorted(values)
+    summary = {
+        f"p{p}": round(ordered[min(len(ordered) - 1, len(ordered) * p // 100)], 3)
+        for p in PERCENTILES
+    }
+    summary["mean"] = round(sum(ordered) / len(ordered), 3)
+    summary["count"] = len(ordered)
+    return summary
+
+
+class Instruments:
+    """
+    Times the stages of every render by wrapping the RenderManager's methods, and stubs out the RabbitMQ publishing
+    so status updates and retries are only recorded.
+    """
+
+    def __init__(self, manager: RenderManager):
+        self.manager = manager
+        self.reset()
+
+        for method, stage in STAGES.items():
+            self._time(method, stage)
+        self._time_scene_latency()
+
+        # Scenes are appended to the merge while the job renders, which is merge time as well
+        original_add_scene = merge.SceneMerger.add_scene
+        instruments = self
+
+        async def add_scene(merger, idx, video_file):
+            started = time.perf_counter()
+            try:
+                return await original_add_scene(merger, idx, video_file)
+            finally:
+                instruments.stages["merge"] += time.perf_counter() - started
+
+        merge.SceneMerger.add_scene = add_scene
+
+        async def send_status_update(job_id, status, eta_seconds=None):
+            self.statuses.append((job_id, status))
+
+        async def error_handler(job_id, scenes, quality=None, preview_quality=None):
+            self.failed_scenes.extend(error for error, _ in scenes if error is not None)
+
+        manager.send_status_update = send_status_update
+        manager.error_handler = error_handler
+
+    def reset(self):
+        self.scene_latency: list[float] = []
+        self.stages = {stage: 0.0 for stage in STAGES.values()}
+        self.statuses: list[tuple[str, str]] = []
+        self.failed_scenes: list[str] = []
+        self.peak_rss_mb = 0
+
+    def _time(self, method: str, stage: str):
+        original = getattr(self.manager, method)
+
+        async def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await original(*args, **kwargs)
+            finally:
+                self.stages[stage] += time.perf_counter() - started
+
+        setattr(self.manager, method, timed)
+
+    def _time_scene_latency(self):
+        original = self.manager._render_scheduled_scene
+
+        async def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await original(*args, **kwargs)
+            finally:
+                self.scene_latency.append(time.perf_counter() - started)
+
+        self.manager._render_scheduled_scene = timed
+
+    async def sample_rss(self, interval: float = 0.25):
+        """Track the peak resident memory of this process and every worker and manim process under it."""
+        while True:
+            rss_mb = await asyncio.to_thread(process_tree_rss_mb, os.getpid())
+            self.peak_rss_mb = max(self.peak_rss_mb, rss_mb)
+            await asyncio.sleep(interval)
+
+
+async def run_level(
+    manager: RenderManager,
+    instruments: Instruments,
+    jobs: list[list[str]],
+    concurrency: int,
+    args: argparse.Namespace,
+) -> dict:
+    instruments.reset()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_job(job_idx: int, scene_codes: list[str]) -> bool:
+        async with semaphore:
+            try:
+                await manager._render_scene(
+                    f"benchmark-c{concurrency}-{job_idx}-{uuid.uuid4().hex[:8]}",
+                    scene_codes,
+                    quality=args.quality,
+                    preview_quality=args.preview_quality,
+                )
+                return True
+            except Exception as e:
+                print(f"Job {job_idx} failed: {e}", file=sys.stderr)
+                return False
+
+    sampler = asyncio.create_task(instruments.sample_rss())
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *[run_job(job_idx, scene_codes) for job_idx, scene_codes in enumerate(jobs)]
+    )
+    wall_seconds = time.perf_counter() - started
+    sampler.cancel()
+
+    completed = sum(results)
+    stage_total = sum(instruments.stages.values())
+    return {
+        "concurrency": concurrency,
+        "jobs": len(jobs),
+        "completed_jobs": completed,
+        "failed_scenes": len(instruments.failed_scenes),
+        "wall_seconds": round(wall_seconds, 2),
+        "jobs_per_minute": round(completed / wall_seconds * 60, 3),
+        "scene_latency_seconds": percentiles(instruments.scene_latency),
+        "peak_rss_mb": instruments.peak_rss_mb,
+        "stage_seconds": {
+            stage: round(seconds, 2) for stage, seconds in instruments.stages.items()
+        },
+        "stage_share": {
+            stage: round(seconds / stage_total, 3) if stage_total else 0.0
+            for stage, seconds in instruments.stages.items()
+        },
+    }
+
+
+def compare(results: dict, baseline: dict) -> list[dict]:
+    """Relative change of the headline numbers of every concurrency level present in both runs."""
+
+    def change(new: float | None, old: float | None) -> float | None:
+        if new is None or not old:
+            return None
+        return round((new - old) / old, 3)
+
+    baseline_levels = {level["concurrency"]: level for level in baseline["levels"]}
+    comparison = []
+    for level in results["levels"]:
+        old = baseline_levels.get(level["concurrency"])
+        if old is None:
+            continue
+        comparison.append(
+            {
+                "concurrency": level["concurrency"],
+                "jobs_per_minute": change(
+                    level["jobs_per_minute"], old["jobs_per_minute"]
+                ),
+                "scene_latency_p50": change(
+                    level["scene_latency_seconds"].get("p50"),
+                    old["scene_latency_seconds"].get("p50"),
+                ),
+                "scene_latency_p95": change(
+                    level["scene_latency_seconds"].get("p95"),
+                    old["scene_latency_seconds"].get("p95"),
+                ),
+                "peak_rss_mb": change(level["peak_rss_mb"], old["peak_rss_mb"]),
+            }
+        )
+    return comparison
+
+
+async def benchmark(args: argparse.Namespace) -> dict:
+    corpus = load_corpus()
+    manager = RenderManager()
+    instruments = Instruments(manager)
+
+    try:
+        if args.warmup:
+            # Start the warm workers and fill the tex format caches outside of the measured levels
+            await run_level(
+                manager,
+                instruments,
+                build_jobs(corpus, 1, args.scenes_per_job, unique=True),
+                1,
+                args,
+            )
+
+        levels = []
+        for concurrency in range(1, args.max_concurrency + 1):
+            jobs = build_jobs(
+                corpus,
+                args.jobs_per_level or concurrency * 2,
+                args.scenes_per_job,
+                unique=not args.warm_cache,
+            )
+            level = await run_level(manager, instruments, jobs, concurrency, args)
+            print(
+                f"Concurrency {concurrency}: {level['jobs_per_minute']} jobs/min, "
+                f"p50 scene latency {level['scene_latency_seconds'].get('p50')}s",
+                file=sys.stderr,
+            )
+            levels.append(level)
+    finally:
+        manager.worker_pool.close()
+
+    return {
+        "machine": {
+            "cpu_count": os.cpu_count(),
+            "scene_slots": SCENE_SLOTS,
+            "manim_workers": manager.worker_pool.size,
+            "manim_version": manim_version(),
+        },
+        "config": {
+            "quality": args.quality,
+            "preview_quality": args.preview_quality,
+            "scenes_per_job": args.scenes_per_job,
+            "warm_cache": args.warm_cache,
+            "corpus": [name for name, _ in corpus],
+        },
+        "levels": levels,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-concurrency", type=int, default=4)
+    parser.add_argument(
+        "--jobs-per-level",
+        type=int,
+        default=0,
+        help="jobs rendered at every level, twice the concurrency by default",
+    )
+    parser.add_argument("--scenes-per-job", type=int, default=3)
+    parser.add_argument("--quality", default="medium")
+    parser.add_argument(
+        "--preview", action="store_true", help="render the low quality preview first"
+    )
+    parser.add_argument(
+        "--warm-cache",
+        action="store_true",
+        help="reuse the render cache across jobs instead of rendering every scene",
+    )
+    parser.add_argument("--no-warmup", dest="warmup", action="store_false")
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--compare", type=Path)
+    parser.add_argument(
+        "--keep", action="store_true", help="keep the scratch directory"
+    )
+    args = parser.parse_args()
+    args.preview_quality = "low" if args.preview else None
+
+    try:
+        results = asyncio.run(benchmark(args))
+    finally:
+        if args.keep:
+            print(f"Kept scratch directory {SCRATCH_DIR}", file=sys.stderr)
+        else:
+            shutil.rmtree(SCRATCH_DIR, ignore_errors=True)
+
+    if args.compare:
+        results["comparison"] = compare(results, json.loads(args.compare.read_text()))
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        args.output.write_text(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+Simulated job completion times of the scene scheduler's cost-aware ordering against first-in first-out, and against
+starting the longest predicted scenes first regardless of their job.
+
+Job mixes are replayed from the render history the cost model records (every job's scenes with their predicted and
+actual render seconds), or built from the scene corpus with the cost model's prior when there is no history. Jobs
+arrive as a Poisson process at the given load and share --slots scene slots, at most --job-limit jobs at a time.
+Scenes are ordered by their predicted render time but take their actual one, so prediction errors count against the
+cost-aware policies. Every policy replays the same arrivals, the cost-aware one both with and without aging.
+
+Usage: python benchmarks/scheduling.py [--history render_history/<node>.jsonl] [--jobs N] [--load 0.9] [--slots N]
+       [--job-limit N] [--aging-rate R] [--seed N] [--output results.json]
+"""
+
+import argparse
+import heapq
+import json
+import os
+import random
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cost_model import HISTORY_FILE  # noqa: E402
+from scheduler import SCENE_AGING_RATE, scene_rank  # noqa: E402
+from utils import JOB_LIMIT, SCENE_SLOTS  # noqa: E402
+
+CORPUS_DIR = Path(__file__).resolve().parent / "corpus"
+PERCENTILES = (50, 95, 99)
+
+# Spread of actual over predicted render time of the corpus scenes, which have no recorded renders
+CORPUS_ERROR_SIGMA = 0.3
+
+
+def load_history(history_file: Path) -> list[list[tuple[float, float]]]:
+    """The scenes of every job in the render history as (predicted, actual) seconds, latest attempt of each scene."""
+    scenes: dict[str, dict[int, tuple[float, float]]] = defaultdict(dict)
+    with open(history_file) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                if record["outcome"] == "rendered" and record.get("predicted"):
+                    scenes[record["job_id"]][record["idx"]] = (
+                        record["predicted"],
+                        record["actual"],
+                    )
+            except (ValueError, KeyError, TypeError):
+                continue
+    return [[job[idx] for idx in sorted(job)] for job in scenes.values() if job]
+
+
+def corpus_jobs(rng: random.Random, count: int) -> list[list[tuple[float, float]]]:
+    """Jobs of one to six corpus scenes, predicted with the prior and rendered with a lognormal error."""
+    from analysis import scene_features
+    from cost_model import RenderCostModel
+
+    cost_model = RenderCostModel(Path(os.devnull))
+    predicted = [
+        cost_model.predict(scene_features(path.read_text()), "-qm")
+        for path in sorted(CORPUS_DIR.glob("*/*.py"))
+    ]
+    return [
+        [
+            (seconds, seconds * rng.lognormvariate(0, CORPUS_ERROR_SIGMA))
+            for seconds in rng.choices(predicted, k=rng.randint(1, 6))
+        ]
+        for _ in range(count)
+    ]
+
+
+def simulate(
+    jobs: list[list[tuple[float, float]]],
+    arrivals: list[float],
+    slots: int,
+    job_limit: int,
+    policy: str,
+    aging_rate: float,
+) -> list[float]:
+    """Completion time of every job, from its arrival until its last scene finished, under one policy."""
+    events = [
+        (arrival, 0, "arrive", job_idx) for job_idx, arrival in enumerate(arrivals)
+    ]
+    heapq.heapify(events)
+    sequence = len(events)
+
+    queued_jobs: list[int] = []
+    # Scenes waiting for a slot as (predicted, actual, enqueued at, arrival, job)
+    waiting: list[tuple[float, float, float, int, int]] = []
+    remaining = [len(job) for job in jobs]
+    completion = [0.0] * len(jobs)
+    running_jobs = 0
+    free_slots = slots
+    scene_arrivals = 0
+
+    def rank(scene: tuple, now: float) -> tuple:
+        predicted, _, _, arrival, job_idx = scene
+        if policy == "fifo":
+            return (arrival,)
+        if policy == "longest_first":
+            return -predicted, arrival
+        return (
+            *scene_rank(
+                0,
+                job_seconds[job_idx],
+                now - job_since[job_idx],
+                predicted,
+                aging_rate,
+            ),
+            arrival,
+        )
+
+    while events:
+        now, _, kind, value = heapq.heappop(events)
+        if kind == "arrive":
+            queued_jobs.append(value)
+        else:
+            free_slots += 1
+            remaining[value] -= 1
+            if not remaining[value]:
+                completion[value] = now - arrivals[value]
+                running_jobs -= 1
+
+        while queued_jobs and running_jobs < job_limit:
+            job_idx = queued_jobs.pop(0)
+            running_jobs += 1
+            for predicted, actual in jobs[job_idx]:
+                waiting.append((predicted, actual, now, scene_arrivals, job_idx))
+                scene_arrivals += 1
+
+        while waiting and free_slots:
+            job_seconds: dict[int, float] = defaultdict(float)
+            job_since: dict[int, float] = {}
+            for predicted, _, enqueued, _, job_idx in waiting:
+                job_seconds[job_idx] += predicted
+                job_since[job_idx] = min(job_since.get(job_idx, enqueued), enqueued)
+
+            scene = min(waiting, key=lambda scene: rank(scene, now))
+            waiting.remove(scene)
+            free_slots -= 1
+            _, actual, _, _, job_idx = scene
+            sequence += 1
+            heapq.heappush(events, (now + actual, sequence, "finish", job_idx))
+
+    return completion
+
+
+def summarize(completion: list[float]) -> dict:
+    ordered = sorted(completion)
+    summary = {
+        f"p{p}": round(ordered[min(len(ordered) - 1, len(ordered) * p // 100)], 2)
+        for p in PERCENTILES
+    }
+    summary["mean"] = round(sum(ordered) / len(ordered), 2)
+    summary["max"] = round(ordered[-1], 2)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--history", type=Path, default=HISTORY_FILE)
+    parser.add_argument("--jobs", type=int, default=500)
+    parser.add_argument(
+        "--load",
+        type=float,
+        default=0.9,
+        help="offered render seconds per second of scene slot capacity",
+    )
+    parser.add_argument("--slots", type=int, default=SCENE_SLOTS)
+    parser.add_argument("--job-limit", type=int, default=JOB_LIMIT)
+    parser.add_argument("--aging-rate", type=float, default=SCENE_AGING_RATE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    mixes = load_history(args.history) if args.history.exists() else []
+    source = str(args.history) if mixes else "corpus"
+    jobs = (
+        [rng.choice(mixes) for _ in range(args.jobs)]
+        if mixes
+        else corpus_jobs(rng, args.jobs)
+    )
+
+    mean_work = sum(actual for job in jobs for _, actual in job) / len(jobs)
+    rate = args.load * args.slots / mean_work
+    arrivals = []
+    clock = 0.0
+    for _ in jobs:
+        clock += rng.expovariate(rate)
+        arrivals.append(clock)
+
+    policies = {
+        "fifo": ("fifo", 0.0),
+        "longest_first": ("longest_first", 0.0),
+        "cost_aware": ("cost_aware", 0.0),
+        "cost_aware_aging": ("cost_aware", args.aging_rate),
+    }
+    results = {
+        "config": {
+            "source": source,
+            "jobs": len(jobs),
+            "load": args.load,
+            "slots": args.slots,
+            "job_limit": args.job_limit,
+            "aging_rate": args.aging_rate,
+            "seed": args.seed,
+        },
+        "job_completion_seconds": {
+            policy: summarize(
+                simulate(
+                    jobs,
+                    arrivals,
+                    args.slots,
+                    args.job_limit,
+                    ordering,
+                    aging_rate,
+                )
+            )
+            for policy, (ordering, aging_rate) in policies.items()
+        },
+    }
+
+    fifo = results["job_completion_seconds"]["fifo"]
+    for policy, summary in results["job_completion_seconds"].items():
+        print(
+            f"{policy}: mean {summary['mean']}s ({summary['mean'] / fifo['mean'] - 1:+.1%}), "
+            f"p95 {summary['p95']}s ({summary['p95'] / fifo['p95'] - 1:+.1%}), max {summary['max']}s",
+            file=sys.stderr,
+        )
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        args.output.write_text(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Per-expression Tex/MathTex compile time with manim's default template versus the precompiled format.
+
+Usage: python benchmarks/tex_compile.py [--repeat N] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from manim import config  # noqa: E402
+from manim.utils import tex_file_writing  # noqa: E402
+
+from tex_format import precompiled_template  # noqa: E402
+
+# Mirrors what TextManager builds: titles and lines go through Tex ("center"), equations through MathTex ("align*")
+EXPRESSIONS = [
+    ("center", "The Pythagorean Theorem"),
+    ("center", "In a right triangle, the square of the hypotenuse"),
+    ("center", "equals the sum of the squares of the other two sides."),
+    ("align*", "a^2 + b^2 = c^2"),
+    ("align*", r"\int_0^1 x^2 \, dx = \frac{1}{3}"),
+    ("align*", r"\sum_{n=1}^{\infty} \frac{1}{n^2} = \frac{\pi^2}{6}"),
+    ("align*", r"e^{i\pi} + 1 = 0"),
+    ("align*", r"\frac{d}{dx} \sin(x) = \cos(x)"),
+]
+
+
+def time_compiles(tex_template, repeat: int) -> list[float]:
+    """Compile every expression from scratch repeat times, returning the durations in milliseconds."""
+    durations = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tex_dir:
+            config.tex_dir = tex_dir
+            for environment, expression in EXPRESSIONS:
+                start = time.perf_counter()
+                tex_file_writing.tex_to_svg_file(
+                    expression, environment=environment, tex_template=tex_template
+                )
+                durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def summarize(durations: list[float]) -> dict:
+    ordered = sorted(durations)
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.mean(ordered),
+        "p50_ms": ordered[len(ordered) // 2],
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    default_template = config.tex_template
+    with tempfile.TemporaryDirectory() as format_dir:
+        format_template = precompiled_template(default_template, Path(format_dir))
+        if format_template is None:
+            raise SystemExit("Failed to build the tex format")
+
+        os.environ["TEXFORMATS"] = f"{format_dir}{os.pathsep}"
+
+        results = {
+            "default": summarize(time_compiles(default_template, args.repeat)),
+            "precompiled": summarize(time_compiles(format_template, args.repeat)),
+        }
+
+    results["speedup"] = (
+        results["default"]["mean_ms"] / results["precompiled"]["mean_ms"]
+    )
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        args.output.write_text(output)
+
+
+if __name__ == "__main__":
+    main()
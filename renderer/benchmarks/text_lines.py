@@ -0,0 +1,116 @@
+"""
+Per-line build time of the TextManager titles and text lines of the text scene corpus, compiled with Tex versus set
+with Pango through the plain text fast path.
+
+Every line is built from a cold tex and text cache. Tex is timed both with manim's default template and with the
+precompiled format the renderer installs, only the lines which qualify for the fast path are timed.
+
+Usage: python benchmarks/text_lines.py [--repeat N] [--output results.json]
+"""
+
+import argparse
+import ast
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from manim import Tex, config  # noqa: E402
+
+import tex_format  # noqa: E402
+from plain_text import plain_text_markup  # noqa: E402
+from text_manager import TextManager  # noqa: E402
+
+CORPUS_DIR = Path(__file__).resolve().parent / "corpus" / "text_only"
+
+# Font size of every TextManager line method taking text
+FONT_SIZES = {"add_title": 60, "add_text": 36}
+
+
+def corpus_lines() -> list[tuple[str, int]]:
+    """Every literal title and text line of the text corpus as (line, font size)."""
+    lines = []
+    for path in sorted(CORPUS_DIR.glob("*.py")):
+        for node in ast.walk(ast.parse(path.read_text())):
+            if (
+                isinstance(node, ast.Call)
+                and isinstance(node.func, ast.Attribute)
+                and node.func.attr in FONT_SIZES
+                and len(node.args) == 1
+                and isinstance(node.args[0], ast.Constant)
+                and isinstance(node.args[0].value, str)
+            ):
+                lines.append((node.args[0].value, FONT_SIZES[node.func.attr]))
+    return lines
+
+
+def time_builds(build, lines: list[tuple[str, int]], repeat: int) -> list[float]:
+    """Build every line from scratch repeat times, returning the durations in milliseconds."""
+    durations = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            config.tex_dir = str(Path(cache_dir) / "tex")
+            config.text_dir = str(Path(cache_dir) / "texts")
+            for line, font_size in lines:
+                start = time.perf_counter()
+                build(line, font_size)
+                durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def summarize(durations: list[float]) -> dict:
+    ordered = sorted(durations)
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.mean(ordered),
+        "p50_ms": ordered[len(ordered) // 2],
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    lines = corpus_lines()
+    plain = [
+        (line, size) for line, size in lines if plain_text_markup(line) is not None
+    ]
+    text_manager = TextManager(None)
+
+    def build_tex(line: str, font_size: int):
+        Tex(line, font_size=font_size)
+
+    results = {
+        "lines": len(lines),
+        "plain_lines": len(plain),
+        "pango": summarize(time_builds(text_manager._text, plain, args.repeat)),
+        "tex_default": summarize(time_builds(build_tex, plain, args.repeat)),
+    }
+
+    with tempfile.TemporaryDirectory() as format_dir:
+        if tex_format.install(Path(format_dir)):
+            results["tex_precompiled"] = summarize(
+                time_builds(build_tex, plain, args.repeat)
+            )
+
+    for tex in ("tex_default", "tex_precompiled"):
+        if tex in results:
+            results[f"speedup_over_{tex}"] = (
+                results[tex]["mean_ms"] / results["pango"]["mean_ms"]
+            )
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        args.output.write_text(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import hashlib
+import logging
+import os
+import shutil
+from importlib import metadata
+from pathlib import Path
+
+logger = logging.getLogger("eduwiz.cache")
+
+# Modules imported by generated scenes, a change to any of them must invalidate their renders
+SCENE_LIBRARY_PATHS = [
+    Path(__file__).parent / "text_manager.py",
+    Path(__file__).parent / "plain_text.py",
+]
+
+
+def manim_version() -> str:
+    try:
+        return metadata.version("manim")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def normalize_code(code: str) -> str:
+    """Normalize scene code so that whitespace-only differences map to the same cache entry."""
+    lines = [line.rstrip() for line in code.replace("\r\n", "\n").split("\n")]
+    return "\n".join(lines).strip("\n")
+
+
+def link_or_copy(source: Path, destination: Path):
+    """Hard link source to destination, copying instead when they are on different filesystems."""
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+class SceneCache:
+    """
+    Content addressed cache of rendered scene videos.
+    Entries are keyed by the normalized scene code and the render settings, stored as <key>.mp4 and evicted least
+    recently used first once the cache grows over max_bytes. The file mtime is used as the access time so several
+    renderer processes can share the same directory.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        library = hashlib.sha256()
+        for path in SCENE_LIBRARY_PATHS:
+            try:
+                library.update(path.read_bytes())
+            except OSError:
+                pass
+        self._environment = f"{manim_version()}:{library.hexdigest()}"
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, code: str, quality: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(self._environment.encode())
+        digest.update(b"\0")
+        digest.update(quality.encode())
+        digest.update(b"\0")
+        digest.update(normalize_code(code).encode())
+        return digest.hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.mp4"
+
+    def contains(self, key: str) -> bool:
+        return self._entry(key).exists()
+
+    def get(self, key: str, destination: Path) -> Path | None:
+        """Place the cached video for key at destination and return it, or None on a miss."""
+        entry = self._entry(key)
+        try:
+            link_or_copy(entry, destination)
+            os.utime(entry)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except OSError as e:
+            logger.warning(f"Failed to read scene cache entry {key}: {e}")
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return destination
+
+    def put(self, key: str, video_file: Path):
+        """Store a rendered video under key, then evict old entries if the cache is over its size limit."""
+        entry = self._entry(key)
+        temp_entry = self.cache_dir / f".{key}.{os.getpid()}.tmp"
+        try:
+            link_or_copy(video_file, temp_entry)
+            os.replace(temp_entry, entry)
+        except OSError as e:
+            logger.warning(f"Failed to store scene cache entry {key}: {e}")
+            temp_entry.unlink(missing_ok=True)
+            return
+
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob("*.mp4"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self.evictions += 1
+
+    def size_bytes(self) -> int:
+        total = 0
+        for path in self.cache_dir.glob("*.mp4"):
+            try:
+                total += path.stat().st_size
+            except FileNotFoundError:
+                continue
+        return total
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "size_bytes": self.size_bytes(),
+            "max_bytes": self.max_bytes,
+        }
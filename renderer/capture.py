@@ -0,0 +1,142 @@
+import codecs
+import os
+import re
+from collections import deque
+from typing import Awaitable, Callable
+
+# Lines kept of each pipe of a scene process, whatever it prints before them is dropped
+SCENE_OUTPUT_LINES = int(os.getenv("SCENE_OUTPUT_LINES", "200"))
+MAX_LINE_CHARS = 1000
+READ_SIZE = 64 * 1024
+
+# Lines of the exception message and of output without a traceback passed on for the retry
+MAX_MESSAGE_LINES = 10
+TAIL_LINES = 20
+
+# Progress bars redraw themselves with carriage returns, every redraw counts as a line
+LINE_BREAK = re.compile(r"\r\n|\r|\n")
+
+TRACEBACK_HEADER = "Traceback (most recent call last)"
+# Frames as printed by traceback.print_exc and by the rich traceback of the manim CLI
+PLAIN_FRAME = re.compile(
+    r'File "(?:[^"]*/)?(?P<file>[^"/]+)", line (?P<line>\d+), in (?P<func>\S+)'
+)
+RICH_FRAME = re.compile(r"(?P<file>[^\s/:│]+):(?P<line>\d+) in (?P<func>[^\s│]+)")
+TEX_ERROR = re.compile(r"LaTeX compilation error|^! ")
+
+
+class OutputCapture:
+    """
+    Keeps the last max_lines lines written to one of a scene process's pipes, so the memory held for a scene stays
+    the same however much manim prints. Lines longer than MAX_LINE_CHARS are cut.
+    """
+
+    def __init__(self, max_lines: int = SCENE_OUTPUT_LINES):
+        self.lines: deque[str] = deque(maxlen=max_lines)
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._partial = ""
+
+    async def drain(
+        self, stream, on_line: Callable[[str], Awaitable[None]] | None = None
+    ):
+        """Read the stream until it closes, passing every line to on_line as it arrives."""
+        while True:
+            chunk = await stream.read(READ_SIZE)
+            final = not chunk
+            text = self._partial + self._decoder.decode(chunk, final=final)
+            *complete, self._partial = LINE_BREAK.split(text)
+            if final and self._partial:
+                complete.append(self._partial)
+                self._partial = ""
+            elif len(self._partial) > MAX_LINE_CHARS:
+                complete.append(self._partial)
+                self._partial = ""
+
+            for line in complete:
+                line = line.rstrip()[:MAX_LINE_CHARS]
+                self.lines.append(line)
+                if on_line is not None:
+                    await on_line(line)
+
+            if final:
+                return
+
+
+def distill_traceback(lines: list[str], code: str, script_name: str) -> str | None:
+    """
+    Reduce output containing a Python traceback to its final exception and the line of the scene's code it was
+    raised from, or None when the output has no traceback.
+    """
+    start = next(
+        (
+            idx
+            for idx in range(len(lines) - 1, -1, -1)
+            if TRACEBACK_HEADER in lines[idx]
+        ),
+        None,
+    )
+    if start is None:
+        return None
+
+    # Walk the frames up to the exception, which follows the closing border of a rich traceback or the indented
+    # frames of a plain one
+    frames = []
+    idx = start + 1
+    if lines[start].lstrip().startswith("╭"):
+        while idx < len(lines) and not lines[idx].lstrip().startswith("╰"):
+            frames.extend(RICH_FRAME.finditer(lines[idx]))
+            idx += 1
+        idx += 1
+    else:
+        while idx < len(lines) and (
+            lines[idx].startswith((" ", "\t")) or not lines[idx].strip()
+        ):
+            frames.extend(PLAIN_FRAME.finditer(lines[idx]))
+            idx += 1
+
+    message = []
+    for line in lines[idx:]:
+        if not line.strip() or len(message) == MAX_MESSAGE_LINES:
+            break
+        message.append(line)
+
+    distilled = ["Scene failed while rendering:"]
+    scene_frames = [frame for frame in frames if frame["file"] == script_name]
+    if scene_frames:
+        line_number = int(scene_frames[-1]["line"])
+        code_lines = code.splitlines()
+        source = (
+            code_lines[line_number - 1].strip()
+            if 0 < line_number <= len(code_lines)
+            else ""
+        )
+        distilled.append(
+            f"Line {line_number} in {scene_frames[-1]['func']}: {source}".rstrip()
+        )
+    distilled.extend(message or ["The scene raised an exception without a message"])
+    return "\n".join(distilled)
+
+
+def failure_message(
+    code: str, script_name: str, stderr: OutputCapture, stdout: OutputCapture
+) -> str:
+    """
+    Describe why a scene process failed for the retry: the distilled traceback with any LaTeX errors manim logged,
+    or the last lines of its output when it didn't print a traceback.
+    """
+    for capture in (stderr, stdout):
+        distilled = distill_traceback(list(capture.lines), code, script_name)
+        if distilled is None:
+            continue
+
+        tex_errors = [
+            line.strip()
+            for line in (*stdout.lines, *stderr.lines)
+            if TEX_ERROR.search(line.strip())
+        ]
+        if tex_errors:
+            distilled += "\n" + "\n".join(tex_errors[:MAX_MESSAGE_LINES])
+        return distilled
+
+    tail = list(stderr.lines)[-TAIL_LINES:] or list(stdout.lines)[-TAIL_LINES:]
+    return "\n".join(tail).strip() or "The scene process exited without any output"
@@ -0,0 +1,256 @@
+"""
+Predicts how long a scene takes to render, and the deadline it is given, from the static features of its code and
+the renders recorded on this node.
+
+Usage: python cost_model.py [history_file], prints how well the recorded predictions matched the actual durations.
+"""
+
+import fcntl
+import json
+import logging
+import time
+import os
+import socket
+import sys
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger("eduwiz.cost_model")
+
+FEATURES = ["animations", "duration_seconds", "mobjects", "tex"]
+
+# Render seconds per second of video at each quality until this node has history of its own
+PRIOR_SECONDS_PER_VIDEO_SECOND = {
+    "-ql": 0.5,
+    "-qm": 1.5,
+    "-qh": 4.0,
+    "-qp": 6.0,
+    "-qk": 12.0,
+}
+PRIOR_OVERHEAD_SECONDS = 10.0
+PRIOR_TEX_SECONDS = 0.5
+
+# Renders of a quality needed before its fitted model replaces the prior
+MIN_SAMPLES = int(os.getenv("COST_MODEL_MIN_SAMPLES", "20"))
+HISTORY_SIZE = int(os.getenv("COST_MODEL_HISTORY_SIZE", "500"))
+# Records kept in the history file, which is trimmed back to them once it has grown to twice as many
+HISTORY_RECORDS = HISTORY_SIZE * len(PRIOR_SECONDS_PER_VIDEO_SECOND)
+
+# Every node keeps its own history on the shared volume since render times depend on the machine they were measured
+# on. NODE_NAME should be set by the deployment, a container's hostname changes every time it is recreated.
+NODE_NAME = os.getenv("NODE_NAME") or socket.gethostname()
+HISTORY_DIR = Path(os.getenv("RENDER_HISTORY_DIR", "/shared/cache/render_history"))
+HISTORY_FILE = HISTORY_DIR / f"{NODE_NAME}.jsonl"
+# Histories of nodes which haven't recorded a render for this long are swept
+HISTORY_TTL = int(os.getenv("RENDER_HISTORY_TTL", str(30 * 24 * 3600)))
+
+# Deadline of a scene as a multiple of its predicted render time plus a fixed slack, clamped to the bounds
+TIMEOUT_FACTOR = float(os.getenv("SCENE_TIMEOUT_FACTOR", "3"))
+TIMEOUT_SLACK = int(os.getenv("SCENE_TIMEOUT_SLACK", "20"))
+TIMEOUT_MIN = int(os.getenv("SCENE_TIMEOUT_MIN", "30"))
+TIMEOUT_MAX = int(os.getenv("SCENE_TIMEOUT_MAX", "900"))
+
+RIDGE_PENALTY = 1.0
+
+
+def _vector(features: dict) -> list[float]:
+    return [1.0] + [float(features.get(name, 0)) for name in FEATURES]
+
+
+class RenderCostModel:
+    """
+    Linear model of render seconds over the static scene features, fitted per quality with ridge regression on the
+    most recent successful renders of this node. Every prediction is appended with its outcome to history_file as a
+    JSON line, which is also what the model is rebuilt from after a restart. Only the last HISTORY_RECORDS lines of
+    the file are kept. Every renderer process of a node shares its file, writes to it are serialized with a lock file.
+    """
+
+    def __init__(self, history_file: Path):
+        self.history_file = history_file
+        self._lock_file = history_file.with_name(f".{history_file.name}.lock")
+        self._samples: dict[str, deque] = {}
+        self._coefficients: dict[str, np.ndarray | None] = {}
+
+        self._outcomes: dict[str, int] = {}
+        self._errors: deque = deque(maxlen=HISTORY_SIZE)
+        # Lines in the history file, to know when it is due to be trimmed
+        self._records = 0
+
+        self.history_file.parent.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        # Only the tail of the file is held while it is read
+        lines: deque = deque(maxlen=HISTORY_RECORDS)
+        try:
+            with open(self.history_file) as f:
+                for line in f:
+                    lines.append(line)
+                    self._records += 1
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logger.warning(f"Failed to read render history {self.history_file}: {e}")
+            return
+
+        for line in lines:
+            try:
+                self._add(json.loads(line))
+            except (ValueError, KeyError, TypeError):
+                continue
+
+        logger.info(
+            f"Loaded {sum(len(s) for s in self._samples.values())} renders from {self.history_file}"
+        )
+
+    def _add(self, record: dict):
+        outcome = record["outcome"]
+        self._outcomes[outcome] = self._outcomes.get(outcome, 0) + 1
+        if outcome != "rendered":
+            return
+
+        quality = record["quality"]
+        self._samples.setdefault(quality, deque(maxlen=HISTORY_SIZE)).append(
+            (_vector(record["features"]), record["actual"])
+        )
+        self._coefficients.pop(quality, None)
+        if record.get("predicted"):
+            self._errors.append(
+                abs(record["actual"] - record["predicted"]) / max(record["actual"], 1.0)
+            )
+
+    def _fit(self, quality: str) -> np.ndarray | None:
+        if quality in self._coefficients:
+            return self._coefficients[quality]
+
+        coefficients = None
+        samples = self._samples.get(quality, ())
+        if len(samples) >= MIN_SAMPLES:
+            x = np.array([vector for vector, _ in samples])
+            y = np.array([actual for _, actual in samples])
+
+            # Ridge rows keep the fit stable while features barely vary, the intercept is left unpenalized
+            penalty = np.sqrt(RIDGE_PENALTY) * np.eye(x.shape[1])[1:]
+            x = np.vstack([x, penalty])
+            y = np.concatenate([y, np.zeros(len(penalty))])
+            coefficients, *_ = np.linalg.lstsq(x, y, rcond=None)
+
+        self._coefficients[quality] = coefficients
+        return coefficients
+
+    def predict(self, features: dict, quality: str) -> float:
+        """Predicted render seconds of a scene with the given features at a quality flag."""
+        coefficients = self._fit(quality)
+        if coefficients is not None:
+            predicted = float(np.dot(coefficients, _vector(features)))
+        else:
+            predicted = (
+                PRIOR_OVERHEAD_SECONDS
+                + PRIOR_SECONDS_PER_VIDEO_SECOND.get(quality, 1.5)
+                * features.get("duration_seconds", 0)
+                + PRIOR_TEX_SECONDS * features.get("tex", 0)
+            )
+        return max(1.0, predicted)
+
+    def timeout(self, predicted: float) -> int:
+        """Deadline in seconds for a scene predicted to render in the given time."""
+        deadline = TIMEOUT_FACTOR * predicted + TIMEOUT_SLACK
+        return int(min(TIMEOUT_MAX, max(TIMEOUT_MIN, deadline)))
+
+    def record(
+        self,
+        job_id: str,
+        idx: int,
+        features: dict,
+        quality: str,
+        predicted: float,
+        timeout: int,
+        actual: float,
+        outcome: str,
+    ):
+        """
+        Record how a render went. Only renders with outcome "rendered" train the model, timeouts and failures are
+        kept in the history so the deadlines can be checked.
+        """
+        record = {
+            "job_id": job_id,
+            "idx": idx,
+            "quality": quality,
+            "features": features,
+            "predicted": round(predicted, 2),
+            "timeout": timeout,
+            "actual": round(actual, 2),
+            "outcome": outcome,
+        }
+        self._add(record)
+
+        try:
+            with self._locked():
+                with open(self.history_file, "a") as f:
+                    f.write(json.dumps(record) + "\n")
+                self._records += 1
+                if self._records >= 2 * HISTORY_RECORDS:
+                    self._trim()
+        except OSError as e:
+            logger.warning(f"Failed to record render history: {e}")
+
+    @contextmanager
+    def _locked(self):
+        """Hold the lock of the history file, so no record is appended to a file that is being replaced."""
+        with open(self._lock_file, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def _trim(self):
+        """Rewrite the history file with only its last HISTORY_RECORDS lines, replacing it atomically."""
+        with open(self.history_file) as f:
+            lines = deque(f, maxlen=HISTORY_RECORDS)
+
+        temp_file = self.history_file.with_name(f".{self.history_file.name}.tmp")
+        with open(temp_file, "w") as f:
+            f.writelines(lines)
+        os.replace(temp_file, self.history_file)
+        self._records = len(lines)
+        logger.info(
+            f"Trimmed render history {self.history_file} to {len(lines)} renders"
+        )
+
+    def stats(self) -> dict:
+        return {
+            "samples": {quality: len(s) for quality, s in self._samples.items()},
+            "fitted": sorted(
+                quality for quality in self._samples if self._fit(quality) is not None
+            ),
+            "outcomes": dict(self._outcomes),
+            "mean_relative_error": (
+                round(sum(self._errors) / len(self._errors), 3)
+                if self._errors
+                else None
+            ),
+        }
+
+
+def sweep_histories(history_dir: Path = HISTORY_DIR, ttl: int = HISTORY_TTL):
+    """Remove the history of every node which hasn't recorded a render within the ttl, along with its lock file."""
+    if not history_dir.is_dir():
+        return
+
+    cutoff = time.time() - ttl
+    for history_file in history_dir.glob("*.jsonl"):
+        try:
+            if history_file.stat().st_mtime < cutoff:
+                history_file.unlink()
+                history_file.with_name(f".{history_file.name}.lock").unlink(
+                    missing_ok=True
+                )
+                logger.info(f"Removed stale render history {history_file.name}")
+        except FileNotFoundError:
+            continue
+
+
+if __name__ == "__main__":
+    history_file = Path(sys.argv[1]) if len(sys.argv) > 1 else HISTORY_FILE
+    print(json.dumps(RenderCostModel(history_file).stats(), indent=2))
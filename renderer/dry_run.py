@@ -0,0 +1,68 @@
+import logging
+import os
+
+logger = logging.getLogger("eduwiz.dry_run")
+
+DRY_RUN_SCENES = os.getenv("DRY_RUN_SCENES", "true").lower() == "true"
+DRY_RUN_TIMEOUT = int(os.getenv("DRY_RUN_TIMEOUT", "120"))
+
+
+class DryRunStats:
+    """
+    Measures the render time the dry run saves on jobs it sends back for retry.
+    Without it a failed job goes through the full render of its first tier before reaching the retry queue. That
+    render is estimated as the job's slowest dry run, scaled by how much longer a render of that quality takes than
+    a dry run of the same scene on this node.
+    """
+
+    def __init__(self):
+        self.passed_scenes = 0
+        self.passed_seconds = 0.0
+        self.renders: dict[str, tuple[int, float]] = {}
+
+        self.failed_jobs = 0
+        self.estimated_jobs = 0
+        self.seconds_saved = 0.0
+
+    def record_dry_run(self, seconds: float, passed: bool):
+        # Failing dry runs stop partway through construct(), so only passing ones describe a whole scene
+        if passed:
+            self.passed_scenes += 1
+            self.passed_seconds += seconds
+
+    def record_render(self, quality: str, seconds: float):
+        count, total = self.renders.get(quality, (0, 0.0))
+        self.renders[quality] = (count + 1, total + seconds)
+
+    def record_failed_job(
+        self, quality: str, slowest_seconds: float, elapsed: float
+    ) -> float | None:
+        """Record a job stopped by the dry run, returning the estimated seconds saved if there is enough history."""
+        self.failed_jobs += 1
+
+        count, total = self.renders.get(quality, (0, 0.0))
+        if not count or not self.passed_seconds:
+            return None
+
+        ratio = (total / count) / (self.passed_seconds / self.passed_scenes)
+        saved = max(0.0, slowest_seconds * ratio - elapsed)
+
+        self.estimated_jobs += 1
+        self.seconds_saved += saved
+        return saved
+
+    def stats(self) -> dict:
+        return {
+            "failed_jobs": self.failed_jobs,
+            "seconds_saved": round(self.seconds_saved, 1),
+            "mean_seconds_saved": (
+                round(self.seconds_saved / self.estimated_jobs, 1)
+                if self.estimated_jobs
+                else None
+            ),
+            "mean_dry_run_seconds": (
+                round(self.passed_seconds / self.passed_scenes, 2)
+                if self.passed_scenes
+                else None
+            ),
+        }
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from pathlib import Path
+
+import aio_pika
+
+from rabbitmq import RabbitMQConnection
+
+logger = logging.getLogger("eduwiz.fanout")
+
+# Whether the scenes of a job are handed out to every renderer replica instead of rendered by the one that took it
+SCENE_FANOUT = os.getenv("SCENE_FANOUT", "false").lower() == "true"
+SCENES_QUEUE = "render_scenes"
+# How long a job waits for a replica to render one of its scenes, queueing included
+SCENE_RESULT_TIMEOUT = int(os.getenv("SCENE_RESULT_TIMEOUT", "3600"))
+
+# Names this renderer process in the logs of the jobs it renders scenes for, several may run on one host
+RENDERER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+class SceneDispatcher:
+    """
+    Hands the scenes of the jobs this renderer coordinates to every renderer replica through the render_scenes queue.
+    Each scene is published as a work item naming this renderer's reply queue. The replica which renders it places
+    the video in the job's workspace on the shared volume and replies with its path, or with the error the scene
+    failed with.
+    """
+
+    def __init__(self, timeout: int = SCENE_RESULT_TIMEOUT):
+        self.timeout = timeout
+        self._pending: dict[str, asyncio.Future] = {}
+        self._reply_queue = None
+
+    async def start(self):
+        rabbitmq = await RabbitMQConnection.get_instance()
+        channel = await rabbitmq.get_scene_channel()
+        self._reply_queue = await channel.declare_queue(
+            exclusive=True, auto_delete=True
+        )
+        await self._reply_queue.consume(self._on_reply, no_ack=True)
+        logger.info(f"Dispatching scenes with replies to {self._reply_queue.name}")
+
+    async def render(
+        self,
+        job_id: str,
+        tier: str,
+        idx: int,
+        scene_code: str,
+        quality: str,
+        priority: int,
+    ) -> Path | Exception:
+        """Have a replica render one scene, returning its video or the exception describing its failure."""
+        correlation_id = f"{job_id}:{tier}:{idx}:{uuid.uuid4().hex[:8]}"
+        future = asyncio.get_running_loop().create_future()
+        self._pending[correlation_id] = future
+
+        message = {
+            "job_id": job_id,
+            "tier": tier,
+            "idx": idx,
+            "code": scene_code,
+            "quality": quality,
+            "priority": priority,
+        }
+        try:
+            rabbitmq = await RabbitMQConnection.get_instance()
+            channel = await rabbitmq.get_scene_channel()
+            await channel.default_exchange.publish(
+                aio_pika.Message(
+                    body=json.dumps(message).encode(),
+                    content_type="application/json",
+                    correlation_id=correlation_id,
+                    reply_to=self._reply_queue.name,
+                ),
+                routing_key=SCENES_QUEUE,
+            )
+            reply = await asyncio.wait_for(future, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            return TimeoutError(
+                f"No renderer finished scene {idx} within {self.timeout} seconds"
+            )
+        finally:
+            self._pending.pop(correlation_id, None)
+
+        if reply.get("error") is not None:
+            return RuntimeError(reply["error"])
+        logger.info(f"Scene {idx} of job {job_id} rendered by {reply['renderer']}")
+        return Path(reply["video"])
+
+    async def _on_reply(self, message: aio_pika.abc.AbstractIncomingMessage):
+        # Replies to scenes which timed out or were delivered twice have nobody waiting for them
+        future = self._pending.get(message.correlation_id)
+        if future is None or future.done():
+            return
+        try:
+            future.set_result(json.loads(message.body.decode()))
+        except ValueError as e:
+            future.set_result({"error": f"Unreadable scene result: {e}"})
+
+
+async def send_scene_result(
+    message: aio_pika.abc.AbstractIncomingMessage, result: dict
+):
+    """Send the result of a scene work item back to the renderer coordinating its job."""
+    rabbitmq = await RabbitMQConnection.get_instance()
+    channel = await rabbitmq.get_scene_channel()
+    await channel.default_exchange.publish(
+        aio_pika.Message(
+            body=json.dumps({**result, "renderer": RENDERER_ID}).encode(),
+            content_type="application/json",
+            correlation_id=message.correlation_id,
+        ),
+        routing_key=message.reply_to,
+    )
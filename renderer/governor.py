@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import os
+import resource
+import signal
+from pathlib import Path
+
+logger = logging.getLogger("eduwiz.governor")
+
+# Limits every manim process rendering a scene runs under, the address space is generous since numpy and cairo
+# reserve far more virtual memory than they use, resident memory is what is actually watched
+SCENE_ADDRESS_SPACE_MB = int(os.getenv("SCENE_ADDRESS_SPACE_MB", "8192"))
+SCENE_RSS_LIMIT_MB = int(os.getenv("SCENE_RSS_LIMIT_MB", "2048"))
+# Threads a scene's process may keep busy at once, numpy and the video encoder run several
+SCENE_CPU_THREADS = int(os.getenv("SCENE_CPU_THREADS", str(os.cpu_count() or 1)))
+SCENE_MAX_OPEN_FILES = int(os.getenv("SCENE_MAX_OPEN_FILES", "256"))
+SCENE_OUTPUT_LIMIT_MB = int(os.getenv("SCENE_OUTPUT_LIMIT_MB", "1024"))
+
+WATCH_INTERVAL = 1.0
+
+SCENE_LIMITS = {
+    "address_space_mb": SCENE_ADDRESS_SPACE_MB,
+    "open_files": SCENE_MAX_OPEN_FILES,
+    "file_size_mb": SCENE_OUTPUT_LIMIT_MB,
+}
+
+
+def scene_limits(timeout: float) -> dict:
+    """
+    The limits of a scene given the deadline it renders under. CPU time adds up over all threads of a process, so
+    the CPU limit is the deadline times the threads the scene may use. It is a backstop for a process which outlives
+    its deadline, the deadline itself is what stops a scene that runs too long.
+    """
+    return {**SCENE_LIMITS, "cpu_seconds": int(timeout * SCENE_CPU_THREADS) + 1}
+
+
+class ResourceLimitError(RuntimeError):
+    """A scene was stopped for going over one of its resource limits."""
+
+
+def apply_limits(limits: dict):
+    """
+    Set the rlimits of the current process, meant to run in a scene's process right before it executes the scene.
+    The processes it starts, such as manim's ffmpeg, inherit the limits.
+    """
+    mb = 1024 * 1024
+    resource.setrlimit(
+        resource.RLIMIT_AS,
+        (limits["address_space_mb"] * mb, limits["address_space_mb"] * mb),
+    )
+    # The soft CPU limit sends SIGXCPU, the hard one a few seconds later kills a process that ignores it
+    resource.setrlimit(
+        resource.RLIMIT_CPU, (limits["cpu_seconds"], limits["cpu_seconds"] + 5)
+    )
+    resource.setrlimit(
+        resource.RLIMIT_NOFILE, (limits["open_files"], limits["open_files"])
+    )
+    resource.setrlimit(
+        resource.RLIMIT_FSIZE,
+        (limits["file_size_mb"] * mb, limits["file_size_mb"] * mb),
+    )
+
+
+def process_tree_rss_mb(pid: int) -> int:
+    """Resident memory of a process and all of its descendants in MB."""
+    total_kb = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+            # Children are listed under the thread that started them
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as f:
+                    pending.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError):
+            continue
+    return total_kb // 1024
+
+
+def process_group_rss_mb(pgid: int) -> int:
+    """
+    Resident memory in MB of every process in a process group, which includes the processes that have outlived the
+    parent which started them.
+    """
+    page_kb = os.sysconf("SC_PAGE_SIZE") // 1024
+    total_kb = 0
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The fields after the parenthesized command name, which may itself contain spaces
+                fields = f.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        if int(fields[2]) == pgid:
+            total_kb += int(fields[21]) * page_kb
+    return total_kb // 1024
+
+
+def kill_process_group(process):
+    """
+    Kill a scene's process along with the latex, dvisvgm and ffmpeg processes it started, every scene runs in a
+    process group of its own.
+    """
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        # Right after the fork the group may not exist yet
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+
+
+def _directory_mb(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return total // (1024 * 1024)
+
+
+class ResourceWatch:
+    """
+    Watches a running scene for what rlimits can't express: the resident memory of its whole process tree and the
+    total bytes written to its work directory, which lives on the memory-backed temp volume. The scene is killed as
+    soon as either goes over its limit and the reason is kept in breach.
+    """
+
+    def __init__(
+        self,
+        process,
+        work_dir: Path,
+        rss_limit_mb: int = SCENE_RSS_LIMIT_MB,
+        output_limit_mb: int = SCENE_OUTPUT_LIMIT_MB,
+    ):
+        self.process = process
+        self.work_dir = work_dir
+        self.rss_limit_mb = rss_limit_mb
+        self.output_limit_mb = output_limit_mb
+        self.breach: str | None = None
+
+    async def run(self):
+        while self.process.returncode is None:
+            rss_mb = await asyncio.to_thread(process_group_rss_mb, self.process.pid)
+            if rss_mb > self.rss_limit_mb:
+                self._stop(
+                    f"used {rss_mb} MB of memory, over its limit of {self.rss_limit_mb} MB"
+                )
+                return
+
+            output_mb = await asyncio.to_thread(_directory_mb, self.work_dir)
+            if output_mb > self.output_limit_mb:
+                self._stop(
+                    f"wrote {output_mb} MB of output, over its limit of {self.output_limit_mb} MB"
+                )
+                return
+
+            await asyncio.sleep(WATCH_INTERVAL)
+
+    def _stop(self, breach: str):
+        self.breach = breach
+        logger.warning(f"Killing scene process {self.process.pid}, it {breach}")
+        kill_process_group(self.process)
+
+
+def limit_breach(returncode: int | None, error_output: str) -> str | None:
+    """Describe the rlimit a scene process that exited with returncode and error_output ran into, if any."""
+    if returncode == -signal.SIGXCPU:
+        return "used more CPU time than its deadline allows"
+    if returncode == -signal.SIGXFSZ or "File too large" in error_output:
+        return f"wrote a file larger than its limit of {SCENE_OUTPUT_LIMIT_MB} MB"
+    if "MemoryError" in error_output or "Cannot allocate memory" in error_output:
+        return f"ran out of its {SCENE_ADDRESS_SPACE_MB} MB of address space"
+    if "Too many open files" in error_output:
+        return f"opened more than its limit of {SCENE_MAX_OPEN_FILES} files"
+    if returncode == -signal.SIGKILL:
+        return "was killed by the system, most likely for running out of memory"
+    return None
@@ -1,15 +1,50 @@
 import asyncio
+import functools
 import json
 import os
 import re
 import shutil
 import logging
+import time
 from pathlib import Path
 
 import aio_pika
 
+from analysis import extract_tex_calls, scene_features
+from cache import SceneCache
+from capture import OutputCapture, failure_message
+from cost_model import HISTORY_FILE, RenderCostModel, sweep_histories
+from dry_run import DRY_RUN_SCENES, DRY_RUN_TIMEOUT, DryRunStats
+from fanout import SCENE_FANOUT, SCENES_QUEUE, SceneDispatcher, send_scene_result
+from governor import (
+    ResourceLimitError,
+    ResourceWatch,
+    apply_limits,
+    kill_process_group,
+    limit_breach,
+    scene_limits,
+)
+from merge import SceneMerger, concat_videos
+from progress import JobProgress
 from rabbitmq import RabbitMQConnection
-from utils import count_total_animations_in_code, JOB_LIMIT
+from scheduler import SceneScheduler
+from split import SCENE_SPLIT_MAX_PARTS, SCENE_SPLIT_MIN_SECONDS, split_scene
+from status import StatusPublisher
+from stream import SceneStream, sweep_streams
+from tex_cache import TexCache
+from validation import preload as preload_validation, validate_scene
+from worker_pool import ManimWorkerPool
+from workspace import JobWorkspace
+from utils import (
+    JOB_LIMIT,
+    PREFETCH_COUNT,
+    PREVIEW_QUALITY,
+    QUALITY_FLAGS,
+    RENDER_QUALITY,
+    SCENE_MEMORY_MB,
+    SCENE_SLOTS,
+    free_memory_mb,
+)
 
 logger = logging.getLogger("eduwiz.manager")
 
@@ -17,6 +52,7 @@ logger = logging.getLogger("eduwiz.manager")
 class RenderManager:
     def __init__(self):
         self.output_path = Path(os.getenv("OUTPUT_PATH", "/shared/videos"))
+        self.streams_dir = self.output_path / "streams"
         self.temp_base = Path(os.getenv("TEMP_DIR", "/app/temp"))
 
         # Create directories if they don't exist
@@ -42,211 +78,152 @@ class RenderManager:
                 f"No write permission in output directory: {self.output_path}"
             )
 
+        # Scenes are only admitted while the container has memory to spare for them
+        self.scheduler = SceneScheduler(
+            scene_slots=SCENE_SLOTS,
+            job_limit=JOB_LIMIT,
+            scene_memory_mb=SCENE_MEMORY_MB,
+            free_memory_mb=free_memory_mb,
+        )
+
+        # Rendered scenes are cached on the shared volume so every renderer replica can serve them
+        self.scene_cache = SceneCache(
+            Path(os.getenv("SCENE_CACHE_DIR", "/shared/cache/scenes")),
+            max_bytes=int(os.getenv("SCENE_CACHE_MAX_MB", "2048")) * 1024 * 1024,
+        )
+
+        # Successful scenes of failed jobs are kept here so a retry only renders the scenes that failed
+        self.job_workspace = JobWorkspace(
+            Path(os.getenv("JOB_WORKSPACE_DIR", "/shared/cache/jobs")),
+            ttl=int(os.getenv("JOB_WORKSPACE_TTL", "3600")),
+        )
+
+        # Compiled Tex/MathTex svgs shared by every scene rendered in the warm workers, trimmed by the manager
+        self.tex_cache = TexCache()
+
+        # Warm workers with manim already imported, each scene is rendered in a fresh fork of one
+        self.worker_pool = ManimWorkerPool(
+            size=int(os.getenv("MANIM_WORKERS", "2")),
+            max_tasks=int(os.getenv("MANIM_WORKER_MAX_SCENES", "50")),
+            max_rss_mb=int(os.getenv("MANIM_WORKER_MAX_RSS_MB", "1024")),
+        )
+
+        # Predicts each scene's render time from its code and this node's render history to give it a fitting
+        # deadline, the history is kept on the shared volume since the temp directory doesn't survive a restart
+        self.cost_model = RenderCostModel(HISTORY_FILE)
+
+        # Estimates of the render time saved by failing jobs in the dry run
+        self.dry_run_stats = DryRunStats()
+
+        # Statuses are coalesced per job and published on their own channel
+        self.status_publisher = StatusPublisher()
+
+        # With fan-out the scenes of the jobs this renderer takes are rendered by whichever replica is free
+        self.dispatcher = SceneDispatcher() if SCENE_FANOUT else None
+
         logger.info("Renderer started successfully")
 
-    async def _render_scene(self, job_id: str, scene_codes: list[str]) -> Path:
+    async def _render_scene(
+        self,
+        job_id: str,
+        scene_codes: list[str],
+        quality: str = RENDER_QUALITY,
+        preview_quality: str | None = PREVIEW_QUALITY,
+    ) -> Path:
         base_temp_dir = self.temp_base / job_id
         base_temp_dir.mkdir(parents=True, exist_ok=True)
 
         await self.send_status_update(job_id, "started_rendering")
         logger.info(f"Started rendering for job {job_id}")
 
-        # Initialize a list to collect error info for each scene
-        scene_errors: list[tuple[str | None, str]] = [
-            (None, code) for code in scene_codes
-        ]
-        has_errors = False
-
+        job_stream = None
         try:
             # Create individual temp directories for each scene
-            scenes_to_render = []
             for idx, scene_code in enumerate(scene_codes):
                 scene_dir = base_temp_dir / f"scene_{idx}"
                 scene_dir.mkdir(parents=True, exist_ok=True)
+                (scene_dir / "scene.py").write_text(scene_code)
 
-                scene_file = scene_dir / "scene.py"
-                scene_file.write_text(scene_code)
-
-                media_dir = scene_dir / "media"
-                media_dir.mkdir(parents=True, exist_ok=True)
-
-                # Only count animations for the first scene
-                total_animations = None
-                if idx == 0:
-                    total_animations = count_total_animations_in_code(scene_code)
-
-                scenes_to_render.append(
-                    {
-                        "idx": idx,
-                        "scene_file": scene_file,
-                        "media_dir": media_dir,
-                        "scene_dir": scene_dir,
-                        "total_animations": total_animations,
-                    }
-                )
+            # Scenes which can't render are sent back for fixing before any manim process is spent on the job
+            await self._validate_scenes(job_id, scene_codes, quality, preview_quality)
 
-            # Function to render a single scene
-            async def render_single_scene(scene_info):
-                idx = scene_info["idx"]
-                scene_file = scene_info["scene_file"]
-                media_dir = scene_info["media_dir"]
-                total_animations = scene_info.get("total_animations")
-                error_output = None
-
-                process = await asyncio.create_subprocess_exec(
-                    "manim",
-                    str(scene_file),
-                    "ManimVideo",
-                    "-qm",
-                    "--media_dir",
-                    str(media_dir),
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
+            # A fast draft of the whole video is published first when the final render isn't already cached
+            tiers = [("final", quality)]
+            final_cached = all(
+                self.scene_cache.contains(
+                    self.scene_cache.key(code, QUALITY_FLAGS[quality])
                 )
-
-                # Only track progress for the first scene
-                if idx == 0 and total_animations:
-                    animation_regex = re.compile(r"Animation (\d+) :")
-                    last_progress = 0
-                    stdout_lines = []
-
-                    while True:
-                        line = await process.stdout.readline()
-                        if not line:
-                            break
-                        line_text = line.decode("utf-8").strip()
-                        stdout_lines.append(line_text)
-
-                        match = animation_regex.search(line_text)
-                        if match:
-                            current_animation = int(match.group(1)) + 1
-                            progress = min(
-                                100, (current_animation / total_animations) * 100
-                            )
-                            new_progress = min(100, int(progress // 10) * 10)
-                            if new_progress > last_progress:
-                                await self.send_status_update(job_id, str(new_progress))
-                                last_progress = new_progress
-
-                    try:
-                        _, stderr = await asyncio.wait_for(
-                            process.communicate(), timeout=120
-                        )
-                        stderr_text = stderr.decode("utf-8").strip()
-                    except asyncio.TimeoutError:
-                        process.kill()
-                        error_output = f"Rendering for scene {idx} timed out"
-                        return RuntimeError(error_output)
-
-                    await self.send_status_update(job_id, "merging")
-                    logger.info(f"Scene {idx} has finished rendering")
-
-                    if process.returncode != 0:
-                        error_output = stderr_text
-                        return RuntimeError(error_output)
-                else:
-                    try:
-                        stdout, stderr = await asyncio.wait_for(
-                            process.communicate(), timeout=120
-                        )
-                        stdout_text = stdout.decode("utf-8").strip()
-                        stderr_text = stderr.decode("utf-8").strip()
-                        logger.info(f"Scene {idx} has finished rendering")
-
-                        if process.returncode != 0:
-                            error_output = stderr_text
-                            return RuntimeError(error_output)
-                    except asyncio.TimeoutError:
-                        process.kill()
-                        logger.error(
-                            f"Scene {idx} rendering timed out after {120} seconds"
-                        )
-                        error_output = f"Render timed out for scene {idx}"
-                        return RuntimeError(error_output)
-
-                # Get the rendered video
-                video_file = next(scene_info["scene_dir"].rglob("*.mp4"), None)
-                if not video_file:
-                    error_output = f"No video file was produced for scene {idx}"
-                    return FileNotFoundError(error_output)
-
-                return video_file
-
-            # Render all scenes in parallel
-            await self.send_status_update(job_id, "rendering_all_scenes")
-            logger.info(
-                f"Started rendering all {len(scenes_to_render)} scenes for job {job_id}"
-            )
-            scene_videos = await asyncio.gather(
-                *[render_single_scene(scene_info) for scene_info in scenes_to_render],
-                return_exceptions=True,
+                for code in scene_codes
             )
+            if preview_quality and preview_quality != quality and not final_cached:
+                tiers.insert(0, ("preview", preview_quality))
 
-            logger.info("Finished rendering all scenes")
-
-            await self.send_status_update(job_id, "rendering_complete")
-
-            # Check for exceptions and collect errors
-            for i, result in enumerate(scene_videos):
-                if isinstance(result, Exception):
-                    has_errors = True
-                    error_msg = str(result)
-                    scene_errors[i] = (error_msg, scene_codes[i])
-                    logger.error(f"Scene {i} rendering failed: {error_msg}")
-
-            # If any errors occurred, update status and call error_handling
-            if has_errors:
-                await self.error_handler(job_id, scene_errors)
-                raise RuntimeError(
-                    "One or more scenes failed to render, retrying generation"
+            # Runtime errors in construct() are caught without rasterizing or encoding a single frame
+            if DRY_RUN_SCENES:
+                await self._dry_run_scenes(
+                    job_id, scene_codes, tiers[0], quality, preview_quality
                 )
 
-            # All videos rendered successfully, now merge them
-            await self.send_status_update(job_id, "merging_videos")
+            output_file = self.output_path / f"{job_id}.mp4"
 
-            # Create a file list for ffmpeg
-            file_list_path = base_temp_dir / "file_list.txt"
-            with open(file_list_path, "w") as f:
-                for video_path in scene_videos:
-                    f.write(f"file '{video_path.absolute()}'\n")
+            for tier_idx, (tier, tier_quality) in enumerate(tiers):
+                scenes_to_render = [
+                    self._scene_info(
+                        base_temp_dir / f"scene_{idx}",
+                        idx,
+                        scene_code,
+                        tier,
+                        QUALITY_FLAGS[tier_quality],
+                        # Later tiers wait behind the first tier of every other job
+                        priority=tier_idx,
+                        track_progress=tier_idx == 0,
+                    )
+                    for idx, scene_code in enumerate(scene_codes)
+                ]
 
-            # Final output path
-            output_file = self.output_path / f"{job_id}.mp4"
+                # The first tier is streamed scene by scene so playback can start before the merge
+                stream = None
+                if tier_idx == 0:
+                    stream = job_stream = SceneStream(
+                        self.streams_dir / job_id, len(scene_codes)
+                    )
 
-            logger.info(f"Started merging scenes for job {job_id}")
-
-            # Merge videos using ffmpeg
-            merge_process = await asyncio.create_subprocess_exec(
-                "ffmpeg",
-                "-f",
-                "concat",
-                "-safe",
-                "0",
-                "-i",
-                str(file_list_path),
-                "-c",
-                "copy",
-                str(output_file),
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
+                # Scenes are joined as they finish, leaving only the final remux for after the last one
+                merger = SceneMerger(base_temp_dir / tier, len(scene_codes))
 
-            await merge_process.wait()
+                scene_videos = await self._render_tier(
+                    job_id,
+                    scenes_to_render,
+                    scene_codes,
+                    quality,
+                    preview_quality,
+                    merger,
+                    stream,
+                )
 
-            logger.info(f"Ended merging scenes for job {job_id}")
+                # All videos rendered successfully, now merge them
+                await self.send_status_update(job_id, "merging_videos")
+                await self._merge_scenes(job_id, scene_videos, merger, output_file)
 
-            if merge_process.returncode != 0:
-                stderr = await merge_process.stderr.read()
-                error_msg = stderr.decode("utf-8").strip()
-                logger.error(f"Video merge error: {error_msg}")
-                await self.send_status_update(job_id, "error")
-                raise RuntimeError("Failed to merge videos")
+                if tier == "preview":
+                    await self.send_status_update(job_id, "preview_ready")
+                    logger.info(f"Published preview for job {job_id}")
 
             await self.send_status_update(job_id, "completed")
 
+            # The job will not come back from the retry queue anymore
+            await asyncio.to_thread(self.job_workspace.discard, job_id)
+
             return output_file
 
         finally:
+            if self.dispatcher:
+                self.job_workspace.discard_results(job_id)
+
+            # Players still on the stream get the grace period of the sweep before it is removed
+            if job_stream:
+                job_stream.close()
+
             # Clean up the temporary directory
             try:
                 if base_temp_dir.exists():
@@ -256,18 +233,760 @@ class RenderManager:
                     f"Failed to clean up temporary directory {base_temp_dir}: {e}"
                 )
 
+    async def _validate_scenes(
+        self,
+        job_id: str,
+        scene_codes: list[str],
+        quality: str,
+        preview_quality: str | None,
+    ):
+        """Statically check every scene and send the job for retry straight away if any of them can't render."""
+        problems = await asyncio.to_thread(
+            lambda: [validate_scene(scene_code) for scene_code in scene_codes]
+        )
+        if not any(problems):
+            return
+
+        scene_errors: list[tuple[str | None, str]] = []
+        for idx, (problem, scene_code) in enumerate(zip(problems, scene_codes)):
+            if problem:
+                logger.error(f"Scene {idx} failed validation: {problem}")
+            scene_errors.append((problem, scene_code))
+
+        await self.error_handler(job_id, scene_errors, quality, preview_quality)
+        raise RuntimeError("One or more scenes failed validation, retrying generation")
+
+    async def _dry_run_scenes(
+        self,
+        job_id: str,
+        scene_codes: list[str],
+        first_tier: tuple[str, str],
+        quality: str,
+        preview_quality: str | None,
+    ):
+        """
+        Execute every scene which hasn't rendered before as a manim dry run, all in parallel, and send the job for
+        retry straight away if any of them raises. Dry runs work in the first tier's media directory so the
+        voiceovers and tex they produce are reused by its render.
+        """
+        tier, tier_quality = first_tier
+        qualities = [q for q in (quality, preview_quality) if q]
+        base_temp_dir = self.temp_base / job_id
+
+        pending = [
+            idx
+            for idx, scene_code in enumerate(scene_codes)
+            if not await asyncio.to_thread(
+                self._rendered_before, job_id, idx, scene_code, qualities
+            )
+        ]
+        if not pending:
+            return
+
+        started = time.monotonic()
+        results = await asyncio.gather(
+            *[
+                self._dry_run_single_scene(
+                    job_id, idx, base_temp_dir / f"scene_{idx}", tier
+                )
+                for idx in pending
+            ]
+        )
+        elapsed = time.monotonic() - started
+
+        scene_errors: list[tuple[str | None, str]] = [
+            (None, code) for code in scene_codes
+        ]
+        has_errors = False
+        for idx, (error_msg, seconds) in zip(pending, results):
+            self.dry_run_stats.record_dry_run(seconds, passed=error_msg is None)
+            if error_msg is not None:
+                has_errors = True
+                scene_errors[idx] = (error_msg, scene_codes[idx])
+                logger.error(f"Scene {idx} failed the dry run: {error_msg}")
+
+        if not has_errors:
+            logger.info(
+                f"All {len(pending)} scenes of job {job_id} passed the dry run in {elapsed:.1f}s"
+            )
+            return
+
+        saved = self.dry_run_stats.record_failed_job(
+            QUALITY_FLAGS[tier_quality],
+            max(seconds for _, seconds in results),
+            elapsed,
+        )
+        if saved is not None:
+            logger.info(
+                f"Dry run failed job {job_id} after {elapsed:.1f}s, saving an estimated {saved:.1f}s of rendering"
+            )
+        logger.info(f"Dry run stats: {self.dry_run_stats.stats()}")
+
+        await self.error_handler(job_id, scene_errors, quality, preview_quality)
+        raise RuntimeError("One or more scenes failed the dry run, retrying generation")
+
+    def _rendered_before(
+        self, job_id: str, idx: int, scene_code: str, qualities: list[str]
+    ) -> bool:
+        """Whether the scene is known to render since it is in the render cache or kept from a previous attempt."""
+        for quality in qualities:
+            key = self.scene_cache.key(scene_code, QUALITY_FLAGS[quality])
+            if self.scene_cache.contains(key) or self.job_workspace.contains(
+                job_id, idx, key
+            ):
+                return True
+        return False
+
+    async def _dry_run_single_scene(
+        self, job_id: str, idx: int, scene_dir: Path, tier: str
+    ) -> tuple[str | None, float]:
+        """Dry run one scene, returning the error it raised or None, and how long it took."""
+        media_dir = scene_dir / tier / "media"
+        media_dir.mkdir(parents=True, exist_ok=True)
+
+        async with self.scheduler.scene_slot(job_id, idx):
+            started = time.monotonic()
+            process = await self._start_scene_process(
+                {
+                    "scene_file": scene_dir / "scene.py",
+                    "media_dir": media_dir,
+                    "quality": QUALITY_FLAGS["low"],
+                    "timeout": DRY_RUN_TIMEOUT,
+                    "dry_run": True,
+                }
+            )
+            watch = ResourceWatch(process, scene_dir / tier)
+            watch_task = asyncio.create_task(watch.run())
+            stdout = OutputCapture()
+            stderr = OutputCapture()
+
+            async def collect():
+                await asyncio.gather(
+                    stdout.drain(process.stdout), stderr.drain(process.stderr)
+                )
+                await process.wait()
+
+            try:
+                await asyncio.wait_for(collect(), timeout=DRY_RUN_TIMEOUT)
+            except asyncio.TimeoutError:
+                kill_process_group(process)
+                return (
+                    f"Scene {idx} did not finish executing within {DRY_RUN_TIMEOUT} seconds",
+                    time.monotonic() - started,
+                )
+            finally:
+                watch_task.cancel()
+
+        seconds = time.monotonic() - started
+        if process.returncode != 0:
+            scene_file = scene_dir / "scene.py"
+            error_msg = failure_message(
+                scene_file.read_text(), scene_file.name, stderr, stdout
+            )
+            breach = watch.breach or limit_breach(process.returncode, error_msg)
+            if breach:
+                return f"Scene {idx} was stopped because it {breach}", seconds
+            return error_msg, seconds
+        return None, seconds
+
+    def _scene_info(
+        self,
+        scene_dir: Path,
+        idx: int,
+        scene_code: str,
+        tier: str,
+        quality: str,
+        priority: int,
+        track_progress: bool,
+    ) -> dict:
+        """Describe the render of one scene in one quality tier, each tier works in its own directory."""
+        work_dir = scene_dir / tier
+        media_dir = work_dir / "media"
+        media_dir.mkdir(parents=True, exist_ok=True)
+
+        features = scene_features(scene_code)
+        predicted_seconds = self.cost_model.predict(features, quality)
+
+        return {
+            "idx": idx,
+            "tier": tier,
+            "scene_file": scene_dir / "scene.py",
+            "media_dir": media_dir,
+            "work_dir": work_dir,
+            "track_progress": track_progress,
+            "total_animations": features["animations"],
+            "quality": quality,
+            "priority": priority,
+            "cache_key": self.scene_cache.key(scene_code, quality),
+            "tex_calls": extract_tex_calls(scene_code),
+            "features": features,
+            "predicted_seconds": predicted_seconds,
+            "timeout": self.cost_model.timeout(predicted_seconds),
+        }
+
+    async def _render_tier(
+        self,
+        job_id: str,
+        scenes_to_render: list[dict],
+        scene_codes: list[str],
+        quality: str,
+        preview_quality: str | None,
+        merger: SceneMerger,
+        stream: SceneStream | None = None,
+    ) -> list[Path]:
+        """
+        Render every scene of the job, appending each one to the merge and the stream as soon as it can be, and send
+        the job for retry if any of them fails.
+        """
+
+        # Animations of every scene count towards one job percentage, weighted by the scenes' predicted render time
+        progress = None
+        if scenes_to_render and scenes_to_render[0]["track_progress"]:
+            progress = JobProgress(
+                {info["idx"]: info["predicted_seconds"] for info in scenes_to_render}
+            )
+            for scene_info in scenes_to_render:
+                scene_info["progress"] = progress
+
+        async def render_and_stream(scene_info: dict):
+            if self.dispatcher:
+                result = await self._dispatch_scene(
+                    job_id, scene_info, scene_codes[scene_info["idx"]]
+                )
+            else:
+                result = await self._render_scheduled_scene(job_id, scene_info)
+            if progress:
+                await self._report_progress(
+                    job_id, progress, progress.complete(scene_info["idx"])
+                )
+            if not isinstance(result, Path):
+                return result
+
+            await merger.add_scene(scene_info["idx"], result)
+            if stream:
+                if await stream.add_scene(scene_info["idx"], result):
+                    await self.send_status_update(job_id, "stream_ready")
+                    logger.info(f"Started streaming job {job_id}")
+            return result
+
+        # Initialize a list to collect error info for each scene
+        scene_errors: list[tuple[str | None, str]] = [
+            (None, code) for code in scene_codes
+        ]
+        has_errors = False
+
+        # Render all scenes in parallel, the job takes as long as its slowest scene so the longest ones start first
+        await self.send_status_update(job_id, "rendering_all_scenes")
+        logger.info(
+            f"Started rendering all {len(scenes_to_render)} scenes for job {job_id}"
+        )
+        renders: list[asyncio.Future | None] = [None] * len(scenes_to_render)
+        for i in sorted(
+            range(len(scenes_to_render)),
+            key=lambda i: -scenes_to_render[i]["predicted_seconds"],
+        ):
+            renders[i] = asyncio.ensure_future(render_and_stream(scenes_to_render[i]))
+        scene_videos = await asyncio.gather(*renders, return_exceptions=True)
+
+        logger.info("Finished rendering all scenes")
+        logger.info(f"Scene cache stats: {self.scene_cache.stats()}")
+        logger.info(f"Render cost model stats: {self.cost_model.stats()}")
+
+        await self.send_status_update(job_id, "rendering_complete")
+
+        # Check for exceptions and collect errors
+        for i, result in enumerate(scene_videos):
+            if isinstance(result, Exception):
+                has_errors = True
+                error_msg = str(result)
+                scene_errors[i] = (error_msg, scene_codes[i])
+                logger.error(f"Scene {i} rendering failed: {error_msg}")
+
+        # If any errors occurred, keep the scenes that did render for the retry, then call error_handling
+        if has_errors:
+            for i, result in enumerate(scene_videos):
+                if isinstance(result, Path):
+                    await asyncio.to_thread(
+                        self.job_workspace.save,
+                        job_id,
+                        i,
+                        scenes_to_render[i]["cache_key"],
+                        result,
+                    )
+                    continue
+
+                await self._keep_partials(job_id, scenes_to_render[i])
+            await self.error_handler(job_id, scene_errors, quality, preview_quality)
+            raise RuntimeError(
+                "One or more scenes failed to render, retrying generation"
+            )
+
+        return scene_videos
+
+    async def _keep_partials(self, job_id: str, scene_info: dict):
+        """Keep the animations a failed scene did encode so its fixed version only encodes what changed."""
+        work_dir = scene_info["work_dir"]
+        kept = await asyncio.to_thread(
+            self.job_workspace.save_partials,
+            job_id,
+            scene_info["idx"],
+            scene_info["quality"],
+            [work_dir / "media", *work_dir.glob("part_*/media")],
+        )
+        if kept:
+            logger.info(
+                f"Kept {kept} partial movies of scene {scene_info['idx']} of job {job_id} for its retry"
+            )
+
+    async def _merge_scenes(
+        self,
+        job_id: str,
+        scene_videos: list[Path],
+        merger: SceneMerger,
+        output_file: Path,
+    ):
+        """Finish the merge of the scene videos and atomically swap the fast-start result into output_file."""
+        logger.info(f"Started merging scenes for job {job_id}")
+        await self.send_status_update(job_id, "merging")
+
+        try:
+            await merger.finish(scene_videos, output_file)
+        except RuntimeError as e:
+            logger.error(f"Video merge error: {e}")
+            await self.send_status_update(job_id, "error")
+            raise RuntimeError("Failed to merge videos")
+
+        logger.info(f"Ended merging scenes for job {job_id}")
+
+    async def _reuse_scene(self, job_id: str, scene_info: dict) -> Path | None:
+        """Place the scene from a previous attempt of the job or from the render cache in its work directory."""
+        idx = scene_info["idx"]
+        cache_key = scene_info["cache_key"]
+
+        kept_video = await asyncio.to_thread(
+            self.job_workspace.restore,
+            job_id,
+            idx,
+            cache_key,
+            scene_info["work_dir"] / "kept.mp4",
+        )
+        if kept_video:
+            logger.info(f"Scene {idx} of job {job_id} reused from the previous attempt")
+            return kept_video
+
+        cached_video = await asyncio.to_thread(
+            self.scene_cache.get, cache_key, scene_info["work_dir"] / "cached.mp4"
+        )
+        if cached_video:
+            logger.info(f"Scene {idx} of job {job_id} served from the render cache")
+            return cached_video
+        return None
+
+    async def _dispatch_scene(
+        self, job_id: str, scene_info: dict, scene_code: str
+    ) -> Path | Exception:
+        """Reuse the scene if possible, otherwise have whichever renderer replica is free render it."""
+        reused = await self._reuse_scene(job_id, scene_info)
+        if reused:
+            return reused
+        return await self.dispatcher.render(
+            job_id,
+            scene_info["tier"],
+            scene_info["idx"],
+            scene_code,
+            scene_info["quality"],
+            scene_info["priority"],
+        )
+
+    async def _render_scheduled_scene(self, job_id: str, scene_info: dict):
+        """
+        Reuse the scene from a previous attempt of the job or from the render cache if possible, otherwise wait for a
+        free slot in the scene pool and render it.
+        """
+        idx = scene_info["idx"]
+        cache_key = scene_info["cache_key"]
+
+        reused = await self._reuse_scene(job_id, scene_info)
+        if reused:
+            return reused
+
+        # A long scene is split where its screen is emptied and the parts rendered side by side on idle slots
+        max_parts = min(SCENE_SPLIT_MAX_PARTS, self.scheduler.idle_scene_slots() + 1)
+        parts = await asyncio.to_thread(
+            split_scene,
+            scene_info["scene_file"].read_text(),
+            max_parts,
+            SCENE_SPLIT_MIN_SECONDS,
+        )
+        if parts:
+            result = await self._render_split_scene(job_id, scene_info, parts)
+            if isinstance(result, Path):
+                await asyncio.to_thread(self.scene_cache.put, cache_key, result)
+                return result
+            logger.warning(
+                f"Split render of scene {idx} of job {job_id} failed, rendering it whole: {result}"
+            )
+
+        async with self.scheduler.scene_slot(
+            job_id, idx, scene_info["priority"], scene_info["predicted_seconds"]
+        ):
+            await self._precompile_tex(job_id, scene_info)
+            started = time.monotonic()
+            result = await self._render_single_scene(job_id, scene_info)
+
+        elapsed = time.monotonic() - started
+        if isinstance(result, Path):
+            outcome = "rendered"
+        elif isinstance(result, TimeoutError):
+            outcome = "timed_out"
+        elif isinstance(result, ResourceLimitError):
+            outcome = "limit_exceeded"
+        else:
+            outcome = "failed"
+
+        logger.info(
+            f"Scene {idx} of job {job_id} {outcome.replace('_', ' ')} in {elapsed:.1f}s "
+            f"(predicted {scene_info['predicted_seconds']:.1f}s, timeout {scene_info['timeout']}s)"
+        )
+        await asyncio.to_thread(
+            self.cost_model.record,
+            job_id,
+            idx,
+            scene_info["features"],
+            scene_info["quality"],
+            scene_info["predicted_seconds"],
+            scene_info["timeout"],
+            elapsed,
+            outcome,
+        )
+
+        if isinstance(result, Path):
+            self.dry_run_stats.record_render(scene_info["quality"], elapsed)
+            await asyncio.to_thread(self.scene_cache.put, cache_key, result)
+
+        return result
+
+    async def _render_split_scene(
+        self, job_id: str, scene_info: dict, parts: list[str]
+    ) -> Path | Exception:
+        """
+        Render the parts of a split scene side by side, each in a scene slot of its own, and concatenate their videos
+        in order. Returns the scene's video, or the exception the first failed part returned.
+        """
+        idx = scene_info["idx"]
+        progress = scene_info.get("progress")
+        weights = [scene_features(part)["duration_seconds"] or 1.0 for part in parts]
+        rendered = 0.0
+        logger.info(f"Rendering scene {idx} of job {job_id} in {len(parts)} parts")
+
+        async def render_part(part_idx: int, part_code: str):
+            nonlocal rendered
+            part_dir = scene_info["work_dir"] / f"part_{part_idx}"
+            media_dir = part_dir / "media"
+            media_dir.mkdir(parents=True, exist_ok=True)
+            scene_file = part_dir / "scene.py"
+            scene_file.write_text(part_code)
+
+            part_info = {
+                **scene_info,
+                "scene_file": scene_file,
+                "media_dir": media_dir,
+                "work_dir": part_dir,
+                "tex_calls": extract_tex_calls(part_code),
+                # The scene's progress moves as whole parts finish
+                "progress": None,
+            }
+            async with self.scheduler.scene_slot(
+                job_id,
+                idx,
+                scene_info["priority"],
+                scene_info["predicted_seconds"] * weights[part_idx] / sum(weights),
+            ):
+                await self._precompile_tex(job_id, part_info)
+                result = await self._render_single_scene(job_id, part_info)
+
+            if progress and isinstance(result, Path):
+                rendered += weights[part_idx]
+                await self._report_progress(
+                    job_id, progress, progress.update(idx, rendered / sum(weights))
+                )
+            return result
+
+        started = time.monotonic()
+        results = await asyncio.gather(
+            *[render_part(part_idx, part) for part_idx, part in enumerate(parts)]
+        )
+        failed = next((r for r in results if not isinstance(r, Path)), None)
+        if failed is not None:
+            return failed
+
+        video_file = scene_info["work_dir"] / "split.mp4"
+        try:
+            await concat_videos(results, video_file)
+        except RuntimeError as e:
+            return e
+
+        logger.info(
+            f"Scene {idx} of job {job_id} rendered in {len(parts)} parts in {time.monotonic() - started:.1f}s"
+        )
+        return video_file
+
+    async def _precompile_tex(self, job_id: str, scene_info: dict):
+        """
+        Compile the tex the scene code builds with literal strings into the tex cache before the render starts, split
+        across the scene's own slot and the idle slots the scheduler can lend it meanwhile. Anything missed compiles
+        lazily as before.
+        """
+        tex_calls = scene_info["tex_calls"]
+        if not tex_calls:
+            return
+
+        idx = scene_info["idx"]
+        async with self.scheduler.idle_slots(job_id, len(tex_calls) - 1) as idle:
+            chunks = idle + 1
+
+            processes = []
+            for chunk in range(chunks):
+                # Each chunk gets its own tex_dir since manim removes intermediate files from it after every compile
+                process = await self.worker_pool.precompile_tex(
+                    scene_info["work_dir"] / f"precompile_{chunk}",
+                    tex_calls[chunk::chunks],
+                )
+                if process is None:
+                    break
+                processes.append(process)
+
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*[process.communicate() for process in processes]),
+                    timeout=60,
+                )
+                logger.info(
+                    f"Precompiled {len(tex_calls)} tex expressions for scene {idx} of job {job_id} in {len(processes)} processes"
+                )
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"Tex precompilation timed out for scene {idx} of job {job_id}"
+                )
+                for process in processes:
+                    kill_process_group(process)
+                # The borrowed slots are only given back once the processes are gone
+                await asyncio.gather(*[process.wait() for process in processes])
+
+    async def _render_single_scene(self, job_id: str, scene_info: dict):
+        """
+        Render one scene with manim under its resource limits, returning the produced video or the exception
+        describing the failure.
+        """
+        # Animations a previous attempt of the job already encoded are skipped by manim's own hash based caching
+        seeded = await asyncio.to_thread(
+            self.job_workspace.restore_partials,
+            job_id,
+            scene_info["idx"],
+            scene_info["quality"],
+            scene_info["media_dir"],
+        )
+
+        process = await self._start_scene_process(scene_info)
+
+        watch = ResourceWatch(process, scene_info["work_dir"])
+        watch_task = asyncio.create_task(watch.run())
+        try:
+            result = await self._collect_scene(job_id, scene_info, process, seeded)
+        finally:
+            watch_task.cancel()
+
+        if isinstance(result, Path) or (
+            isinstance(result, TimeoutError) and not watch.breach
+        ):
+            return result
+
+        # Going over a limit is reported as such rather than with whatever the killed process left behind
+        breach = watch.breach or limit_breach(process.returncode, str(result))
+        if breach is None:
+            return result
+        logger.error(f"Scene {scene_info['idx']} of job {job_id} {breach}")
+        return ResourceLimitError(
+            f"Scene {scene_info['idx']} was stopped because it {breach}"
+        )
+
+    async def _collect_scene(
+        self, job_id: str, scene_info: dict, process, seeded: int = 0
+    ):
+        """
+        Wait for the scene's manim process to finish, tracking its progress, and find the video it produced. When
+        seeded partial movie files were restored for it, how many animations it reused from them is logged.
+        """
+        idx = scene_info["idx"]
+        total_animations = scene_info.get("total_animations")
+        progress = scene_info.get("progress")
+        timeout = scene_info["timeout"]
+
+        stdout = OutputCapture()
+        stderr = OutputCapture()
+
+        # Manim logs every animation once it is encoded or taken from its cache, which feeds the job's progress
+        animation_regex = re.compile(r"Animation (\d+) :")
+        animations = 0
+        reused = 0
+
+        async def on_line(line: str):
+            nonlocal animations, reused
+            match = animation_regex.search(line)
+            if not match:
+                return
+            animations += 1
+            if "Using cached data" in line:
+                reused += 1
+            if progress and total_animations:
+                current_animation = int(match.group(1)) + 1
+                await self._report_progress(
+                    job_id,
+                    progress,
+                    progress.update(idx, current_animation / total_animations),
+                )
+
+        async def collect():
+            # Both pipes are drained together so a chatty scene can't block on a full pipe
+            await asyncio.gather(
+                stdout.drain(process.stdout, on_line), stderr.drain(process.stderr)
+            )
+            await process.wait()
+
+        # The deadline covers the whole render, a scene that hangs without printing is killed as well
+        try:
+            await asyncio.wait_for(collect(), timeout=timeout)
+        except asyncio.TimeoutError:
+            kill_process_group(process)
+            logger.error(f"Scene {idx} rendering timed out after {timeout} seconds")
+            return TimeoutError(
+                f"Render timed out for scene {idx} after {timeout} seconds"
+            )
+
+        logger.info(f"Scene {idx} has finished rendering")
+        if seeded:
+            ratio = reused / animations if animations else 0.0
+            logger.info(
+                f"Scene {idx} of job {job_id} reused {reused} of {animations} animations ({ratio:.0%}) "
+                f"from {seeded} partial movies of its previous attempt"
+            )
+
+        if process.returncode != 0:
+            scene_file = scene_info["scene_file"]
+            return RuntimeError(
+                failure_message(scene_file.read_text(), scene_file.name, stderr, stdout)
+            )
+
+        # Get the rendered video
+        video_file = next(scene_info["media_dir"].rglob("*.mp4"), None)
+        if not video_file:
+            error_output = f"No video file was produced for scene {idx}"
+            return FileNotFoundError(error_output)
+
+        return video_file
+
+    async def _report_progress(
+        self, job_id: str, progress: JobProgress, percent: int | None
+    ):
+        """Send the job percentage along with its ETA when it has reached a new step."""
+        if percent is None:
+            return
+
+        eta_seconds = progress.eta_seconds()
+        await self.send_status_update(job_id, str(percent), eta_seconds=eta_seconds)
+        logger.info(
+            f"Job {job_id} is {percent}% done"
+            + (f", about {eta_seconds:.0f}s left" if eta_seconds is not None else "")
+        )
+
+    async def _start_scene_process(self, scene_info: dict):
+        """Start rendering the scene under its rlimits in a warm manim worker, falling back to a manim CLI process."""
+        dry_run = scene_info.get("dry_run", False)
+        limits = scene_limits(scene_info["timeout"])
+        process = await self.worker_pool.run_scene(
+            scene_info["scene_file"],
+            scene_info["media_dir"],
+            scene_info["quality"],
+            dry_run=dry_run,
+            limits=limits,
+        )
+        if process is not None:
+            return process
+
+        return await asyncio.create_subprocess_exec(
+            "manim",
+            str(scene_info["scene_file"]),
+            "ManimVideo",
+            scene_info["quality"],
+            "--media_dir",
+            str(scene_info["media_dir"]),
+            # -s skips the animations to their end state, so the dry run rasterizes no frames either
+            *(["--dry_run", "-s"] if dry_run else []),
+            preexec_fn=functools.partial(apply_limits, limits),
+            # A process group of its own, so whatever manim starts is killed with it
+            start_new_session=True,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+
     async def _message_handler(self, message: aio_pika.abc.AbstractIncomingMessage):
         async with message.process(requeue=False):
             data = json.loads(message.body.decode())
             job_id = data["job_id"]
 
             try:
-                logger.info(f"Started job {job_id}")
-                await self._render_scene(job_id, data["manim_code"])
+                async with self.scheduler.job_slot(job_id):
+                    logger.info(f"Started job {job_id}")
+                    await self._render_scene(
+                        job_id,
+                        data["manim_code"],
+                        quality=data.get("quality", RENDER_QUALITY),
+                        # An explicit null disables the preview for the job
+                        preview_quality=data.get("preview_quality", PREVIEW_QUALITY),
+                    )
                 logger.info(f"Completed job {job_id}")
             except Exception as e:
                 logger.exception(f"Failed to render job {job_id} with error: {e}")
 
+    async def _scene_message_handler(
+        self, message: aio_pika.abc.AbstractIncomingMessage
+    ):
+        """Render one scene of a job coordinated by any renderer replica and reply with where its video is."""
+        async with message.process(requeue=False):
+            data = json.loads(message.body.decode())
+            job_id, tier, idx = data["job_id"], data["tier"], data["idx"]
+            scene_dir = self.temp_base / "scenes" / f"{job_id}_{tier}_{idx}"
+
+            try:
+                scene_dir.mkdir(parents=True, exist_ok=True)
+                (scene_dir / "scene.py").write_text(data["code"])
+                scene_info = self._scene_info(
+                    scene_dir,
+                    idx,
+                    data["code"],
+                    tier,
+                    data["quality"],
+                    priority=data["priority"],
+                    track_progress=False,
+                )
+
+                result = await self._render_scheduled_scene(job_id, scene_info)
+                if isinstance(result, Path):
+                    video_file = await asyncio.to_thread(
+                        self.job_workspace.save_result, job_id, tier, idx, result
+                    )
+                    outcome = {"video": str(video_file)}
+                else:
+                    await self._keep_partials(job_id, scene_info)
+                    outcome = {"error": str(result)}
+            except Exception as e:
+                logger.exception(f"Failed to render scene {idx} of job {job_id}: {e}")
+                outcome = {"error": f"Scene {idx} could not be rendered: {e}"}
+            finally:
+                shutil.rmtree(scene_dir, ignore_errors=True)
+
+            await send_scene_result(message, outcome)
+
     async def run(self):
         rabbit_conn = await RabbitMQConnection.get_instance()
         await rabbit_conn.connect()
@@ -275,38 +994,67 @@ class RenderManager:
 
         queue = await channel.declare_queue("render_jobs")
 
-        logger.info(f"Started render manager (job_limit={JOB_LIMIT})")
+        logger.info(
+            f"Started render manager (job_limit={JOB_LIMIT}, scene_slots={SCENE_SLOTS}, prefetch={PREFETCH_COUNT})"
+        )
         logger.info(f"Using temp directory: {self.temp_base}")
         logger.info(f"Using output directory: {self.output_path}")
 
+        # Import what scenes are validated against before the first job arrives
+        await asyncio.to_thread(preload_validation)
+
         await queue.consume(self._message_handler)
 
+        # Every replica renders scenes for every other one, on a channel of its own so held jobs never block them
+        if self.dispatcher:
+            scene_channel = await rabbit_conn.get_scene_channel()
+            scene_queue = await scene_channel.declare_queue(SCENES_QUEUE)
+            await self.dispatcher.start()
+            await scene_queue.consume(self._scene_message_handler)
+            logger.info(f"Fanning scenes out through the {SCENES_QUEUE} queue")
+        sweeper = asyncio.create_task(self._sweep_storage())
+
         try:
             await asyncio.Future()  # run forever
         except asyncio.CancelledError:
             logger.info("Shutting down render manager")
         finally:
+            sweeper.cancel()
+            self.worker_pool.close()
+            await self.status_publisher.close()
             await rabbit_conn.close()
 
-    async def send_status_update(self, job_id: str, status: str):
-        rabbitmq = await RabbitMQConnection.get_instance()
-        channel = await rabbitmq.get_channel()
-
-        message = {"job_id": job_id, "status": status}
+    async def _sweep_storage(self):
+        """
+        Periodically remove the workspaces of jobs that never came back from the retry queue, the streams of jobs
+        that are done and the render histories of nodes that are gone, and trim the tex cache.
+        """
+        while True:
+            try:
+                await asyncio.to_thread(self.job_workspace.sweep)
+                await asyncio.to_thread(sweep_streams, self.streams_dir)
+                await asyncio.to_thread(sweep_histories)
+                await asyncio.to_thread(self.tex_cache.evict)
+            except Exception as e:
+                logger.error(f"Failed to sweep renderer storage: {e}")
+            await asyncio.sleep(300)
 
-        # Publish job order to the queue
-        await channel.default_exchange.publish(
-            aio_pika.Message(
-                body=json.dumps(message).encode(),
-                content_type="application/json",
-            ),
-            routing_key="status_updates",
-        )
+    async def send_status_update(
+        self, job_id: str, status: str, eta_seconds: float | None = None
+    ):
+        await self.status_publisher.publish(job_id, status, eta_seconds=eta_seconds)
 
-    async def error_handler(self, job_id: str, scenes: list[tuple[str | None, str]]):
+    async def error_handler(
+        self,
+        job_id: str,
+        scenes: list[tuple[str | None, str]],
+        quality: str = RENDER_QUALITY,
+        preview_quality: str | None = PREVIEW_QUALITY,
+    ):
         # Send it back to the AI to retry
         # The scenes parameter is a list of ALL scenes, even the scenes without errors. The tuple[0] is the error str or None, tuple[1] is the code for all scenes.
         # The scenes should be in the same order as they arrived
+        # The job's qualities are sent along so the retried job renders with the same tiers
 
         await self.send_status_update(job_id, "retrying")
         logger.info(f"Sending failed scenes for job {job_id} for retry")
@@ -316,7 +1064,12 @@ class RenderManager:
             channel = await rabbitmq.get_channel()
 
             # Create message with job_id and scenes with errors
-            message = {"job_id": job_id, "scenes": scenes}
+            message = {
+                "job_id": job_id,
+                "scenes": scenes,
+                "quality": quality,
+                "preview_quality": preview_quality,
+            }
 
             # Publish to retry endpoint queue
             await channel.default_exchange.publish(
@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import os
+import shutil
+from pathlib import Path
+
+logger = logging.getLogger("eduwiz.merge")
+
+
+async def run_ffmpeg(*args: str) -> tuple[int, str]:
+    """Run an ffmpeg-family tool, draining its output while it runs, and return its exit code and stderr."""
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await process.communicate()
+    return process.returncode, stderr.decode("utf-8", errors="replace").strip()
+
+
+async def probe_duration(video_file: Path) -> float:
+    """Duration of a video in seconds, as reported by its container."""
+    process = await asyncio.create_subprocess_exec(
+        "ffprobe",
+        "-v",
+        "error",
+        "-show_entries",
+        "format=duration",
+        "-of",
+        "default=noprint_wrappers=1:nokey=1",
+        str(video_file),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(stderr.decode("utf-8", errors="replace").strip())
+    return float(stdout.decode().strip())
+
+
+def _write_file_list(video_files: list[Path], file_list_path: Path):
+    with open(file_list_path, "w") as f:
+        for video_path in video_files:
+            f.write(f"file '{video_path.absolute()}'\n")
+
+
+async def concat_videos(video_files: list[Path], output_file: Path):
+    """Concatenate videos encoded with the same settings into output_file without re-encoding them."""
+    file_list_path = output_file.with_suffix(".txt")
+    _write_file_list(video_files, file_list_path)
+
+    returncode, stderr = await run_ffmpeg(
+        "ffmpeg",
+        "-y",
+        "-f",
+        "concat",
+        "-safe",
+        "0",
+        "-i",
+        str(file_list_path),
+        "-c",
+        "copy",
+        str(output_file),
+    )
+    if returncode != 0:
+        output_file.unlink(missing_ok=True)
+        raise RuntimeError(stderr)
+
+
+class SceneMerger:
+    """
+    Stitches the scenes of a job together while the job is still rendering.
+    Every scene of the completed prefix is remuxed to MPEG-TS, shifted to start where the previous scene ended, and
+    appended to one joined stream, so once the last scene is done only a single remux to a +faststart mp4 is left.
+    If any step of the pipeline fails the merger falls back to concatenating all scene files at the end.
+    """
+
+    def __init__(self, work_dir: Path, scene_count: int):
+        self.work_dir = work_dir
+        self.scene_count = scene_count
+        self.joined = work_dir / "joined.ts"
+
+        self._ready: dict[int, Path] = {}
+        self._next_idx = 0
+        self._offset = 0.0
+        self._failed = False
+        self._lock = asyncio.Lock()
+
+        work_dir.mkdir(parents=True, exist_ok=True)
+
+    async def add_scene(self, idx: int, video_file: Path):
+        """Add a rendered scene, it is appended along with any scenes waiting on it once its prefix is complete."""
+        async with self._lock:
+            self._ready[idx] = video_file
+            while not self._failed and self._next_idx in self._ready:
+                try:
+                    await self._append(self._next_idx, self._ready[self._next_idx])
+                except Exception as e:
+                    logger.warning(
+                        f"Incremental merge failed at scene {self._next_idx}, merging at the end instead: {e}"
+                    )
+                    self._failed = True
+                    break
+                del self._ready[self._next_idx]
+                self._next_idx += 1
+
+    async def _append(self, idx: int, video_file: Path):
+        duration = await probe_duration(video_file)
+        segment = self.work_dir / f"scene_{idx}.ts"
+
+        returncode, stderr = await run_ffmpeg(
+            "ffmpeg",
+            "-y",
+            "-i",
+            str(video_file),
+            "-c",
+            "copy",
+            "-output_ts_offset",
+            f"{self._offset:.6f}",
+            "-muxdelay",
+            "0",
+            "-muxpreload",
+            "0",
+            "-f",
+            "mpegts",
+            str(segment),
+        )
+        if returncode != 0:
+            raise RuntimeError(stderr)
+
+        await asyncio.to_thread(self._append_bytes, segment)
+        segment.unlink(missing_ok=True)
+        self._offset += duration
+
+    def _append_bytes(self, segment: Path):
+        with open(self.joined, "ab") as joined, open(segment, "rb") as source:
+            shutil.copyfileobj(source, joined)
+
+    async def finish(self, scene_videos: list[Path], output_file: Path):
+        """
+        Write the merged video to output_file with the moov atom at the front. The file is swapped in atomically so
+        a client reading an earlier version of it is never served a partial file.
+        """
+        for idx, video_file in enumerate(scene_videos):
+            if idx >= self._next_idx and idx not in self._ready:
+                await self.add_scene(idx, video_file)
+
+        if self._failed or self._next_idx != self.scene_count:
+            file_list_path = self.work_dir / "file_list.txt"
+            _write_file_list(scene_videos, file_list_path)
+            inputs = ["-f", "concat", "-safe", "0", "-i", str(file_list_path)]
+        else:
+            inputs = ["-i", str(self.joined), "-bsf:a", "aac_adtstoasc"]
+
+        # Merge next to the output so the finished file can be renamed over it while it is being served
+        partial_file = output_file.with_name(f".{output_file.stem}.partial.mp4")
+
+        returncode, stderr = await run_ffmpeg(
+            "ffmpeg",
+            "-y",
+            *inputs,
+            "-c",
+            "copy",
+            "-movflags",
+            "+faststart",
+            str(partial_file),
+        )
+        if returncode != 0:
+            partial_file.unlink(missing_ok=True)
+            raise RuntimeError(stderr)
+
+        os.replace(partial_file, output_file)
@@ -0,0 +1,34 @@
+import re
+from html import escape
+
+# Text mode commands Pango markup can render, by the span they become
+EMPHASIS_COMMANDS = {"textbf": "b", "textit": "i", "emph": "i"}
+EMPHASIS = re.compile(r"\\(textbf|textit|emph)\{([^\\{}$]*)\}")
+
+# Anything left which makes LaTeX typeset the line differently from how it reads: math, commands, groups, sub and
+# superscripts, non-breaking spaces, comments, alignment tabs, parameters, and the ligatures for dashes and quotes
+LATEX_MARKUP = re.compile(r"[\\$^_{}~%&#]|--|``|''")
+
+
+def plain_text_markup(text: str) -> str | None:
+    """
+    Pango markup which renders a TextManager line like Tex would, or None when the line needs LaTeX. Lines without
+    any LaTeX markup and lines only emphasized with \\textbf, \\textit or \\emph qualify. Whitespace is collapsed the way
+    LaTeX collapses it.
+    """
+    text = " ".join(text.split())
+    if not text:
+        return None
+
+    markup = []
+    end = 0
+    for match in EMPHASIS.finditer(text):
+        markup.append(escape(text[end : match.start()], quote=False))
+        tag = EMPHASIS_COMMANDS[match[1]]
+        markup.append(f"<{tag}>{escape(match[2], quote=False)}</{tag}>")
+        end = match.end()
+    markup.append(escape(text[end:], quote=False))
+
+    if LATEX_MARKUP.search(EMPHASIS.sub(r"\2", text)):
+        return None
+    return "".join(markup)
@@ -0,0 +1,56 @@
+import logging
+import time
+
+logger = logging.getLogger("eduwiz.progress")
+
+# Job progress is reported in steps of this many percent
+PROGRESS_STEP = 10
+
+
+class JobProgress:
+    """
+    Combines the animation progress of every scene of a job into one percentage.
+    Each scene is weighted by its predicted render time, so a long scene moves the job further than a short one, and
+    the remaining time is extrapolated from how fast the job has progressed since it started.
+    """
+
+    def __init__(self, weights: dict[int, float]):
+        total = sum(weights.values())
+        self._weights = {
+            idx: (weight / total if total else 1 / len(weights))
+            for idx, weight in weights.items()
+        }
+        self._fractions = {idx: 0.0 for idx in weights}
+        self._reported = 0
+        self.started = time.monotonic()
+
+    @property
+    def percent(self) -> float:
+        return 100 * sum(
+            self._weights[idx] * fraction for idx, fraction in self._fractions.items()
+        )
+
+    def eta_seconds(self) -> float | None:
+        """Seconds until the job is done at the pace it has progressed so far, or None before it has progressed."""
+        done = self.percent / 100
+        if done <= 0:
+            return None
+        elapsed = time.monotonic() - self.started
+        return elapsed * (1 - done) / done
+
+    def update(self, idx: int, fraction: float) -> int | None:
+        """
+        Set how far along a scene is, from 0 to 1. Returns the job percentage when it has crossed into a new step
+        that hasn't been reported yet, otherwise None.
+        """
+        self._fractions[idx] = max(self._fractions[idx], min(1.0, fraction))
+
+        step = int(self.percent // PROGRESS_STEP) * PROGRESS_STEP
+        if step > self._reported:
+            self._reported = step
+            return step
+        return None
+
+    def complete(self, idx: int) -> int | None:
+        """Mark a scene as done, whether it rendered, came from a cache or failed."""
+        return self.update(idx, 1.0)
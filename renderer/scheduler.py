@@ -0,0 +1,226 @@
+import asyncio
+import itertools
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Callable
+
+logger = logging.getLogger("eduwiz.scheduler")
+
+# Seconds of a job's predicted render time forgiven for every second its scenes have waited
+SCENE_AGING_RATE = float(os.getenv("SCENE_AGING_RATE", "0.5"))
+
+
+def scene_rank(
+    priority: int,
+    job_seconds: float,
+    job_waited_seconds: float,
+    predicted_seconds: float,
+    aging_rate: float,
+) -> tuple[int, float, float]:
+    """
+    Rank of a waiting scene, the lowest is started first: by priority, then the job with the least predicted render
+    time left waiting first, then the longest predicted scene of that job first. Every second a job waits takes
+    aging_rate seconds off its predicted time, so a large job is not starved by a stream of small ones.
+    """
+    return priority, job_seconds - aging_rate * job_waited_seconds, -predicted_seconds
+
+
+class SceneScheduler:
+    """
+    Bounds the work running in this container at two levels.
+    Jobs wait for one of the job slots before any of their scenes are queued, and every scene waits for a slot in the
+    global scene pool before its manim process is started. Waiting scenes are served by priority, lowest first, then
+    by their predicted render time, see scene_rank. Jobs with the least work left go first, which keeps the mean job
+    time down, and a job takes as long as its slowest scene so its longest scenes are started first.
+    When free_memory_mb is given, a scene is only admitted while there is room for another scene_memory_mb next to
+    the ones running, so slots stay empty while memory is short. A scene is always admitted when none are running.
+    Scenes admitted within the last warmup_seconds have likely not allocated their memory yet, so it is held for them.
+    """
+
+    def __init__(
+        self,
+        scene_slots: int,
+        job_limit: int,
+        scene_memory_mb: int = 0,
+        free_memory_mb: Callable[[], int | None] | None = None,
+        warmup_seconds: float = 10.0,
+        aging_rate: float = SCENE_AGING_RATE,
+    ):
+        self.scene_slots = scene_slots
+        self.job_limit = job_limit
+        self.scene_memory_mb = scene_memory_mb
+        self.free_memory_mb = free_memory_mb
+        self.warmup_seconds = warmup_seconds
+        self.aging_rate = aging_rate
+        self._admissions: list[float] = []
+
+        self._job_semaphore = asyncio.Semaphore(job_limit)
+        # Waiting scenes as (priority, job id, predicted seconds, enqueued at, arrival, future)
+        self._scene_waiters: list[
+            tuple[int, str, float, float, int, asyncio.Future]
+        ] = []
+        self._arrivals = itertools.count()
+
+        self.running_jobs = 0
+        self.queued_jobs = 0
+        self.running_scenes = 0
+
+    @property
+    def queued_scenes(self) -> int:
+        return sum(not waiter[-1].done() for waiter in self._scene_waiters)
+
+    def idle_scene_slots(self) -> int:
+        return max(0, self.scene_slots - self.running_scenes)
+
+    @asynccontextmanager
+    async def job_slot(self, job_id: str):
+        """Hold one of the job slots for the duration of the block."""
+        self.queued_jobs += 1
+        try:
+            await self._job_semaphore.acquire()
+        finally:
+            self.queued_jobs -= 1
+
+        self.running_jobs += 1
+        logger.info(
+            f"Job {job_id} admitted ({self.running_jobs}/{self.job_limit} jobs running, {self.queued_jobs} queued)"
+        )
+        try:
+            yield
+        finally:
+            self.running_jobs -= 1
+            self._job_semaphore.release()
+
+    def _memory_room(self) -> int | None:
+        """How many more scenes fit in the free memory, or None if that isn't tracked."""
+        if self.free_memory_mb is None or not self.scene_memory_mb:
+            return None
+        free = self.free_memory_mb()
+        if free is None:
+            return None
+
+        cutoff = time.monotonic() - self.warmup_seconds
+        self._admissions = [t for t in self._admissions if t > cutoff]
+        reserved = len(self._admissions) * self.scene_memory_mb
+        return max(0, free - reserved) // self.scene_memory_mb
+
+    def _admit(self):
+        self.running_scenes += 1
+        if self.free_memory_mb is not None:
+            self._admissions.append(time.monotonic())
+
+    def _can_admit(self, admitted: int, room: int | None) -> bool:
+        if self.running_scenes >= self.scene_slots:
+            return False
+        if room is None or self.running_scenes == 0:
+            return True
+        return admitted < room
+
+    def _pop_waiter(self) -> asyncio.Future:
+        """Remove the waiting scene ranked first, ties going to the earliest arrival."""
+        now = time.monotonic()
+        job_seconds: dict[str, float] = {}
+        job_since: dict[str, float] = {}
+        for _, job_id, predicted_seconds, enqueued, _, future in self._scene_waiters:
+            if not future.done():
+                job_seconds[job_id] = job_seconds.get(job_id, 0.0) + predicted_seconds
+                job_since[job_id] = min(job_since.get(job_id, enqueued), enqueued)
+
+        def rank(i: int) -> tuple:
+            priority, job_id, predicted_seconds, _, arrival, _ = self._scene_waiters[i]
+            return (
+                *scene_rank(
+                    priority,
+                    job_seconds.get(job_id, 0.0),
+                    now - job_since.get(job_id, now),
+                    predicted_seconds,
+                    self.aging_rate,
+                ),
+                arrival,
+            )
+
+        best = min(range(len(self._scene_waiters)), key=rank)
+        return self._scene_waiters.pop(best)[-1]
+
+    async def _acquire_scene(
+        self, job_id: str, priority: int, predicted_seconds: float
+    ):
+        if not self.queued_scenes and self._can_admit(0, self._memory_room()):
+            self._admit()
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._scene_waiters.append(
+            (
+                priority,
+                job_id,
+                predicted_seconds,
+                time.monotonic(),
+                next(self._arrivals),
+                future,
+            )
+        )
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before the cancellation, pass it on
+            if future.done() and not future.cancelled():
+                self._release_scene()
+            raise
+
+    def _release_scene(self):
+        self.running_scenes -= 1
+
+        # Slots held back for lack of memory are filled too once it has been freed
+        room = self._memory_room()
+        admitted = 0
+        while self._scene_waiters and self._can_admit(admitted, room):
+            future = self._pop_waiter()
+            if not future.done():
+                self._admit()
+                admitted += 1
+                future.set_result(None)
+
+        if self._scene_waiters and self.running_scenes < self.scene_slots:
+            logger.debug(
+                f"Holding back {self.queued_scenes} scenes, not enough memory is free for another scene"
+            )
+
+    @asynccontextmanager
+    async def idle_slots(self, job_id: str, limit: int):
+        """
+        Hold up to limit scene slots that no waiting scene needs for the duration of the block, yielding how many were
+        taken. Never waits, so it yields 0 when every slot is in use, scenes are queued or memory is short.
+        """
+        taken = 0
+        room = self._memory_room()
+        while taken < limit and not self.queued_scenes and self._can_admit(taken, room):
+            self._admit()
+            taken += 1
+
+        if taken:
+            logger.debug(
+                f"Job {job_id} took {taken} idle slots ({self.running_scenes}/{self.scene_slots} slots in use)"
+            )
+        try:
+            yield taken
+        finally:
+            for _ in range(taken):
+                self._release_scene()
+
+    @asynccontextmanager
+    async def scene_slot(
+        self, job_id: str, idx: int, priority: int = 0, predicted_seconds: float = 0.0
+    ):
+        """Hold one of the scene slots for the duration of the block."""
+        await self._acquire_scene(job_id, priority, predicted_seconds)
+
+        logger.debug(
+            f"Scene {idx} of job {job_id} started ({self.running_scenes}/{self.scene_slots} slots in use, {self.queued_scenes} queued)"
+        )
+        try:
+            yield
+        finally:
+            self._release_scene()
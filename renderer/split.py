@@ -0,0 +1,542 @@
+"""
+Splits a scene into parts that render independently at the points where construct() empties the screen, so a long
+scene can be rendered by several manim processes at once and the parts concatenated in order.
+"""
+
+import ast
+import logging
+import os
+
+from analysis import TEXT_MANAGER_TEX, scene_features
+
+logger = logging.getLogger("eduwiz.split")
+
+# Most parts a scene is split into, and the shortest part by estimated video length worth its own manim process
+SCENE_SPLIT_MAX_PARTS = int(os.getenv("SCENE_SPLIT_MAX_PARTS", "4"))
+SCENE_SPLIT_MIN_SECONDS = float(os.getenv("SCENE_SPLIT_MIN_SECONDS", "8"))
+
+# Scene methods which don't put anything on the screen, the only ones a part ending in clear_scene may call since
+# clear_scene only fades out what the TextManager added
+NON_DRAWING_SCENE_CALLS = {
+    "wait",
+    "next_section",
+    "voiceover",
+    "add_sound",
+    "set_speech_service",
+}
+
+# Scene methods which may run in the setup every part repeats
+SETUP_SCENE_CALLS = {"set_speech_service"}
+
+# Scene state which carries over the whole video, scenes touching it are always rendered whole
+CONTINUOUS_SCENE_ATTRIBUTES = {
+    "camera",
+    "renderer",
+    "time",
+    "foreground_mobjects",
+    "add_foreground_mobject",
+    "add_foreground_mobjects",
+    "add_updater",
+}
+
+TEXT_MANAGER_CALLS = set(TEXT_MANAGER_TEX) | {"clear_scene", "batch"}
+
+
+def _is_self(node: ast.AST) -> bool:
+    return isinstance(node, ast.Name) and node.id == "self"
+
+
+def _self_call(node: ast.AST) -> str | None:
+    """Name of the scene method node calls, if it is a call like self.play(...)."""
+    if (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Attribute)
+        and _is_self(node.func.value)
+    ):
+        return node.func.attr
+    return None
+
+
+def _statement_call(statement: ast.stmt) -> ast.Call | None:
+    if isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Call):
+        return statement.value
+    return None
+
+
+def _covers_all_mobjects(node: ast.AST) -> bool:
+    """Whether node is *self.mobjects, or a Group or VGroup of it."""
+    if isinstance(node, ast.Starred):
+        node = node.value
+        return (
+            isinstance(node, ast.Attribute)
+            and _is_self(node.value)
+            and node.attr == "mobjects"
+        )
+    return (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id in ("Group", "VGroup")
+        and len(node.args) == 1
+        and _covers_all_mobjects(node.args[0])
+    )
+
+
+def _fades_out_everything(call: ast.Call) -> bool:
+    """Whether call is self.play(FadeOut(*self.mobjects)) or self.play(*[FadeOut(m) for m in self.mobjects])."""
+    if _self_call(call) != "play" or len(call.args) != 1:
+        return False
+    arg = call.args[0]
+
+    if (
+        isinstance(arg, ast.Call)
+        and isinstance(arg.func, ast.Name)
+        and arg.func.id == "FadeOut"
+        and len(arg.args) == 1
+    ):
+        return _covers_all_mobjects(arg.args[0])
+
+    if isinstance(arg, ast.Starred) and isinstance(
+        arg.value, (ast.ListComp, ast.GeneratorExp)
+    ):
+        comprehension = arg.value
+        if len(comprehension.generators) != 1:
+            return False
+        generator = comprehension.generators[0]
+        element = comprehension.elt
+        return (
+            not generator.ifs
+            and isinstance(generator.target, ast.Name)
+            and isinstance(generator.iter, ast.Attribute)
+            and _is_self(generator.iter.value)
+            and generator.iter.attr == "mobjects"
+            and isinstance(element, ast.Call)
+            and isinstance(element.func, ast.Name)
+            and element.func.id == "FadeOut"
+            and len(element.args) == 1
+            and isinstance(element.args[0], ast.Name)
+            and element.args[0].id == generator.target.id
+        )
+    return False
+
+
+def _clears(statement: ast.stmt, text_managers: set[str]) -> str | None:
+    """
+    Whether the statement empties the screen: "text" when it clears a TextManager, which only removes the text that
+    TextManager added, "all" when it removes every mobject of the scene.
+    """
+    call = _statement_call(statement)
+    if call is None:
+        return None
+    if (
+        isinstance(call.func, ast.Attribute)
+        and call.func.attr == "clear_scene"
+        and isinstance(call.func.value, ast.Name)
+        and call.func.value.id in text_managers
+    ):
+        return "text"
+    if _self_call(call) == "clear" or _fades_out_everything(call):
+        return "all"
+    return None
+
+
+def _self_uses(node: ast.AST) -> tuple[set[str], int]:
+    """
+    The scene methods called under node, and how many times self is used other than to call a scene method or to
+    build a TextManager.
+    """
+    calls = set()
+    allowed = set()
+    for child in ast.walk(node):
+        name = _self_call(child)
+        if name is not None:
+            calls.add(name)
+            allowed.add(id(child.func.value))
+        elif (
+            isinstance(child, ast.Call)
+            and isinstance(child.func, ast.Name)
+            and child.func.id == "TextManager"
+        ):
+            allowed.update(id(arg) for arg in child.args)
+    other = sum(
+        1 for child in ast.walk(node) if _is_self(child) and id(child) not in allowed
+    )
+    return calls, other
+
+
+def _uses_text_manager(node: ast.AST, text_managers: set[str]) -> bool:
+    return any(
+        isinstance(child, ast.Name) and child.id in text_managers
+        for child in ast.walk(node)
+    )
+
+
+class _NameFlow(ast.NodeVisitor):
+    """
+    Follows the names a block of statements binds and reads in execution order. free holds the names read before
+    the block has certainly bound them, assigned every name the block may bind.
+    """
+
+    def __init__(self):
+        self.bound: set[str] = set()
+        self.assigned: set[str] = set()
+        self.free: set[str] = set()
+
+    def visit_Name(self, node: ast.Name):
+        if isinstance(node.ctx, ast.Load):
+            if node.id not in self.bound:
+                self.free.add(node.id)
+        else:
+            self.bound.add(node.id)
+            self.assigned.add(node.id)
+
+    def visit_Assign(self, node: ast.Assign):
+        self.visit(node.value)
+        for target in node.targets:
+            self.visit(target)
+
+    def visit_AnnAssign(self, node: ast.AnnAssign):
+        if node.value is not None:
+            self.visit(node.value)
+        self.visit(node.target)
+
+    def visit_AugAssign(self, node: ast.AugAssign):
+        self.visit(node.value)
+        if isinstance(node.target, ast.Name) and node.target.id not in self.bound:
+            self.free.add(node.target.id)
+        self.visit(node.target)
+
+    def visit_NamedExpr(self, node: ast.NamedExpr):
+        self.visit(node.value)
+        self.visit(node.target)
+
+    def _maybe(self, statements: list[ast.AST]) -> set[str]:
+        """Visit statements which may not run, returning what they bind without counting it as certainly bound."""
+        bound = set(self.bound)
+        for statement in statements:
+            self.visit(statement)
+        branch, self.bound = self.bound, bound
+        return branch
+
+    def visit_If(self, node: ast.If):
+        self.visit(node.test)
+        body = self._maybe(node.body)
+        orelse = self._maybe(node.orelse)
+        self.bound |= body & orelse
+
+    def visit_For(self, node: ast.For):
+        self.visit(node.iter)
+        self._maybe([node.target, *node.body, *node.orelse])
+
+    visit_AsyncFor = visit_For
+
+    def visit_While(self, node: ast.While):
+        self.visit(node.test)
+        self._maybe([*node.body, *node.orelse])
+
+    def visit_Try(self, node: ast.Try):
+        self._maybe([*node.body, *node.handlers, *node.orelse])
+        for statement in node.finalbody:
+            self.visit(statement)
+
+    visit_TryStar = visit_Try
+
+    def visit_With(self, node: ast.With):
+        for item in node.items:
+            self.visit(item.context_expr)
+            if item.optional_vars is not None:
+                self.visit(item.optional_vars)
+        for statement in node.body:
+            self.visit(statement)
+
+    visit_AsyncWith = visit_With
+
+    def _scoped(self, nodes: list[ast.AST], local: set[str] = frozenset()):
+        """Visit nodes in a scope of their own, only the outer names they read count."""
+        bound, assigned = set(self.bound), set(self.assigned)
+        self.bound |= local
+        for node in nodes:
+            self.visit(node)
+        self.bound, self.assigned = bound, assigned
+
+    def _comprehension(self, node, elements: list[ast.AST]):
+        self.visit(node.generators[0].iter)
+        nodes = [node.generators[0].target, *node.generators[0].ifs]
+        for generator in node.generators[1:]:
+            nodes += [generator.iter, generator.target, *generator.ifs]
+        self._scoped(nodes + elements)
+
+    def visit_ListComp(self, node):
+        self._comprehension(node, [node.elt])
+
+    visit_SetComp = visit_GeneratorExp = visit_ListComp
+
+    def visit_DictComp(self, node: ast.DictComp):
+        self._comprehension(node, [node.key, node.value])
+
+    def _arguments(self, args: ast.arguments) -> set[str]:
+        for default in [*args.defaults, *args.kw_defaults]:
+            if default is not None:
+                self.visit(default)
+        every = [*args.posonlyargs, *args.args, *args.kwonlyargs]
+        every += [arg for arg in (args.vararg, args.kwarg) if arg is not None]
+        return {arg.arg for arg in every}
+
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        for decorator in node.decorator_list:
+            self.visit(decorator)
+        self._scoped(node.body, self._arguments(node.args))
+        self.bound.add(node.name)
+        self.assigned.add(node.name)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Lambda(self, node: ast.Lambda):
+        self._scoped([node.body], self._arguments(node.args))
+
+
+def _name_flow(statements: list[ast.stmt]) -> _NameFlow:
+    flow = _NameFlow()
+    for statement in statements:
+        flow.visit(statement)
+    return flow
+
+
+def _immutable_bindings(statements: list[ast.stmt]) -> set[str]:
+    """Names the statements only ever bind to a constant or a function."""
+    immutable, mutable = set(), set()
+    for statement in statements:
+        if (
+            isinstance(statement, ast.Assign)
+            and all(isinstance(target, ast.Name) for target in statement.targets)
+            and isinstance(statement.value, ast.Constant)
+        ):
+            immutable.update(target.id for target in statement.targets)
+        elif isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            immutable.add(statement.name)
+        else:
+            mutable |= _name_flow([statement]).assigned
+    return immutable - mutable
+
+
+def _scene_class(tree: ast.Module) -> ast.ClassDef | None:
+    return next(
+        (
+            node
+            for node in tree.body
+            if isinstance(node, ast.ClassDef) and node.name == "ManimVideo"
+        ),
+        None,
+    )
+
+
+def _first_line(statement: ast.stmt) -> int:
+    decorators = getattr(statement, "decorator_list", [])
+    return min([statement.lineno, *(decorator.lineno for decorator in decorators)])
+
+
+def _segments(
+    code: str,
+) -> tuple[list[str], list[ast.stmt], list[list[ast.stmt]]] | None:
+    """
+    Find where construct() can be split: the setup statements every part repeats, and the segments of the rest of
+    construct(), each but the last ending in a statement which empties the screen. Returns None when construct()
+    carries state from one segment into the next that repeating the setup doesn't rebuild.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None
+
+    scene_class = _scene_class(tree)
+    if scene_class is None:
+        return None
+    methods = {
+        item.name: item
+        for item in scene_class.body
+        if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))
+    }
+    construct = methods.get("construct")
+    if construct is None:
+        return None
+    body = construct.body
+
+    # Statements on a shared line can't be taken apart by line
+    for previous, statement in zip(body, body[1:]):
+        if _first_line(statement) <= previous.end_lineno:
+            return None
+
+    # Helpers the scene calls must not keep state on the scene either
+    for node in [construct, *methods.values()]:
+        for child in ast.walk(node):
+            if isinstance(child, (ast.Global, ast.Nonlocal)):
+                return None
+            if (
+                isinstance(child, ast.Attribute)
+                and _is_self(child.value)
+                and child.attr in CONTINUOUS_SCENE_ATTRIBUTES
+            ):
+                return None
+            if (
+                node is not construct
+                and isinstance(child, ast.Attribute)
+                and _is_self(child.value)
+                and isinstance(child.ctx, ast.Store)
+            ):
+                return None
+
+    # The setup is every statement up to the first one which draws, TextManagers have to be built in it
+    text_managers = set()
+    setup_length = 0
+    for statement in body:
+        calls, other = _self_uses(statement)
+        if (
+            other
+            or calls - SETUP_SCENE_CALLS
+            or _uses_text_manager(statement, text_managers)
+        ):
+            break
+        if (
+            isinstance(statement, ast.Assign)
+            and len(statement.targets) == 1
+            and isinstance(statement.targets[0], ast.Name)
+            and isinstance(statement.value, ast.Call)
+            and isinstance(statement.value.func, ast.Name)
+            and statement.value.func.id == "TextManager"
+        ):
+            text_managers.add(statement.targets[0].id)
+        setup_length += 1
+    setup, rest = body[:setup_length], body[setup_length:]
+
+    segments: list[list[ast.stmt]] = [[]]
+    endings: list[str | None] = []
+    for statement in rest:
+        segments[-1].append(statement)
+        clears = _clears(statement, text_managers)
+        if clears:
+            endings.append(clears)
+            segments.append([])
+    if not segments[-1]:
+        segments.pop()
+    endings += [None] * (len(segments) - len(endings))
+
+    # Every part rebuilds what the setup binds, so a setup object one segment changes, like a mobject it moves, is
+    # back to its initial state in the parts of the segments after it. Only constants and helpers are safe to share.
+    shared = _name_flow(setup).assigned - text_managers - _immutable_bindings(setup)
+
+    bound_before: set[str] = set()
+    shared_before: set[str] = set()
+    for segment, ending in zip(segments, endings):
+        for statement in segment:
+            # Scene attributes set after the setup may be read by a later segment
+            for child in ast.walk(statement):
+                if (
+                    isinstance(child, ast.Attribute)
+                    and _is_self(child.value)
+                    and isinstance(child.ctx, ast.Store)
+                ):
+                    return None
+                # A TextManager may only be used through its add_*, batch and clear_scene methods
+                if (
+                    isinstance(child, ast.Attribute)
+                    and isinstance(child.value, ast.Name)
+                    and child.value.id in text_managers
+                    and child.attr not in TEXT_MANAGER_CALLS
+                ):
+                    return None
+
+        # Every segment starts over with a fresh TextManager, which only matches when the TextManager is empty at
+        # the start of the segment and untouched by segments which don't clear it
+        if ending == "all" and any(
+            _uses_text_manager(statement, text_managers) for statement in segment
+        ):
+            return None
+        if ending == "text":
+            for statement in segment:
+                calls, other = _self_uses(statement)
+                if other or calls - NON_DRAWING_SCENE_CALLS:
+                    return None
+
+        flow = _name_flow(segment)
+        if flow.free & bound_before or flow.free & shared & shared_before:
+            return None
+        bound_before |= flow.assigned
+        shared_before |= flow.free & shared
+
+    lines = code.splitlines(keepends=True)
+    return lines, setup, segments
+
+
+def _part_code(
+    lines: list[str], segments: list[list[ast.stmt]], keep: list[int]
+) -> str:
+    """The scene with the statements of every segment but the kept ones blanked out, so line numbers still match."""
+    part = list(lines)
+    for idx, segment in enumerate(segments):
+        if idx in keep:
+            continue
+        for statement in segment:
+            for line in range(_first_line(statement) - 1, statement.end_lineno):
+                part[line] = "\n"
+    return "".join(part)
+
+
+def _has_audio(segment: list[ast.stmt]) -> bool:
+    return any(
+        _self_call(node) in ("voiceover", "add_sound")
+        for statement in segment
+        for node in ast.walk(statement)
+    )
+
+
+def split_scene(code: str, max_parts: int, min_seconds: float) -> list[str]:
+    """
+    Split a scene into at most max_parts scenes which together render the same video when concatenated in order.
+    Segments are grouped so every part lasts at least min_seconds by the estimated length of its animations and
+    voiceovers, and so every part has audio when any part does, since parts are concatenated without re-encoding.
+    Returns an empty list when the scene can't be split safely or isn't worth splitting.
+    """
+    if max_parts < 2:
+        return []
+    found = _segments(code)
+    if found is None:
+        return []
+    lines, setup, segments = found
+    if len(segments) < 2:
+        return []
+
+    seconds = [
+        scene_features(_part_code(lines, segments, [idx]))["duration_seconds"]
+        for idx in range(len(segments))
+    ]
+    audio = [_has_audio(segment) for segment in segments]
+
+    # Every segment goes to the part its midpoint falls into when the video is cut into equal shares
+    share = max(sum(seconds) / max_parts, min_seconds)
+    grouped: dict[int, list[int]] = {}
+    elapsed = 0.0
+    for idx, duration in enumerate(seconds):
+        part = min(int((elapsed + duration / 2) // share), max_parts - 1)
+        grouped.setdefault(part, []).append(idx)
+        elapsed += duration
+    groups = [grouped[part] for part in sorted(grouped)]
+
+    # A short or silent trailing group is folded into the one before it
+    while len(groups) > 1 and (
+        sum(seconds[idx] for idx in groups[-1]) < min_seconds
+        or (any(audio) and not any(audio[idx] for idx in groups[-1]))
+    ):
+        groups[-2] += groups.pop()
+    for group_idx in range(len(groups) - 2, -1, -1):
+        if any(audio) and not any(audio[idx] for idx in groups[group_idx]):
+            groups[group_idx] += groups.pop(group_idx + 1)
+
+    if len(groups) < 2:
+        return []
+
+    parts = [_part_code(lines, segments, group) for group in groups]
+    for part in parts:
+        try:
+            compile(part, "scene.py", "exec")
+        except SyntaxError:
+            return []
+    return parts
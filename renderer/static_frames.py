@@ -0,0 +1,98 @@
+import os
+
+# Whether runs of identical frames are encoded as one frame held for their duration
+STATIC_FRAME_ENCODING = os.getenv("STATIC_FRAME_ENCODING", "true").lower() == "true"
+
+# Queued to manim's frame writer thread to have it encode the frame it is holding back
+_FLUSH = object()
+
+
+class _StaticFrameStream:
+    """
+    Wraps the video stream of a partial movie. Holds back the last frame written in case the frames after it are the
+    same, and gives every packet the encoder returns the duration of the run of frames it stands for.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self.frame = None
+        self.count = 0
+        self.next_pts = 0
+        self.durations: dict[int, int] = {}
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    def hold(self, av_frame) -> list:
+        """Encode the frame held for the run of frames counted so far."""
+        av_frame.pts = self.next_pts
+        self.durations[self.next_pts] = self.count
+        self.next_pts += self.count
+        return self.encode(av_frame)
+
+    def encode(self, frame=None) -> list:
+        packets = self._stream.encode(frame)
+        for packet in packets:
+            if packet.pts is not None:
+                packet.duration = self.durations.pop(packet.pts, 1)
+        return packets
+
+
+def install() -> bool:
+    """
+    Make manim encode runs of identical frames in this process as a single frame, with the timestamps of a variable
+    frame rate stream holding it for the whole run, instead of encoding the same frame again for every tick of the
+    frame rate. Waits on a static scene arrive as one frame repeated and frames rendered while nothing moves are
+    compared with the previous one, so a held frame costs one encode and one packet whatever its length.
+    Returns False when manim's file writer doesn't encode frames the way this expects, leaving it untouched.
+    """
+    import av
+    import numpy as np
+    from manim.scene.scene_file_writer import SceneFileWriter
+
+    if not STATIC_FRAME_ENCODING:
+        return False
+    if not all(
+        hasattr(SceneFileWriter, name)
+        for name in ("encode_and_write_frame", "close_partial_movie_stream")
+    ):
+        return False
+
+    def encode_held_frame(writer: SceneFileWriter, stream: _StaticFrameStream):
+        av_frame = av.VideoFrame.from_ndarray(stream.frame, format="rgba")
+        av_frame = av_frame.reformat(format=stream.pix_fmt)
+        for packet in stream.hold(av_frame):
+            writer.video_container.mux(packet)
+        stream.frame = None
+
+    def encode_and_write_frame(writer: SceneFileWriter, frame, num_frames: int):
+        # Runs on the writer thread, the only one encoding until the partial movie is closed. Every partial movie
+        # gets a new stream, which is wrapped on its first frame.
+        stream = writer.video_stream
+        if not isinstance(stream, _StaticFrameStream):
+            stream = writer.video_stream = _StaticFrameStream(stream)
+
+        if frame is _FLUSH:
+            if stream.frame is not None:
+                encode_held_frame(writer, stream)
+            return
+
+        if stream.frame is not None and np.array_equal(stream.frame, frame):
+            stream.count += num_frames
+            return
+        if stream.frame is not None:
+            encode_held_frame(writer, stream)
+        stream.frame = np.array(frame)
+        stream.count = num_frames
+
+    close_partial_movie_stream = SceneFileWriter.close_partial_movie_stream
+
+    def close_and_flush(writer: SceneFileWriter):
+        # The held frame is encoded before the writer thread stops, the packets the encoder still holds are flushed
+        # through the wrapped stream by the original close
+        writer.queue.put((0, _FLUSH))
+        close_partial_movie_stream(writer)
+
+    SceneFileWriter.encode_and_write_frame = encode_and_write_frame
+    SceneFileWriter.close_partial_movie_stream = close_and_flush
+    return True
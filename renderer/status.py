@@ -0,0 +1,125 @@
+import asyncio
+import json
+import logging
+import os
+
+import aio_pika
+
+from rabbitmq import RabbitMQConnection
+
+logger = logging.getLogger("eduwiz.status")
+
+# Seconds between flushes of the buffered statuses
+STATUS_FLUSH_INTERVAL = float(os.getenv("STATUS_FLUSH_INTERVAL", "1.0"))
+
+
+def is_progress(status: str) -> bool:
+    """Whether the status is a job percentage, the only statuses a newer one may replace before they are sent."""
+    return status.isdigit()
+
+
+class StatusPublisher:
+    """
+    Publishes job statuses to the status_updates queue on a channel of its own with publisher confirms, so status
+    traffic never competes with the channel jobs are consumed on.
+    Progress ticks are buffered per job and a newer tick replaces one that is still pending, which drops percentages
+    that went stale before they were sent. Pending ticks are flushed every interval seconds. Every other status is a
+    milestone, such as preview_ready or completed, which is never replaced: it is queued behind the job's pending
+    statuses and flushed right away, so a job's statuses are always published in the order they were sent.
+    """
+
+    def __init__(self, interval: float = STATUS_FLUSH_INTERVAL):
+        self.interval = interval
+        self._pending: dict[str, list[dict]] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flusher: asyncio.Task | None = None
+
+        self.published = 0
+        self.superseded = 0
+
+    async def publish(self, job_id: str, status: str, eta_seconds: float | None = None):
+        """Queue the status of a job, waiting for it to be confirmed only when it is a milestone."""
+        message = {"job_id": job_id, "status": status}
+        if eta_seconds is not None:
+            message["eta_seconds"] = round(eta_seconds)
+
+        pending = self._pending.setdefault(job_id, [])
+        if is_progress(status) and pending and is_progress(pending[-1]["status"]):
+            self.superseded += 1
+            pending[-1] = message
+        else:
+            pending.append(message)
+
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_periodically())
+
+        if not is_progress(status):
+            await self.flush()
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def flush(self):
+        """
+        Publish every pending status and wait for the broker to confirm them. The statuses of a job are published one
+        after the other, and the ones left when a publish fails stay pending for the next flush ahead of any newer
+        statuses of the job.
+        """
+        # Flushes run one at a time so an older status of a job is never confirmed after a newer one
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+
+            try:
+                rabbitmq = await RabbitMQConnection.get_instance()
+                channel = await rabbitmq.get_status_channel()
+            except Exception as e:
+                logger.warning(f"Failed to get the status channel: {e}")
+                self._keep(pending)
+                return
+
+            async def publish_job(messages: list[dict]) -> list[dict]:
+                for sent, message in enumerate(messages):
+                    try:
+                        await channel.default_exchange.publish(
+                            aio_pika.Message(
+                                body=json.dumps(message).encode(),
+                                content_type="application/json",
+                            ),
+                            routing_key="status_updates",
+                        )
+                    except Exception as e:
+                        logger.warning(
+                            f"Failed to publish status {message['status']} of job {message['job_id']}: {e}"
+                        )
+                        return messages[sent:]
+                    self.published += 1
+                return []
+
+            job_ids = list(pending)
+            unsent = await asyncio.gather(
+                *[publish_job(pending[job_id]) for job_id in job_ids]
+            )
+
+            failed = {job_id: rest for job_id, rest in zip(job_ids, unsent) if rest}
+            if failed:
+                logger.warning(
+                    f"Failed to publish the statuses of {len(failed)} jobs, retrying them on the next flush"
+                )
+                self._keep(failed)
+
+    def _keep(self, pending: dict[str, list[dict]]):
+        for job_id, messages in pending.items():
+            self._pending[job_id] = messages + self._pending.get(job_id, [])
+
+    async def close(self):
+        """Stop flushing periodically and publish whatever is still pending."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+        await self.flush()
+        logger.info(
+            f"Published {self.published} status updates, {self.superseded} were superseded before being sent"
+        )
@@ -0,0 +1,167 @@
+import asyncio
+import csv
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+
+from merge import run_ffmpeg
+
+logger = logging.getLogger("eduwiz.stream")
+
+HLS_SEGMENT_SECONDS = int(os.getenv("HLS_SEGMENT_SECONDS", "4"))
+# Segments can only be cut at keyframes, so they may run past the requested length
+HLS_TARGET_DURATION = int(os.getenv("HLS_TARGET_DURATION", "10"))
+# How long the stream of a finished job is kept for players still on it before it is swept
+STREAM_TTL = int(os.getenv("STREAM_TTL", "600"))
+
+# Written to the directory of a stream once its job is done with it, its mtime is when that happened
+CLOSED_MARKER = ".closed"
+
+
+class SceneStream:
+    """
+    HLS event playlist of a job which grows scene by scene while the job is rendering.
+    Scenes may finish in any order, each is cut into MPEG-TS segments as soon as every scene before it is in the
+    playlist. A discontinuity is marked between scenes since each one starts its own timeline, and a scene which
+    can't be segmented is left out of the stream.
+    Streams are closed when their job is done, whatever its outcome, which ends the playlist. They are swept with
+    sweep_streams once they have been closed for a while.
+    """
+
+    def __init__(self, stream_dir: Path, scene_count: int):
+        self.stream_dir = stream_dir
+        self.scene_count = scene_count
+        self.playlist = stream_dir / "index.m3u8"
+
+        self._ready: dict[int, Path] = {}
+        self._next_idx = 0
+        self._entries: list[str] = []
+        self._closed = False
+        self._lock = asyncio.Lock()
+
+        # A previous attempt of the job may have left a stream behind
+        shutil.rmtree(stream_dir, ignore_errors=True)
+        stream_dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def started(self) -> bool:
+        return bool(self._entries)
+
+    @property
+    def finished(self) -> bool:
+        return self._closed or self._next_idx == self.scene_count
+
+    def close(self):
+        """End the playlist, players stop polling it, and mark the stream as no longer written to so it can be swept."""
+        self._closed = True
+        try:
+            self._write_playlist()
+            (self.stream_dir / CLOSED_MARKER).touch()
+        except OSError as e:
+            logger.warning(f"Failed to close stream {self.stream_dir.name}: {e}")
+
+    async def add_scene(self, idx: int, video_file: Path) -> bool:
+        """
+        Add a rendered scene, it is appended along with any scenes waiting on it once every scene before it is in the
+        playlist. Returns True if this call published the first segments of the stream.
+        """
+        async with self._lock:
+            if self._closed:
+                return False
+
+            started = self.started
+            self._ready[idx] = video_file
+            while self._next_idx in self._ready:
+                scene_idx = self._next_idx
+                segments = await self._segment(scene_idx, self._ready.pop(scene_idx))
+                self._next_idx += 1
+                if segments is None:
+                    # The scene is skipped so the stream still reaches its end, the merged mp4 has every scene
+                    if self.finished:
+                        self._write_playlist()
+                    continue
+
+                if self._entries:
+                    self._entries.append("#EXT-X-DISCONTINUITY")
+                for name, duration in segments:
+                    self._entries.append(f"#EXTINF:{duration:.3f},")
+                    self._entries.append(name)
+
+                self._write_playlist()
+
+            return not started and self.started
+
+    async def _segment(
+        self, idx: int, video_file: Path
+    ) -> list[tuple[str, float]] | None:
+        segment_list = self.stream_dir / f".scene_{idx}.csv"
+        returncode, stderr = await run_ffmpeg(
+            "ffmpeg",
+            "-y",
+            "-i",
+            str(video_file),
+            "-c",
+            "copy",
+            "-f",
+            "segment",
+            "-segment_time",
+            str(HLS_SEGMENT_SECONDS),
+            "-segment_format",
+            "mpegts",
+            "-segment_list",
+            str(segment_list),
+            "-segment_list_type",
+            "csv",
+            str(self.stream_dir / f"scene_{idx}_%03d.ts"),
+        )
+        if returncode != 0:
+            logger.error(
+                f"Failed to segment scene {idx} for {self.stream_dir.name}: {stderr}"
+            )
+            return None
+
+        segments = []
+        with open(segment_list, newline="") as f:
+            for name, start, end in csv.reader(f):
+                duration = float(end) - float(start)
+                if duration > HLS_TARGET_DURATION:
+                    logger.warning(
+                        f"Segment {name} is {duration:.1f}s, longer than the {HLS_TARGET_DURATION}s target duration"
+                    )
+                segments.append((Path(name).name, duration))
+        segment_list.unlink(missing_ok=True)
+        return segments
+
+    def _write_playlist(self):
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            f"#EXT-X-TARGETDURATION:{HLS_TARGET_DURATION}",
+            "#EXT-X-PLAYLIST-TYPE:EVENT",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+            *self._entries,
+        ]
+        if self.finished:
+            lines.append("#EXT-X-ENDLIST")
+
+        # Players poll the playlist, so it is never seen half written
+        partial = self.playlist.with_suffix(".m3u8.partial")
+        partial.write_text("\n".join(lines) + "\n")
+        os.replace(partial, self.playlist)
+
+
+def sweep_streams(streams_dir: Path, ttl: int = STREAM_TTL):
+    """Remove every stream that was closed more than ttl seconds ago."""
+    if not streams_dir.is_dir():
+        return
+
+    cutoff = time.time() - ttl
+    for stream_dir in streams_dir.iterdir():
+        try:
+            if (stream_dir / CLOSED_MARKER).stat().st_mtime < cutoff:
+                shutil.rmtree(stream_dir, ignore_errors=True)
+                logger.info(f"Removed stream of job {stream_dir.name}")
+        except (FileNotFoundError, NotADirectoryError):
+            continue
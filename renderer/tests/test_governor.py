@@ -0,0 +1,40 @@
+import asyncio
+import time
+
+from governor import kill_process_group, process_group_rss_mb
+
+
+def test_killing_a_scene_kills_the_processes_it_started(tmp_path):
+    pid_file = tmp_path / "child.pid"
+
+    async def run():
+        process = await asyncio.create_subprocess_exec(
+            "sh",
+            "-c",
+            f"sleep 60 & echo $! > {pid_file}; wait",
+            start_new_session=True,
+        )
+        while not pid_file.exists() or not pid_file.read_text().strip():
+            await asyncio.sleep(0.01)
+        child = int(pid_file.read_text())
+        assert process_group_rss_mb(process.pid) > 0
+
+        kill_process_group(process)
+        await process.wait()
+        return child
+
+    child = asyncio.run(run())
+    for _ in range(100):
+        if _state(child) in (None, "Z"):
+            return
+        time.sleep(0.01)
+    raise AssertionError(f"process {child} started by the scene is still running")
+
+
+def _state(pid: int) -> str | None:
+    """State of a process, None once it is gone. A killed orphan stays a zombie until init reaps it."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0]
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,17 @@
+import pytest
+
+from plain_text import plain_text_markup
+
+
+def test_plain_line_is_set_with_pango():
+    assert plain_text_markup("The  area of a \\textbf{circle}") == (
+        "The area of a <b>circle</b>"
+    )
+
+
+@pytest.mark.parametrize(
+    "line",
+    ["$x^2$", "50% of the area", "Rows & columns", "Step #1", "pages 1--2"],
+)
+def test_line_with_latex_markup_falls_back_to_tex(line):
+    assert plain_text_markup(line) is None
@@ -0,0 +1,31 @@
+import asyncio
+
+from scheduler import SceneScheduler
+
+
+def test_idle_slots_only_lends_slots_no_scene_is_waiting_for():
+    async def run():
+        scheduler = SceneScheduler(scene_slots=3, job_limit=1)
+
+        async with scheduler.scene_slot("job", 0):
+            async with scheduler.idle_slots("job", 5) as idle:
+                assert idle == 2
+                assert scheduler.idle_scene_slots() == 0
+
+                # A scene arriving meanwhile waits for the lent slots to be given back
+                waiting = asyncio.create_task(_hold(scheduler, "other"))
+                await asyncio.sleep(0)
+                assert scheduler.queued_scenes == 1
+
+                async with scheduler.idle_slots("job", 5) as more:
+                    assert more == 0
+
+            await waiting
+        assert scheduler.running_scenes == 0
+
+    asyncio.run(run())
+
+
+async def _hold(scheduler: SceneScheduler, job_id: str):
+    async with scheduler.scene_slot(job_id, 0):
+        pass
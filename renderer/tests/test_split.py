@@ -0,0 +1,39 @@
+from split import split_scene
+
+SETUP_MOBJECT_MUTATED = '''
+from manim import *
+
+
+class ManimVideo(Scene):
+    def construct(self):
+        dot = Dot()
+        self.play(dot.animate.shift(RIGHT * 3), run_time=10)
+        self.play(FadeOut(*self.mobjects))
+        self.add(dot)
+        self.play(dot.animate.shift(UP), run_time=10)
+'''
+
+SEGMENT_MOBJECTS = '''
+from manim import *
+
+
+class ManimVideo(Scene):
+    def construct(self):
+        speed = 3
+        dot = Dot()
+        self.play(dot.animate.shift(RIGHT * speed), run_time=10)
+        self.play(FadeOut(*self.mobjects))
+        square = Square()
+        self.play(Create(square), run_time=10)
+'''
+
+
+def test_splits_where_the_screen_is_emptied():
+    parts = split_scene(SEGMENT_MOBJECTS, max_parts=4, min_seconds=1)
+    assert len(parts) == 2
+    assert "Square()" not in parts[0]
+    assert "dot.animate" not in parts[1]
+
+
+def test_setup_mobject_changed_by_an_earlier_segment_is_not_split():
+    assert split_scene(SETUP_MOBJECT_MUTATED, max_parts=4, min_seconds=1) == []
@@ -0,0 +1,63 @@
+import asyncio
+import os
+import time
+
+from stream import CLOSED_MARKER, SceneStream, sweep_streams
+
+
+def test_closed_stream_is_swept_after_the_ttl(tmp_path):
+    stream = SceneStream(tmp_path / "job", scene_count=2)
+    (stream.stream_dir / "scene_0_000.ts").write_bytes(b"")
+    stream.close()
+
+    sweep_streams(tmp_path, ttl=60)
+    assert stream.stream_dir.exists()
+
+    closed_at = time.time() - 120
+    os.utime(stream.stream_dir / CLOSED_MARKER, (closed_at, closed_at))
+    sweep_streams(tmp_path, ttl=60)
+    assert not stream.stream_dir.exists()
+
+
+def test_open_stream_is_not_swept(tmp_path):
+    stream = SceneStream(tmp_path / "job", scene_count=2)
+
+    sweep_streams(tmp_path, ttl=0)
+    assert stream.stream_dir.exists()
+
+
+def test_retried_job_reopens_its_stream(tmp_path):
+    SceneStream(tmp_path / "job", scene_count=2).close()
+    stream = SceneStream(tmp_path / "job", scene_count=2)
+
+    sweep_streams(tmp_path, ttl=0)
+    assert stream.stream_dir.exists()
+
+
+def test_scene_that_fails_to_segment_is_skipped(tmp_path, monkeypatch):
+    stream = SceneStream(tmp_path / "job", scene_count=3)
+
+    async def segment(idx, video_file):
+        return None if idx == 1 else [(f"scene_{idx}_000.ts", 4.0)]
+
+    monkeypatch.setattr(stream, "_segment", segment)
+
+    async def add_scenes():
+        assert await stream.add_scene(0, tmp_path / "0.mp4")
+        await stream.add_scene(2, tmp_path / "2.mp4")
+        await stream.add_scene(1, tmp_path / "1.mp4")
+
+    asyncio.run(add_scenes())
+
+    playlist = stream.playlist.read_text()
+    assert "scene_1_000.ts" not in playlist
+    assert "scene_2_000.ts" in playlist
+    assert playlist.count("#EXT-X-DISCONTINUITY") == 1
+    assert playlist.rstrip().endswith("#EXT-X-ENDLIST")
+
+
+def test_closing_a_stream_ends_its_playlist(tmp_path):
+    stream = SceneStream(tmp_path / "job", scene_count=2)
+    stream.close()
+
+    assert stream.playlist.read_text().rstrip().endswith("#EXT-X-ENDLIST")
@@ -0,0 +1,99 @@
+import logging
+import os
+from pathlib import Path
+
+from cache import link_or_copy
+
+logger = logging.getLogger("eduwiz.tex_cache")
+
+TEX_CACHE_DIR = Path(os.getenv("TEX_CACHE_DIR", "/shared/cache/tex"))
+TEX_CACHE_MAX_BYTES = int(os.getenv("TEX_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+
+class TexCache:
+    """
+    Node wide cache of compiled Tex/MathTex svgs shared by every scene render.
+    Entries are named after manim's own hash of the complete tex file, so they are keyed by both the tex template and
+    the expression. Scenes still compile in their private tex_dir and only publish the finished svg here with an atomic
+    rename, so concurrent renders never see a partially written entry or delete each other's intermediate files.
+    """
+
+    def __init__(
+        self, cache_dir: Path = TEX_CACHE_DIR, max_bytes: int = TEX_CACHE_MAX_BYTES
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def lookup(self, key: str, destination: Path) -> Path | None:
+        if destination.exists():
+            return destination
+
+        entry = self.cache_dir / f"{key}.svg"
+        try:
+            link_or_copy(entry, destination)
+            os.utime(entry)
+        except FileNotFoundError:
+            return None
+        return destination
+
+    def publish(self, key: str, svg_file: Path):
+        temp_entry = self.cache_dir / f".{key}.{os.getpid()}.tmp"
+        try:
+            link_or_copy(svg_file, temp_entry)
+            os.replace(temp_entry, self.cache_dir / f"{key}.svg")
+        except OSError as e:
+            logger.warning(f"Failed to publish tex cache entry {key}: {e}")
+            temp_entry.unlink(missing_ok=True)
+
+    def evict(self):
+        """Remove the least recently used svgs until the cache is back under its size limit."""
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob("*.svg"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def install(self):
+        """Route manim's tex compilation in this process through the cache."""
+        from manim import config
+        from manim.mobject.text import tex_mobject
+        from manim.utils import tex_file_writing
+
+        compile_to_svg = tex_file_writing.tex_to_svg_file
+
+        def cached_tex_to_svg_file(expression, environment=None, tex_template=None):
+            if tex_template is None:
+                tex_template = config.tex_template
+            if environment is not None:
+                tex_code = tex_template.get_texcode_for_expression_in_env(
+                    expression, environment
+                )
+            else:
+                tex_code = tex_template.get_texcode_for_expression(expression)
+
+            key = tex_file_writing.tex_hash(tex_code)
+            tex_dir = config.get_dir("tex_dir")
+            tex_dir.mkdir(parents=True, exist_ok=True)
+
+            cached_svg = self.lookup(key, tex_dir / f"{key}.svg")
+            if cached_svg:
+                return cached_svg
+
+            svg_file = compile_to_svg(expression, environment, tex_template)
+            self.publish(key, svg_file)
+            return svg_file
+
+        tex_file_writing.tex_to_svg_file = cached_tex_to_svg_file
+        tex_mobject.tex_to_svg_file = cached_tex_to_svg_file
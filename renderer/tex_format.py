@@ -0,0 +1,112 @@
+import copy
+import hashlib
+import logging
+import os
+import subprocess
+from pathlib import Path
+
+logger = logging.getLogger("eduwiz.tex_format")
+
+TEX_FORMAT_DIR = Path(os.getenv("TEX_FORMAT_DIR", "/app/tex_format"))
+
+# Compilers whose formats can be dumped from the preamble with -ini
+SUPPORTED_COMPILERS = {"latex", "pdflatex", "xelatex"}
+
+
+def format_name(tex_template) -> str:
+    """Name of the format for a template, derived from its preamble so a changed template gets a new format."""
+    preamble = f"{tex_template.tex_compiler}\n{tex_template.documentclass}\n{tex_template.preamble}"
+    return "eduwiz_" + hashlib.sha256(preamble.encode()).hexdigest()[:12]
+
+
+def build_format(tex_template, format_dir: Path = TEX_FORMAT_DIR) -> str | None:
+    """
+    Dump the documentclass and preamble of a template into <name>.fmt in format_dir, mylatex style.
+    Returns the format name, or None if the template's compiler is not supported or the format failed to build.
+    """
+    compiler = tex_template.tex_compiler
+    if compiler not in SUPPORTED_COMPILERS:
+        return None
+
+    name = format_name(tex_template)
+    if (format_dir / f"{name}.fmt").exists():
+        return name
+
+    format_dir.mkdir(parents=True, exist_ok=True)
+
+    # Build under a private jobname so concurrent builds never write the same files
+    jobname = f"{name}_{os.getpid()}"
+    source = format_dir / f"{jobname}.tex"
+    source.write_text(
+        f"{tex_template.documentclass}\n{tex_template.preamble}\n\\dump\n",
+        encoding="utf-8",
+    )
+
+    try:
+        result = subprocess.run(
+            [
+                compiler,
+                "-ini",
+                "-interaction=batchmode",
+                "-halt-on-error",
+                f"-jobname={jobname}",
+                f"&{compiler}",
+                source.name,
+            ],
+            cwd=format_dir,
+            capture_output=True,
+            timeout=120,
+        )
+        if result.returncode != 0:
+            logger.warning(
+                f"Failed to build tex format {name}, see {format_dir / jobname}.log"
+            )
+            return None
+        os.replace(format_dir / f"{jobname}.fmt", format_dir / f"{name}.fmt")
+        (format_dir / f"{jobname}.log").unlink(missing_ok=True)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.warning(f"Failed to build tex format {name}: {e}")
+        return None
+    finally:
+        source.unlink(missing_ok=True)
+
+    logger.info(f"Built tex format {name}")
+    return name
+
+
+def precompiled_template(tex_template, format_dir: Path = TEX_FORMAT_DIR):
+    """
+    Return a copy of the template which loads its preamble from the dumped format instead of compiling it, or None if
+    no format could be built. The %&<format> first line makes latex load the format, the rest of the document is the
+    unchanged body of the original template.
+    """
+    name = build_format(tex_template, format_dir)
+    if name is None:
+        return None
+
+    template = copy.deepcopy(tex_template)
+    template.documentclass = f"%&{name}"
+    template.preamble = ""
+    return template
+
+
+def install(format_dir: Path = TEX_FORMAT_DIR) -> bool:
+    """Make every Tex/MathTex in this process compile against the precompiled format of manim's default template."""
+    from manim import config
+
+    template = precompiled_template(config.tex_template, format_dir)
+    if template is None:
+        return False
+
+    # latex looks up formats through kpathsea, the trailing separator keeps the default search path
+    os.environ["TEXFORMATS"] = f"{format_dir}{os.pathsep}"
+    config.tex_template = template
+    return True
+
+
+if __name__ == "__main__":
+    # Run while building the renderer image so workers start with the format already dumped
+    from manim import config
+
+    if build_format(config.tex_template) is None:
+        raise SystemExit("Failed to build the tex format")
@@ -1,15 +1,30 @@
+from contextlib import contextmanager
+
 from manim import *
 
+from plain_text import plain_text_markup
+
 class TextManager:
     """
     A class for managing text scenes in Manim.
     """
+    # Space below the title and between lines
+    TITLE_BUFF = 1
+    LINE_BUFF = 0.5
+
+    # How far into writing a line the next line of a batch starts being written
+    BATCH_LAG_RATIO = 0.5
+
+    # Lines without math are set with Pango in LaTeX's typeface, which skips compiling them with latex
+    PLAIN_TEXT_FONT = "CMU Serif"
+
     def __init__(self, scene: Scene) -> None:
         """
         Initialize a TextManager with the given Scene.
         """
         self.scene = scene
         self.text = []
+        self.title = None
 
         self.frame_width = config.frame_width
         self.frame_height = config.frame_height
@@ -19,12 +34,23 @@ class TextManager:
         self.y_min = -self.frame_height / 2
         self.y_max = self.frame_height / 2
 
+        # Bottom edge of the last line laid out on the page and the space to leave under it, None on an empty page
+        self._cursor = None
+        self._buff = self.LINE_BUFF
+
+        # Lines laid out in a batch but not written yet, split into pages. The first page continues the screen.
+        self._pending = None
+
     def add_title(self, title: str):
         """
         Creates a title with the given text, adds it and writes it to the scene.
         """
-        self.title = Tex(title, font_size = 60)
+        self._flush()
+
+        self.title = self._text(title, font_size = 60)
         self.title.to_edge(UP)
+        self._cursor = self.title.get_bottom()[1]
+        self._buff = self.TITLE_BUFF
 
         self.text.append(self.title)
 
@@ -33,45 +59,139 @@ class TextManager:
 
     def add_text(self, text: str):
         """
-        Add some text to the scene. 
+        Add some text to the scene.
         """
-        t_object = Tex(text, font_size = 36)
-        self.position(t_object)
-        self.text.append(t_object)
+        self._add(self._text(text, font_size = 36))
 
-        self.scene.add(t_object)
-        self.scene.play(Write(t_object))
-    
     def add_equation(self, equation: str):
         """
         Add a LaTeX equation to the scene. Requires valid LaTeX math mode code.
         """
-        t_object = MathTex(equation, font_size = 36)
-        self.position(t_object)
-        self.text.append(t_object)
+        self._add(MathTex(equation, font_size = 36))
 
-        self.scene.add(t_object)
-        self.scene.play(Write(t_object))
+    def _text(self, text: str, font_size: float) -> Mobject:
+        """
+        Build a line of text, with Pango when it has no math or LaTeX markup and with Tex otherwise.
+        """
+        markup = plain_text_markup(text)
+        if markup is None:
+            return Tex(text, font_size = font_size)
+        if "<" in markup or "&" in markup:
+            return MarkupText(markup, font = self.PLAIN_TEXT_FONT, font_size = font_size)
+        return Text(markup, font = self.PLAIN_TEXT_FONT, font_size = font_size)
+
+    @contextmanager
+    def batch(self):
+        """
+        Lay out every add_text and add_equation made inside the block in one pass and write them together in one
+        animation per page when the block ends, instead of one animation each.
+        """
+        if self._pending is not None:
+            yield self
+            return
 
-    def position(self, object: Mobject):
-        last_mob = self.text[-1] if self.text else None
+        self._pending = [[]]
+        try:
+            yield self
+            self._flush()
+        finally:
+            self._pending = None
+
+    def _add(self, object: Mobject):
+        """
+        Lay out the object under the last line, on a new page when it would run off the bottom of the screen, and
+        write it now or when the batch it is part of ends.
+        """
+        new_page = not self._fits(object)
+        if new_page:
+            self._reset_cursor()
+        self.position(object)
+
+        if self._pending is not None:
+            if new_page:
+                self._pending.append([])
+            self._pending[-1].append(object)
+            return
 
-        if not last_mob:
+        if new_page:
+            self._clear_page()
+        self.text.append(object)
+
+        self.scene.add(object)
+        self.scene.play(Write(object))
+
+    def position(self, object: Mobject):
+        """
+        Place the object below the last line laid out on the page, or at the top of an empty page.
+        """
+        if self._cursor is None:
             object.to_edge(UP)
-        elif last_mob == self.title:
-            object.next_to(last_mob, direction=DOWN, buff=1)
         else:
-            object.next_to(last_mob, direction=DOWN, buff=0.5)
-        
+            top = self._cursor - self._buff
+            object.shift(UP * (top - object.get_top()[1]))
+
         # Make sure its in bounds
         self._move_within_bounds(object)
 
+        self._cursor = object.get_bottom()[1]
+        self._buff = self.LINE_BUFF
+
+    def _fits(self, object: Mobject) -> bool:
+        """
+        Return whether the object fits on the page below the last line.
+        """
+        if self._cursor is None:
+            return True
+        return self._cursor - self._buff - object.height >= self.y_min
+
+    def _reset_cursor(self):
+        """
+        Start laying out lines at the top of a new page, below the title if there is one.
+        """
+        if self.title is None:
+            self._cursor = None
+        else:
+            self._cursor = self.title.get_bottom()[1]
+            self._buff = self.TITLE_BUFF
+
+    def _clear_page(self):
+        """
+        Fade out every line on the screen except the title.
+        """
+        lines = [mobj for mobj in self.text if mobj is not self.title]
+        if lines:
+            self.scene.play(*[FadeOut(mobj) for mobj in lines])
+        self.text = [self.title] if self.title is not None else []
+
+    def _flush(self):
+        """
+        Write the lines of the batch laid out so far, one grouped animation per page.
+        """
+        if self._pending is None:
+            return
+
+        pages, self._pending = self._pending, [[]]
+        for page_idx, page in enumerate(pages):
+            if page_idx:
+                self._clear_page()
+            if not page:
+                continue
+
+            self.text.extend(page)
+            self.scene.play(
+                LaggedStart(*[Write(mobj) for mobj in page], lag_ratio = self.BATCH_LAG_RATIO)
+            )
+
     def clear_scene(self):
         """
         Clear the scene and start with a blank canvas. All text including the title is removed.
         """
+        self._flush()
+
         self.scene.play(*[FadeOut(mobj) for mobj in self.text])
         self.text = []
+        self.title = None
+        self._cursor = None
 
     def _check_within_bounds(self, object: Mobject):
         """
@@ -81,13 +201,13 @@ class TextManager:
         x_max = object.get_right()[0]
         y_min = object.get_bottom()[1]
         y_max = object.get_top()[1]
-        
+
         # If out of bounds
         if x_min < self.x_min or x_max > self.x_max:
             return False
         if y_min < self.y_min or y_max > self.y_max:
             return False
-        
+
         # Else
         return True
 
@@ -95,7 +215,7 @@ class TextManager:
         """
         Move the given Mobject within the scenes boundaries.
         """
-        
+
         if self._check_within_bounds(object):
             return
 
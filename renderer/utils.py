@@ -1,13 +1,108 @@
-import re
+import os
 from typing import AsyncIterable
 import logging
 
 logger = logging.getLogger("eduwiz.utils")
-JOB_LIMIT = 10
-
-def count_total_animations_in_code(code: str) -> int:
-    """Count the total number of animations in the Manim code."""
-    play_count = len(re.findall(r"self\.play\(", code))
-    wait_count = len(re.findall(r"self\.wait\(", code))
-    total = play_count + wait_count
-    return total
\ No newline at end of file
+JOB_LIMIT = int(os.getenv("JOB_LIMIT", "10"))
+
+# Quality names accepted in job messages and the manim CLI flag for each, the flag is part of the scene cache key
+QUALITY_FLAGS = {
+    "low": "-ql",
+    "medium": "-qm",
+    "high": "-qh",
+    "production": "-qp",
+    "fourk": "-qk",
+}
+RENDER_QUALITY = os.getenv("RENDER_QUALITY", "medium")
+# Quality of the draft published before the final render, an empty value disables it
+PREVIEW_QUALITY = os.getenv("PREVIEW_QUALITY", "low") or None
+
+# Rough peak memory of a single manim process rendering at -qm, used to size the scene pool
+SCENE_MEMORY_MB = int(os.getenv("SCENE_MEMORY_MB", "600"))
+
+
+def available_memory_mb() -> int | None:
+    """Return the memory available to this container in MB, or None if it can't be determined."""
+    limits = []
+
+    # cgroup v2 and v1 memory limits, set when the container has a memory cap
+    for path in (
+        "/sys/fs/cgroup/memory.max",
+        "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+    ):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+            if value.isdigit():
+                limits.append(int(value) // (1024 * 1024))
+        except OSError:
+            continue
+
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    limits.append(int(line.split()[1]) // 1024)
+                    break
+    except OSError:
+        pass
+
+    return min(limits) if limits else None
+
+
+def free_memory_mb() -> int | None:
+    """Return the memory this container can still allocate in MB, or None if it can't be determined."""
+    free = []
+
+    # cgroup v2 and v1 limit and current usage
+    for limit_path, usage_path in (
+        ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory.current"),
+        (
+            "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+            "/sys/fs/cgroup/memory/memory.usage_in_bytes",
+        ),
+    ):
+        try:
+            with open(limit_path) as f:
+                limit = f.read().strip()
+            with open(usage_path) as f:
+                usage = f.read().strip()
+            if limit.isdigit() and usage.isdigit():
+                free.append((int(limit) - int(usage)) // (1024 * 1024))
+        except OSError:
+            continue
+
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    free.append(int(line.split()[1]) // 1024)
+                    break
+    except OSError:
+        pass
+
+    return min(free) if free else None
+
+
+def compute_scene_slots() -> int:
+    """
+    Number of manim processes this container may run at once.
+    Bounded by the CPU cores and by how many scenes fit in the available memory, can be overridden with SCENE_SLOTS.
+    """
+    override = os.getenv("SCENE_SLOTS")
+    if override:
+        return max(1, int(override))
+
+    slots = os.cpu_count() or 1
+
+    memory = available_memory_mb()
+    if memory is not None:
+        slots = min(slots, memory // SCENE_MEMORY_MB)
+
+    return max(1, slots)
+
+
+SCENE_SLOTS = compute_scene_slots()
+
+# Keep one job waiting in the container beyond the scene slots so a freed slot never idles while the next message is fetched
+PREFETCH_COUNT = max(1, min(JOB_LIMIT, SCENE_SLOTS + 1))
@@ -0,0 +1,419 @@
+import ast
+import builtins
+import functools
+import importlib
+import importlib.util
+import logging
+import sys
+import types
+
+logger = logging.getLogger("eduwiz.validation")
+
+SCENE_CLASS = "ManimVideo"
+
+# Modules which are imported in the manager so names and attributes used from them can be checked
+VALIDATED_MODULES = {"manim", "manim_voiceover", "text_manager", "numpy"}
+
+BUILTIN_NAMES = set(dir(builtins)) | {
+    "__name__",
+    "__file__",
+    "__doc__",
+    "__spec__",
+    "__loader__",
+    "__package__",
+    "__builtins__",
+    "__class__",
+}
+
+# Enough for the retry prompt to fix the scene without drowning it in cascading problems
+MAX_PROBLEMS = 10
+
+# Mobject builds get_*/set_* methods dynamically through __getattr__
+DYNAMIC_PREFIXES = ("get_", "set_")
+
+
+@functools.cache
+def resolve_module(name: str) -> tuple[bool, object | None]:
+    """
+    Return whether a module can be imported, and the module itself if it is one of the validated modules. Anything
+    else is only looked up by its top level package so no arbitrary package code is run in the manager.
+    """
+    top_level = name.split(".")[0]
+    if top_level not in VALIDATED_MODULES:
+        try:
+            return importlib.util.find_spec(top_level) is not None, None
+        except (ImportError, ValueError):
+            return False, None
+
+    try:
+        return True, importlib.import_module(name)
+    except ModuleNotFoundError as e:
+        if e.name and (name == e.name or name.startswith(f"{e.name}.")):
+            return False, None
+        logger.warning(f"Failed to import {name} for validation: {e}")
+        return True, None
+    except Exception as e:
+        logger.warning(f"Failed to import {name} for validation: {e}")
+        return True, None
+
+
+def preload():
+    """Import the validated modules up front so the first job doesn't pay for it."""
+    for name in VALIDATED_MODULES:
+        resolve_module(name)
+
+
+def _public_names(module) -> dict[str, object]:
+    names = getattr(module, "__all__", None)
+    if names is None:
+        names = [name for name in dir(module) if not name.startswith("_")]
+    return {name: getattr(module, name, None) for name in names}
+
+
+def _line(node: ast.AST) -> str:
+    return f"Line {getattr(node, 'lineno', '?')}"
+
+
+def _scene_imports(
+    tree: ast.Module, problems: list[str]
+) -> tuple[dict[str, object | None], bool]:
+    """
+    Resolve the imports of the scene into the names they bind, None meaning bound to something that isn't known.
+    Also returns whether a star import from an unknown module makes the set of bound names open ended.
+    """
+    namespace: dict[str, object | None] = {}
+    open_ended = False
+
+    imports = [
+        node
+        for node in ast.walk(tree)
+        if isinstance(node, (ast.Import, ast.ImportFrom))
+    ]
+    imports.sort(key=lambda node: (node.lineno, node.col_offset))
+
+    for node in imports:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                found, module = resolve_module(alias.name)
+                if not found:
+                    problems.append(f"{_line(node)}: No module named '{alias.name}'")
+                if alias.asname:
+                    namespace[alias.asname] = module
+                else:
+                    top_level = alias.name.split(".")[0]
+                    namespace[top_level] = resolve_module(top_level)[1]
+            continue
+
+        if node.level or node.module is None:
+            problems.append(
+                f"{_line(node)}: Relative imports are not supported in a scene"
+            )
+            open_ended = True
+            continue
+
+        found, module = resolve_module(node.module)
+        if not found:
+            problems.append(f"{_line(node)}: No module named '{node.module}'")
+
+        for alias in node.names:
+            if alias.name == "*":
+                if module is None:
+                    open_ended = open_ended or found
+                else:
+                    namespace.update(_public_names(module))
+                continue
+
+            value = None
+            if module is not None:
+                if hasattr(module, alias.name):
+                    value = getattr(module, alias.name)
+                else:
+                    submodule_found, value = resolve_module(
+                        f"{node.module}.{alias.name}"
+                    )
+                    if not submodule_found:
+                        problems.append(
+                            f"{_line(node)}: Cannot import name '{alias.name}' from '{node.module}'"
+                        )
+            namespace[alias.asname or alias.name] = value
+
+    return namespace, open_ended
+
+
+def _local_bindings(tree: ast.Module) -> set[str]:
+    """Every name the scene binds itself, anywhere in the module, other than through imports."""
+    bound = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            bound.add(node.id)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            bound.add(node.name)
+        elif isinstance(node, ast.arg):
+            bound.add(node.arg)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            bound.add(node.name)
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            bound.update(node.names)
+        elif isinstance(node, (ast.MatchAs, ast.MatchStar)) and node.name:
+            bound.add(node.name)
+        elif isinstance(node, ast.MatchMapping) and node.rest:
+            bound.add(node.rest)
+    return bound
+
+
+def _check_names(
+    tree: ast.Module,
+    namespace: dict[str, object | None],
+    local: set[str],
+    problems: list[str],
+):
+    bound = BUILTIN_NAMES | namespace.keys() | local
+    reported = set()
+    for node in ast.walk(tree):
+        if (
+            isinstance(node, ast.Name)
+            and isinstance(node.ctx, ast.Load)
+            and node.id not in bound
+            and node.id not in reported
+        ):
+            reported.add(node.id)
+            problems.append(f"{_line(node)}: Name '{node.id}' is not defined")
+
+
+def _check_scene_class(
+    tree: ast.Module, library: dict[str, object], problems: list[str]
+) -> tuple[ast.ClassDef | None, list[type] | None]:
+    """
+    Check that the scene defines ManimVideo as a manim Scene. Returns the class and its bases, the bases being None
+    unless every one of them could be resolved to a library class.
+    """
+    scene_class = next(
+        (
+            node
+            for node in tree.body
+            if isinstance(node, ast.ClassDef) and node.name == SCENE_CLASS
+        ),
+        None,
+    )
+    if scene_class is None:
+        problems.append(
+            f"No top level class named '{SCENE_CLASS}' is defined, the scene class must be named {SCENE_CLASS}"
+        )
+        return None, None
+
+    if not scene_class.bases:
+        problems.append(
+            f"{_line(scene_class)}: {SCENE_CLASS} must inherit from a manim Scene such as VoiceoverScene"
+        )
+        return scene_class, None
+
+    manim = resolve_module("manim")[1]
+    scene_base = getattr(manim, "Scene", None)
+
+    bases = []
+    for base in scene_class.bases:
+        value = library.get(base.id) if isinstance(base, ast.Name) else None
+        if not isinstance(value, type):
+            return scene_class, None
+        bases.append(value)
+
+    if scene_base is None:
+        return scene_class, bases
+
+    for base, value in zip(scene_class.bases, bases):
+        if not issubclass(value, scene_base):
+            problems.append(
+                f"{_line(base)}: {SCENE_CLASS} inherits from {base.id}, which is not a manim Scene"
+            )
+            return scene_class, None
+
+    defines_construct = any(
+        isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+        and node.name == "construct"
+        for node in scene_class.body
+    )
+    if not defines_construct and all(
+        getattr(base, "construct", None) is scene_base.construct for base in bases
+    ):
+        problems.append(
+            f"{_line(scene_class)}: {SCENE_CLASS} does not define a construct() method"
+        )
+
+    return scene_class, bases
+
+
+def _missing_attribute(owner, attr: str) -> bool:
+    if hasattr(owner, attr):
+        return False
+    if isinstance(owner, type):
+        return not (hasattr(owner, "__getattr__") and attr.startswith(DYNAMIC_PREFIXES))
+    # Submodules which are already imported are reachable even if the package doesn't import them itself
+    return f"{owner.__name__}.{attr}" not in sys.modules
+
+
+def _target_key(node: ast.AST) -> str | None:
+    if isinstance(node, ast.Name):
+        return node.id
+    if (
+        isinstance(node, ast.Attribute)
+        and isinstance(node.value, ast.Name)
+        and node.value.id == "self"
+    ):
+        return f"self.{node.attr}"
+    return None
+
+
+def _instance_classes(tree: ast.Module, library: dict[str, object]) -> dict[str, type]:
+    """
+    Find the names and self attributes which only ever hold an instance of one library class, such as a TextManager
+    or a mobject, so the methods called on them can be checked.
+    """
+    assigned: dict[str, set] = {}
+
+    def record(key: str | None, value):
+        if key is not None:
+            assigned.setdefault(key, set()).add(value)
+
+    constructed = set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Assign, ast.AnnAssign)) and node.value is not None:
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            cls = None
+            if isinstance(node.value, ast.Call) and isinstance(
+                node.value.func, ast.Name
+            ):
+                value = library.get(node.value.func.id)
+                if isinstance(value, type):
+                    cls = value
+            for target in targets:
+                constructed.add(id(target))
+                record(_target_key(target), cls)
+
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Name, ast.Attribute)) and isinstance(
+            node.ctx, (ast.Store, ast.Del)
+        ):
+            if id(node) not in constructed:
+                record(_target_key(node), None)
+        elif isinstance(node, ast.arg):
+            record(node.arg, None)
+
+    return {
+        key: next(iter(classes))
+        for key, classes in assigned.items()
+        if len(classes) == 1 and None not in classes
+    }
+
+
+def _check_attributes(
+    tree: ast.Module,
+    library: dict[str, object],
+    scene_class: ast.ClassDef | None,
+    scene_bases: list[type] | None,
+    problems: list[str],
+):
+    reported = set()
+
+    def report(node: ast.AST, owner: str, attr: str):
+        if (owner, attr) not in reported:
+            reported.add((owner, attr))
+            problems.append(f"{_line(node)}: {owner} has no attribute '{attr}'")
+
+    # Attributes of library modules and classes, such as rate_functions.smooth or Create.run_time
+    for node in ast.walk(tree):
+        if (
+            isinstance(node, ast.Attribute)
+            and isinstance(node.ctx, ast.Load)
+            and isinstance(node.value, ast.Name)
+        ):
+            owner = library.get(node.value.id)
+            if isinstance(owner, (type, types.ModuleType)) and _missing_attribute(
+                owner, node.attr
+            ):
+                report(node, node.value.id, node.attr)
+
+    # Methods the scene calls on itself, which have to come from its own body or its library base classes
+    if scene_class is not None and scene_bases is not None:
+        scene_attributes = set()
+        for node in scene_class.body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                scene_attributes.add(node.name)
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = (
+                    node.targets if isinstance(node, ast.Assign) else [node.target]
+                )
+                scene_attributes.update(
+                    target.id for target in targets if isinstance(target, ast.Name)
+                )
+        for node in ast.walk(tree):
+            key = _target_key(node)
+            if (
+                isinstance(node, ast.Attribute)
+                and key
+                and not isinstance(node.ctx, ast.Load)
+            ):
+                scene_attributes.add(node.attr)
+
+        for node in ast.walk(scene_class):
+            if (
+                isinstance(node, ast.Call)
+                and isinstance(node.func, ast.Attribute)
+                and _target_key(node.func) == f"self.{node.func.attr}"
+                and node.func.attr not in scene_attributes
+                and all(
+                    _missing_attribute(base, node.func.attr) for base in scene_bases
+                )
+            ):
+                report(node, SCENE_CLASS, node.func.attr)
+
+    # Methods called on instances of library classes, such as a TextManager or a mobject
+    instances = _instance_classes(tree, library)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+            cls = instances.get(_target_key(node.func.value))
+            if cls is not None and _missing_attribute(cls, node.func.attr):
+                report(node, cls.__name__, node.func.attr)
+
+
+def validate_scene(code: str) -> str | None:
+    """
+    Statically check a scene before any manim process is spent on it. The code has to compile, define ManimVideo as
+    a manim Scene, import modules which exist, and only use names and library attributes which resolve against the
+    installed manim, manim_voiceover and text_manager. Returns a description of every problem found, or None.
+    Checks only flag what would certainly fail, anything that can't be resolved statically is left to the render.
+    """
+    try:
+        compile(code, "scene.py", "exec")
+    except SyntaxError as e:
+        text = (e.text or "").strip()
+        return f"Line {e.lineno}: {type(e).__name__}: {e.msg}" + (
+            f"\n    {text}" if text else ""
+        )
+    except ValueError as e:
+        return f"The scene code can't be compiled: {e}"
+
+    tree = ast.parse(code)
+    problems: list[str] = []
+
+    namespace, open_ended = _scene_imports(tree, problems)
+    local = _local_bindings(tree)
+
+    # Library objects the scene refers to by name, unless it rebinds the name itself
+    library = {
+        name: value
+        for name, value in namespace.items()
+        if value is not None and name not in local
+    }
+
+    scene_class, scene_bases = _check_scene_class(tree, library, problems)
+    if not open_ended:
+        _check_names(tree, namespace, local, problems)
+    _check_attributes(tree, library, scene_class, scene_bases, problems)
+
+    if not problems:
+        return None
+
+    summary = problems[:MAX_PROBLEMS]
+    if len(problems) > MAX_PROBLEMS:
+        summary.append(f"... and {len(problems) - MAX_PROBLEMS} more problems")
+    return "Scene failed validation before rendering:\n" + "\n".join(summary)
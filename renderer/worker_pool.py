@@ -0,0 +1,487 @@
+import asyncio
+import importlib
+import importlib.util
+import itertools
+import json
+import logging
+import os
+import select
+import signal
+import socket
+import sys
+import time
+import traceback
+from pathlib import Path
+
+import static_frames
+import tex_format
+from governor import apply_limits
+from tex_cache import TexCache
+from utils import QUALITY_FLAGS
+
+logger = logging.getLogger("eduwiz.worker_pool")
+
+WORKER_SCRIPT = Path(__file__).resolve()
+
+# Modules imported once by every worker so forked scene renders start with them loaded
+PRELOAD_MODULES = ["manim", "manim_voiceover", "text_manager"]
+
+# Name of manim's quality setting for each quality flag the manager renders with
+MANIM_QUALITY_NAMES = {flag: f"{name}_quality" for name, flag in QUALITY_FLAGS.items()}
+
+
+class WorkerProcess:
+    """
+    Handle on a scene rendering in a forked worker child.
+    Mirrors the parts of asyncio.subprocess.Process used by the RenderManager, so both can be used interchangeably.
+    """
+
+    def __init__(
+        self,
+        pid: int,
+        stdout: asyncio.StreamReader,
+        stderr: asyncio.StreamReader,
+        exit_future: asyncio.Future,
+    ):
+        self.pid = pid
+        self.stdout = stdout
+        self.stderr = stderr
+        self._exit_future = exit_future
+
+    @property
+    def returncode(self) -> int | None:
+        if self._exit_future.done():
+            return self._exit_future.result()
+        return None
+
+    async def wait(self) -> int:
+        return await asyncio.shield(self._exit_future)
+
+    async def communicate(self) -> tuple[bytes, bytes]:
+        stdout, stderr = await asyncio.gather(self.stdout.read(), self.stderr.read())
+        await self.wait()
+        return stdout, stderr
+
+    def kill(self):
+        """Kill the child along with every process it started, it runs in a process group of its own."""
+        try:
+            os.killpg(self.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            # Right after the fork the group may not exist yet
+            try:
+                os.kill(self.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+
+async def _pipe_reader(fd: int) -> tuple[asyncio.StreamReader, asyncio.BaseTransport]:
+    """Read the pipe through a stream reader, the pipe is closed with the returned transport."""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    protocol = asyncio.StreamReaderProtocol(reader)
+    pipe = os.fdopen(fd, "rb", 0)
+    try:
+        transport, _ = await loop.connect_read_pipe(lambda: protocol, pipe)
+    except BaseException:
+        pipe.close()
+        raise
+    return reader, transport
+
+
+class ManimWorker:
+    """
+    A long lived process with manim imported which forks a fresh child for every scene it is given.
+    Requests are sent over a unix socket together with the write ends of the scene's stdout and stderr pipes, the
+    worker answers on its stdout with the pid of the child and later with its exit code.
+    """
+
+    def __init__(self):
+        self.process: asyncio.subprocess.Process | None = None
+        self.tasks_started = 0
+        self.in_flight = 0
+        self.retired = False
+
+        self._sock: socket.socket | None = None
+        self._ids = itertools.count()
+        self._pending: dict[int, tuple[asyncio.Future, asyncio.Future]] = {}
+        self._reader: asyncio.Task | None = None
+
+    async def start(self):
+        self._sock, worker_sock = socket.socketpair(
+            socket.AF_UNIX, socket.SOCK_SEQPACKET
+        )
+        try:
+            self.process = await asyncio.create_subprocess_exec(
+                sys.executable,
+                str(WORKER_SCRIPT),
+                str(worker_sock.fileno()),
+                stdout=asyncio.subprocess.PIPE,
+                pass_fds=(worker_sock.fileno(),),
+            )
+        finally:
+            worker_sock.close()
+
+        # Wait for the worker to finish importing manim
+        line = await asyncio.wait_for(self.process.stdout.readline(), timeout=120)
+        if not line or not json.loads(line).get("ready"):
+            self.process.kill()
+            raise RuntimeError("Manim worker exited before it was ready")
+
+        self._reader = asyncio.create_task(self._read_responses())
+        logger.info(f"Started manim worker {self.process.pid}")
+
+    async def _read_responses(self):
+        while True:
+            line = await self.process.stdout.readline()
+            if not line:
+                break
+
+            response = json.loads(line)
+            pid_future, exit_future = self._pending.get(response["id"], (None, None))
+            if pid_future is None:
+                continue
+
+            if "pid" in response:
+                pid_future.set_result(response["pid"])
+            elif "returncode" in response:
+                self._pending.pop(response["id"])
+                self.in_flight -= 1
+                exit_future.set_result(response["returncode"])
+
+        # The worker is gone, none of its children will be reported anymore
+        for pid_future, exit_future in self._pending.values():
+            if not pid_future.done():
+                pid_future.set_exception(RuntimeError("Manim worker exited"))
+            if not exit_future.done():
+                exit_future.set_result(-1)
+        self._pending.clear()
+        self.in_flight = 0
+
+        await self.process.wait()
+        logger.info(f"Manim worker {self.process.pid} exited")
+
+    def memory_mb(self) -> int:
+        try:
+            with open(f"/proc/{self.process.pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) // 1024
+        except OSError:
+            pass
+        return 0
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def submit(self, request: dict) -> WorkerProcess:
+        """Send a task to the worker, which forks a child to run it."""
+        loop = asyncio.get_running_loop()
+        request_id = next(self._ids)
+        pid_future = loop.create_future()
+        exit_future = loop.create_future()
+        self._pending[request_id] = (pid_future, exit_future)
+        self.in_flight += 1
+        self.tasks_started += 1
+
+        stdout_read, stdout_write = os.pipe()
+        stderr_read, stderr_write = os.pipe()
+        request = {**request, "id": request_id}
+        try:
+            socket.send_fds(
+                self._sock, [json.dumps(request).encode()], [stdout_write, stderr_write]
+            )
+        except OSError:
+            self._pending.pop(request_id)
+            self.in_flight -= 1
+            os.close(stdout_read)
+            os.close(stderr_read)
+            raise
+        finally:
+            os.close(stdout_write)
+            os.close(stderr_write)
+
+        # Once the request is sent the read ends are owned by their transports, everything is released if the
+        # child never reports its pid
+        pipes = [stdout_read, stderr_read]
+        transports = []
+        try:
+            stdout, transport = await _pipe_reader(pipes.pop(0))
+            transports.append(transport)
+            stderr, transport = await _pipe_reader(pipes.pop(0))
+            transports.append(transport)
+            pid = await pid_future
+        except BaseException:
+            for transport in transports:
+                transport.close()
+            for fd in pipes:
+                os.close(fd)
+            # The worker may already have dropped the request when it exited
+            if self._pending.pop(request_id, None) is not None:
+                self.in_flight -= 1
+            raise
+
+        return WorkerProcess(pid, stdout, stderr, exit_future)
+
+    def retire(self):
+        """Stop giving the worker scenes, it exits once the scenes it is rendering are done."""
+        self.retired = True
+        if self._sock:
+            self._sock.close()
+            self._sock = None
+
+
+class ManimWorkerPool:
+    """
+    Pool of warm manim workers.
+    A worker is recycled after it has started max_tasks tasks or grown past max_rss_mb, so leaks stay bounded. If no
+    worker can be started the pool disables itself and run_scene returns None, leaving the caller to use the manim CLI.
+    """
+
+    def __init__(self, size: int, max_tasks: int, max_rss_mb: int):
+        self.size = size
+        self.max_tasks = max_tasks
+        self.max_rss_mb = max_rss_mb
+        self.disabled = size <= 0
+
+        self._workers: list[ManimWorker] = []
+        self._lock = asyncio.Lock()
+
+    def _should_recycle(self, worker: ManimWorker) -> bool:
+        return (
+            not worker.alive
+            or worker.tasks_started >= self.max_tasks
+            or worker.memory_mb() > self.max_rss_mb
+        )
+
+    async def _get_worker(self) -> ManimWorker | None:
+        async with self._lock:
+            for worker in list(self._workers):
+                if self._should_recycle(worker):
+                    logger.info(
+                        f"Recycling manim worker {worker.process.pid} after {worker.tasks_started} tasks"
+                    )
+                    worker.retire()
+                    self._workers.remove(worker)
+
+            while len(self._workers) < self.size:
+                worker = ManimWorker()
+                try:
+                    await worker.start()
+                except Exception as e:
+                    logger.error(
+                        f"Failed to start manim worker, falling back to the manim CLI: {e}"
+                    )
+                    self.disabled = True
+                    return None
+                self._workers.append(worker)
+
+            return min(self._workers, key=lambda worker: worker.in_flight)
+
+    async def _submit(self, request: dict) -> WorkerProcess | None:
+        if self.disabled:
+            return None
+
+        worker = await self._get_worker()
+        if worker is None:
+            return None
+
+        try:
+            return await worker.submit(request)
+        except Exception as e:
+            logger.error(
+                f"Manim worker {worker.process.pid} failed to start a {request['task']} task: {e}"
+            )
+            worker.retire()
+            return None
+
+    async def run_scene(
+        self,
+        scene_file: Path,
+        media_dir: Path,
+        quality: str,
+        dry_run: bool = False,
+        limits: dict | None = None,
+    ) -> WorkerProcess | None:
+        """
+        Start rendering a scene in a warm worker, or return None if the pool can't take it. A dry run executes the
+        scene without rendering or writing any frames, the child runs under the given rlimits if any.
+        """
+        if quality not in MANIM_QUALITY_NAMES:
+            return None
+
+        return await self._submit(
+            {
+                "task": "render",
+                "scene_file": str(scene_file),
+                "media_dir": str(media_dir),
+                "quality": MANIM_QUALITY_NAMES[quality],
+                "dry_run": dry_run,
+                "limits": limits,
+            }
+        )
+
+    async def precompile_tex(
+        self, media_dir: Path, tex_calls: list[dict]
+    ) -> WorkerProcess | None:
+        """Build the given Tex/MathTex mobjects in a warm worker so their svgs land in the shared tex cache."""
+        return await self._submit(
+            {"task": "tex", "media_dir": str(media_dir), "tex_calls": tex_calls}
+        )
+
+    def close(self):
+        for worker in self._workers:
+            worker.retire()
+        self._workers = []
+
+
+def _render_scene(request: dict):
+    """Render the scene the same way the manim CLI does."""
+    from manim import config
+
+    scene_file = Path(request["scene_file"])
+    sys.path.insert(0, str(scene_file.parent))
+
+    config.input_file = str(scene_file)
+    config.media_dir = request["media_dir"]
+    config.quality = request["quality"]
+    config.dry_run = request.get("dry_run", False)
+    # Like the CLI's -s, which makes the renderer skip every animation to its end state instead of rasterizing the
+    # frames of a dry run that are never written
+    config.save_last_frame = config.dry_run
+
+    spec = importlib.util.spec_from_file_location(scene_file.stem, scene_file)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[scene_file.stem] = module
+    spec.loader.exec_module(module)
+
+    module.ManimVideo().render()
+
+
+def _precompile_tex(request: dict):
+    """Build each Tex/MathTex once, which compiles it through the tex cache. Failures are left for the render."""
+    import manim
+    from manim import config
+
+    config.media_dir = request["media_dir"]
+
+    for call in request["tex_calls"]:
+        if call["cls"] not in ("Tex", "MathTex"):
+            continue
+        try:
+            getattr(manim, call["cls"])(*call["args"], **call["kwargs"])
+        except Exception as e:
+            print(f"Could not precompile {call}: {e}", file=sys.stderr)
+
+
+WORKER_TASKS = {
+    "render": _render_scene,
+    "tex": _precompile_tex,
+}
+
+
+def _run_in_child(request: dict, stdout_fd: int, stderr_fd: int):
+    """
+    Runs in the forked child with its output sent to the given pipes, never returns. The child leads a new session so
+    the processes it starts can be killed together with it.
+    """
+    exit_code = 1
+    try:
+        os.setsid()
+        os.dup2(stdout_fd, 1)
+        os.dup2(stderr_fd, 2)
+        os.close(stdout_fd)
+        os.close(stderr_fd)
+
+        if request.get("limits"):
+            apply_limits(request["limits"])
+
+        WORKER_TASKS[request["task"]](request)
+        exit_code = 0
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(exit_code)
+
+
+def serve(sock_fd: int):
+    """Worker entry point, preloads manim then forks a child for every request until the socket is closed."""
+    # Keep the real stdout for the protocol, anything printed by imports goes to the log instead
+    responses = os.fdopen(os.dup(1), "w", buffering=1)
+    os.dup2(2, 1)
+
+    def respond(message: dict):
+        responses.write(json.dumps(message) + "\n")
+
+    for module in PRELOAD_MODULES:
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            if module == "manim":
+                raise
+            print(f"Manim worker could not preload {module}: {e}", file=sys.stderr)
+
+    try:
+        if not tex_format.install():
+            print("Manim worker is compiling tex without a format", file=sys.stderr)
+    except Exception as e:
+        print(f"Manim worker could not install the tex format: {e}", file=sys.stderr)
+
+    try:
+        TexCache().install()
+    except Exception as e:
+        print(f"Manim worker could not install the tex cache: {e}", file=sys.stderr)
+
+    try:
+        if not static_frames.install():
+            print("Manim worker is encoding every frame", file=sys.stderr)
+    except Exception as e:
+        print(
+            f"Manim worker could not install static frame encoding: {e}",
+            file=sys.stderr,
+        )
+
+    sock = socket.socket(fileno=sock_fd)
+    respond({"ready": True})
+
+    children: dict[int, int] = {}
+    accepting = True
+
+    while accepting or children:
+        if accepting:
+            readable, _, _ = select.select([sock], [], [], 0.1)
+            if readable:
+                message, fds, _, _ = socket.recv_fds(sock, 1 << 20, 2)
+                if not message:
+                    accepting = False
+                    for fd in fds:
+                        os.close(fd)
+                else:
+                    request = json.loads(message)
+                    pid = os.fork()
+                    if pid == 0:
+                        sock.close()
+                        responses.close()
+                        _run_in_child(request, *fds)
+                    for fd in fds:
+                        os.close(fd)
+                    children[pid] = request["id"]
+                    respond({"id": request["id"], "pid": pid})
+        else:
+            time.sleep(0.1)
+
+        while children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                break
+            request_id = children.pop(pid, None)
+            if request_id is not None:
+                respond(
+                    {"id": request_id, "returncode": os.waitstatus_to_exitcode(status)}
+                )
+
+
+if __name__ == "__main__":
+    serve(int(sys.argv[1]))
@@ -0,0 +1,142 @@
+import logging
+import shutil
+import time
+from pathlib import Path
+
+from cache import link_or_copy
+
+logger = logging.getLogger("eduwiz.workspace")
+
+# Where manim writes the video of every animation it encodes, relative to the media directory of a render
+PARTIAL_MOVIES = "videos/*/*/partial_movie_files/*/*.mp4"
+
+
+class JobWorkspace:
+    """
+    Keeps the videos of successfully rendered scenes of a failed job until it comes back from the retry queue.
+    Scenes are stored per job as scene_<idx>.<key>.mp4, where key is the scene's cache key, so a scene is only reused
+    when the retried job still has the exact same code at that index.
+    The partial movie files of the scenes that failed are kept as well, under partials/scene_<idx>/<quality>. Manim
+    names them by the hash of the animation, so the fixed scene only encodes the animations the fix changed.
+    Scenes rendered for a job coordinated by another renderer replica are handed over under results/<tier>.
+    Workspaces older than ttl seconds are swept.
+    """
+
+    def __init__(self, root: Path, ttl: int):
+        self.root = root
+        self.ttl = ttl
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _job_dir(self, job_id: str) -> Path:
+        return self.root / job_id
+
+    def save(self, job_id: str, idx: int, key: str, video_file: Path):
+        """Keep the rendered video of a scene for the job's retry."""
+        job_dir = self._job_dir(job_id)
+        job_dir.mkdir(parents=True, exist_ok=True)
+
+        for stale in job_dir.glob(f"scene_{idx}.*.mp4"):
+            stale.unlink(missing_ok=True)
+
+        try:
+            link_or_copy(video_file, job_dir / f"scene_{idx}.{key}.mp4")
+        except OSError as e:
+            logger.warning(f"Failed to keep scene {idx} of job {job_id}: {e}")
+            return
+
+        # The directory mtime marks the last time the workspace was used
+        job_dir.touch()
+
+    def contains(self, job_id: str, idx: int, key: str) -> bool:
+        return (self._job_dir(job_id) / f"scene_{idx}.{key}.mp4").exists()
+
+    def restore(
+        self, job_id: str, idx: int, key: str, destination: Path
+    ) -> Path | None:
+        """Place the kept video of a scene at destination if the scene is unchanged, otherwise return None."""
+        saved = self._job_dir(job_id) / f"scene_{idx}.{key}.mp4"
+        try:
+            link_or_copy(saved, destination)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Failed to restore scene {idx} of job {job_id}: {e}")
+            return None
+        return destination
+
+    def _partials_dir(self, job_id: str, idx: int, quality: str) -> Path:
+        return self._job_dir(job_id) / "partials" / f"scene_{idx}" / quality.lstrip("-")
+
+    def save_partials(
+        self, job_id: str, idx: int, quality: str, media_dirs: list[Path]
+    ) -> int:
+        """Keep the partial movie files a failed scene's renders wrote, returning how many new ones were kept."""
+        partials_dir = self._partials_dir(job_id, idx, quality)
+        kept = 0
+        for media_dir in media_dirs:
+            for partial in media_dir.glob(PARTIAL_MOVIES):
+                destination = partials_dir / partial.relative_to(media_dir)
+                if destination.exists():
+                    continue
+                destination.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    link_or_copy(partial, destination)
+                except OSError as e:
+                    logger.warning(
+                        f"Failed to keep partial movie of scene {idx} of job {job_id}: {e}"
+                    )
+                    continue
+                kept += 1
+
+        if kept:
+            self._job_dir(job_id).touch()
+        return kept
+
+    def restore_partials(
+        self, job_id: str, idx: int, quality: str, media_dir: Path
+    ) -> int:
+        """Place the kept partial movie files of a scene where its render looks for them, returning how many."""
+        partials_dir = self._partials_dir(job_id, idx, quality)
+        restored = 0
+        for partial in partials_dir.glob(PARTIAL_MOVIES):
+            destination = media_dir / partial.relative_to(partials_dir)
+            if destination.exists():
+                continue
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                link_or_copy(partial, destination)
+            except OSError as e:
+                logger.warning(
+                    f"Failed to restore partial movie of scene {idx} of job {job_id}: {e}"
+                )
+                continue
+            restored += 1
+        return restored
+
+    def save_result(self, job_id: str, tier: str, idx: int, video_file: Path) -> Path:
+        """Place a scene rendered for a job coordinated by another renderer where that renderer can read it."""
+        result_dir = self._job_dir(job_id) / "results" / tier
+        result_dir.mkdir(parents=True, exist_ok=True)
+        destination = result_dir / f"scene_{idx}.mp4"
+        destination.unlink(missing_ok=True)
+        link_or_copy(video_file, destination)
+        return destination
+
+    def discard_results(self, job_id: str):
+        """Remove the scenes other renderers rendered for a job once the job no longer reads them."""
+        shutil.rmtree(self._job_dir(job_id) / "results", ignore_errors=True)
+
+    def discard(self, job_id: str):
+        """Remove the workspace of a job once it no longer needs to be retried."""
+        shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+
+    def sweep(self):
+        """Remove every workspace that has not been used within the ttl."""
+        cutoff = time.time() - self.ttl
+        for job_dir in self.root.iterdir():
+            try:
+                if job_dir.is_dir() and job_dir.stat().st_mtime < cutoff:
+                    shutil.rmtree(job_dir, ignore_errors=True)
+                    logger.info(f"Removed expired workspace of job {job_dir.name}")
+            except FileNotFoundError:
+                continue